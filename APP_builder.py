@@ -7,6 +7,8 @@ import ollama
 import warnings
 from crewai import Agent, Task, Crew, Process, LLM
 from openai import OpenAI
+from project_files import iter_project_sources
+from wheelhouse import pip_index_args
 
 # =====================================================================
 # MANIFEST - FULL SYSTEM FLOW
@@ -229,13 +231,7 @@ if raw_text:
 
 # ================== PING-PONG + USER FEEDBACK ==================
 def get_all_code(folder):
-    code_map = {}
-    for root, _, fs in os.walk(folder):
-        for f in fs:
-            if f.endswith('.py'):
-                with open(os.path.join(root, f), 'r', encoding='utf-8', errors='ignore') as fh:
-                    code_map[f] = fh.read()
-    return code_map
+    return dict(iter_project_sources(folder))
 
 def ping_pong_fix(folder, error_log="", user_feedback=""):
     restart_ollama()
@@ -432,7 +428,7 @@ def launch_and_ping_pong(folder):
        
         req = os.path.join(folder, "requirements.txt")
         if os.path.exists(req):
-            subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt", "--quiet"], cwd=folder)
+            subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt", "--quiet"] + pip_index_args(), cwd=folder)
       
         try:
             proc = subprocess.Popen(
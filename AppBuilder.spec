@@ -3,7 +3,7 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = []
 binaries = []
-hiddenimports = ['customtkinter', 'ollama', 'openai', 'pyautogui', 'pyperclip', 'numpy', 'scipy', 'bezier', 'PIL', 'PIL._tkinter_finder', 'tkinter', 'tkinter.messagebox', 'json', 'importlib', 'importlib.util', 'difflib', 'shutil', 'httpx', 'httpcore', 'anyio', 'certifi', 'charset_normalizer', 'idna', 'sniffio', 'h11', 'pydantic', 'tqdm']
+hiddenimports = ['customtkinter', 'ollama', 'openai', 'pyautogui', 'pyperclip', 'numpy', 'scipy', 'bezier', 'PIL', 'PIL._tkinter_finder', 'tkinter', 'tkinter.messagebox', 'json', 'importlib', 'importlib.util', 'difflib', 'shutil', 'httpx', 'httpcore', 'anyio', 'certifi', 'charset_normalizer', 'idna', 'sniffio', 'h11', 'h2', 'hpack', 'hyperframe', 'pydantic', 'tqdm']
 tmp_ret = collect_all('customtkinter')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 tmp_ret = collect_all('ollama')
@@ -1,16 +1,98 @@
 import os
 import re
 import json
-import ollama
-from openai import OpenAI
 import sys
+import time
+import queue
+import threading
 
-from config import EXPAND_MODEL, FIX_MODEL, XAI_API_KEY, GROK_MODEL, LLM_PROVIDERS, get_provider_key, load_config
-from utils import restart_ollama, get_all_code
+from config import EXPAND_MODEL, FIX_MODEL, GROK_MODEL, LLM_PROVIDERS, HYBRID_RACE_SETTINGS, FIX_FORMAT, get_provider_key, load_config
 from browser_automation import get_grok_response_via_browser
+from file_blocks import StreamingFileWriter, validate_blocks
+from llm_clients import get_openai_client, get_anthropic_client, get_ollama_client, ANTHROPIC_MESSAGES_URL
+import response_cache
+from context_packer import pack_context, token_budget
+import provider_router
+import model_residency
+import local_scheduler
 
 
-def call_cloud_llm(provider_id, prompt, system_prompt="", config=None):
+class GenerationCancelled(Exception):
+    pass
+
+
+def _collect_stream(chunks, on_token=None):
+    parts = []
+    for chunk in chunks:
+        if not chunk:
+            continue
+        parts.append(chunk)
+        if on_token:
+            on_token(chunk)
+    return "".join(parts)
+
+
+def _tee_to_writer(writer, on_token=None):
+    def _on_token(chunk):
+        writer.feed(chunk)
+        if on_token:
+            on_token(chunk)
+    _on_token.reset = writer.reset
+    return _on_token
+
+
+def stream_reset(on_token):
+    # -> the callable that discards what on_token has consumed so far, or None.
+    # Set as on_token.reset, or the writer behind a bound writer.feed.
+    return getattr(on_token, "reset", None) or getattr(getattr(on_token, "__self__", None), "reset", None)
+
+
+def _routed_call(provider_id, model, request_class, call):
+    start = time.time()
+    try:
+        result = call()
+    except GenerationCancelled:
+        raise
+    except Exception:
+        provider_router.record(provider_id, model, request_class, time.time() - start, False)
+        raise
+    provider_router.record(provider_id, model, request_class, time.time() - start, bool(result), len(result or ""))
+    return result
+
+
+def stream_ollama(model, prompt, request_class="expand"):
+    # Waits for a slot from the local scheduler; raises GenerationCancelled if
+    # the request is cancelled or preempted before or while it streams.
+    first = None
+    with local_scheduler.slot(request_class) as ticket:
+        if ticket.cancelled.is_set():
+            raise GenerationCancelled(request_class)
+        with model_residency.using(model):
+            for part in get_ollama_client().chat(model=model, messages=[{"role": "user", "content": prompt}],
+                                                 stream=True, keep_alive=model_residency.keep_alive()):
+                if ticket.cancelled.is_set():
+                    raise GenerationCancelled(request_class)
+                content = part['message']['content']
+                if content and first is None:
+                    first = time.time() - ticket.started_at
+                if part.get('done') and first is not None:
+                    # load_duration is how long Ollama spent getting the model into memory.
+                    model_residency.record_ttft(model, request_class, first, (part.get('load_duration') or 0) / 1e9)
+                yield content
+
+
+def chat_ollama(model, prompt, on_token=None, use_cache=True, request_class="expand", config=None):
+    # Always streamed so a scheduler cancellation takes effect between chunks.
+    if config is None:
+        config = load_config()
+    def _call():
+        return _collect_stream(stream_ollama(model, prompt, request_class), on_token)
+    return response_cache.cached_call("ollama", model, "", prompt, None,
+                                      lambda: _routed_call("ollama", model, request_class, _call), on_token, use_cache,
+                                      config)
+
+
+def call_cloud_llm(provider_id, prompt, system_prompt="", config=None, on_token=None, use_cache=True, request_class="generate"):
     if config is None:
         config = load_config()
     api_key = get_provider_key(config, provider_id)
@@ -24,15 +106,35 @@ def call_cloud_llm(provider_id, prompt, system_prompt="", config=None):
         return None
 
     if provider_id == "anthropic":
-        return _call_anthropic(api_key, provider["model"], prompt, system_prompt)
-
-    client = OpenAI(api_key=api_key, base_url=provider["base_url"])
+        return response_cache.cached_call(
+            provider_id, provider["model"], system_prompt, prompt, None,
+            lambda: _routed_call(provider_id, provider["model"], request_class,
+                                 lambda: _call_anthropic(api_key, provider["model"], prompt, system_prompt, config, on_token)),
+            on_token, use_cache, config)
+    return response_cache.cached_call(
+        provider_id, provider["model"], system_prompt, prompt, 0.7,
+        lambda: _routed_call(provider_id, provider["model"], request_class,
+                             lambda: _call_openai_compatible(provider_id, provider, api_key, prompt, system_prompt, config, on_token)),
+        on_token, use_cache, config)
+
+
+def _call_openai_compatible(provider_id, provider, api_key, prompt, system_prompt="", config=None, on_token=None):
+    client = get_openai_client(provider_id, api_key, provider["base_url"], config)
     messages = []
     if system_prompt:
         messages.append({"role": "system", "content": system_prompt})
     messages.append({"role": "user", "content": prompt})
 
     try:
+        if on_token:
+            stream = client.chat.completions.create(
+                model=provider["model"],
+                messages=messages,
+                temperature=0.7,
+                max_tokens=8000,
+                stream=True
+            )
+            return _collect_stream(_iter_openai_stream(stream), on_token)
         response = client.chat.completions.create(
             model=provider["model"],
             messages=messages,
@@ -40,14 +142,24 @@ def call_cloud_llm(provider_id, prompt, system_prompt="", config=None):
             max_tokens=8000
         )
         return response.choices[0].message.content
+    except GenerationCancelled:
+        raise
     except Exception as e:
         print(f"Error calling {provider_id}: {e}")
         return None
 
 
-def _call_anthropic(api_key, model, prompt, system_prompt=""):
+def _iter_openai_stream(stream):
+    try:
+        for event in stream:
+            if event.choices and event.choices[0].delta:
+                yield event.choices[0].delta.content
+    finally:
+        stream.close()
+
+
+def _call_anthropic(api_key, model, prompt, system_prompt="", config=None, on_token=None):
     try:
-        import httpx
         headers = {
             "x-api-key": api_key,
             "anthropic-version": "2023-06-01",
@@ -60,38 +172,63 @@ def _call_anthropic(api_key, model, prompt, system_prompt=""):
         }
         if system_prompt:
             body["system"] = system_prompt
-        resp = httpx.post("https://api.anthropic.com/v1/messages", headers=headers, json=body, timeout=120)
+        client = get_anthropic_client(api_key, config)
+        if on_token:
+            body["stream"] = True
+            with client.stream("POST", ANTHROPIC_MESSAGES_URL, headers=headers, json=body) as resp:
+                resp.raise_for_status()
+                return _collect_stream(_iter_anthropic_events(resp.iter_lines()), on_token)
+        resp = client.post(ANTHROPIC_MESSAGES_URL, headers=headers, json=body)
         resp.raise_for_status()
         data = resp.json()
         return data["content"][0]["text"]
+    except GenerationCancelled:
+        raise
     except Exception as e:
         print(f"Error calling Anthropic: {e}")
         return None
 
 
-def get_generation_provider(selected_provider, config=None):
+def _iter_anthropic_events(lines):
+    for line in lines:
+        if not line.startswith("data:"):
+            continue
+        event = json.loads(line[5:].strip())
+        if event.get("type") == "content_block_delta":
+            yield event.get("delta", {}).get("text", "")
+        elif event.get("type") == "error":
+            raise RuntimeError(event.get("error", {}).get("message", "stream error"))
+
+
+def _keyed_providers(config):
+    return [(pid, LLM_PROVIDERS[pid]["model"]) for pid in ["xai", "openai", "anthropic", "google"]
+            if get_provider_key(config, pid)]
+
+
+def get_generation_provider(selected_provider, config=None, request_class="generate"):
     if config is None:
         config = load_config()
     if selected_provider == "hybrid":
-        for pid in ["xai", "openai", "anthropic", "google"]:
-            key = get_provider_key(config, pid)
-            if key:
-                return pid
-        return "ollama"
+        ranked = provider_router.rank(_keyed_providers(config), request_class)
+        return ranked[0] if ranked else "ollama"
     if selected_provider == "ollama":
         return "ollama"
     return selected_provider
 
 
-def get_fix_provider(selected_provider, config=None):
-    return get_generation_provider(selected_provider, config)
+def get_fix_provider(selected_provider, config=None, request_class="fix"):
+    return get_generation_provider(selected_provider, config, request_class)
 
 
-def generate_code_with_provider(provider_id, prompt, config=None, use_browser_for_grok=False, browser_config=None):
+def generate_code_with_provider(provider_id, prompt, config=None, use_browser_for_grok=False, browser_config=None, on_token=None, use_cache=True, require_main=True, request_class="generate"):
+    if provider_id == "hybrid":
+        return race_generation(prompt, config, use_browser_for_grok, browser_config, on_token, use_cache, require_main, request_class)
+
     if provider_id == "ollama":
         try:
-            resp = ollama.chat(model=FIX_MODEL, messages=[{"role": "user", "content": prompt}])
-            return resp['message']['content']
+            return chat_ollama(FIX_MODEL, prompt, on_token, use_cache, request_class, config)
+        except GenerationCancelled:
+            raise
         except Exception as e:
             print(f"Ollama error: {e}")
             return None
@@ -105,15 +242,227 @@ def generate_code_with_provider(provider_id, prompt, config=None, use_browser_fo
         "anthropic": "You are a senior Python developer. Output only clean, runnable code.",
         "google": "You are a senior Python developer. Output only clean, runnable code.",
     }
-    return call_cloud_llm(provider_id, prompt, system_prompts.get(provider_id, ""), config)
+    return call_cloud_llm(provider_id, prompt, system_prompts.get(provider_id, ""), config, on_token, use_cache, request_class)
+
+
+_provider_slots = {}
+_slots_lock = threading.Lock()
+
+
+def get_race_settings(config=None):
+    settings = dict(HYBRID_RACE_SETTINGS)
+    if config:
+        settings.update(config.get("hybrid_race", {}))
+    return settings
+
+
+def _provider_slot(provider_id, limit):
+    with _slots_lock:
+        if provider_id not in _provider_slots:
+            _provider_slots[provider_id] = threading.BoundedSemaphore(max(1, limit))
+        return _provider_slots[provider_id]
+
+
+def race_candidates(config, use_browser_for_grok=False, request_class="generate"):
+    settings = get_race_settings(config)
+    candidates = provider_router.rank(_keyed_providers(config), request_class)
+    if use_browser_for_grok and "xai" in candidates:
+        # The browser session can't be cancelled or run twice at once.
+        candidates.remove("xai")
+    if settings["include_ollama"] and provider_router.is_available("ollama", FIX_MODEL):
+        candidates.append("ollama")
+    return candidates[:max(1, settings["max_providers"])]
+
+
+def race_generation(prompt, config=None, use_browser_for_grok=False, browser_config=None, on_token=None, use_cache=True, require_main=True, request_class="generate"):
+    if config is None:
+        config = load_config()
+    settings = get_race_settings(config)
+    providers = race_candidates(config, use_browser_for_grok, request_class)
+    if not settings["enabled"] or len(providers) < 2:
+        provider_id = get_generation_provider("hybrid", config, request_class)
+        return generate_code_with_provider(provider_id, prompt, config, use_browser_for_grok, browser_config, on_token, use_cache,
+                                           request_class=request_class)
+
+    # The first provider to produce a token streams to the caller while the
+    # race runs. If another provider wins, whatever the leader fed into the
+    # caller's writer is reset and the winner's text is replayed.
+    cancel = threading.Event()
+    results = queue.Queue()
+    progress = {}
+    leader = []
+    lock = threading.Lock()
+    start = time.time()
+
+    def _run(pid):
+        progress[pid] = {"started": time.time() - start, "chars": 0}
+        def _on_token(chunk):
+            with lock:
+                if cancel.is_set():
+                    raise GenerationCancelled(pid)
+                progress[pid]["chars"] += len(chunk)
+                if not leader:
+                    leader.append(pid)
+                if on_token and leader[0] == pid:
+                    on_token(chunk)
+        with _provider_slot(pid, settings["per_provider_concurrency"]):
+            if cancel.is_set():
+                results.put((pid, None, "cancelled"))
+                return
+            try:
+                text = generate_code_with_provider(pid, prompt, config, on_token=_on_token, use_cache=use_cache, request_class=request_class)
+                results.put((pid, text, None if text else "no response"))
+            except GenerationCancelled:
+                results.put((pid, None, "cancelled"))
+            except Exception as e:
+                results.put((pid, None, str(e)))
+
+    launched = []
+    def _launch_next():
+        pid = providers[len(launched)]
+        launched.append(pid)
+        threading.Thread(target=_run, args=(pid,), daemon=True).start()
+
+    names = {pid: LLM_PROVIDERS.get(pid, {}).get("name", pid) for pid in providers}
+    print(f"🏁 Racing {', '.join(names[p] for p in providers)} (hedge delay {settings['hedge_delay']}s)")
+    _launch_next()
+    pending = 1
+    winner = None
+    fallback = None
+    while pending:
+        can_hedge = len(launched) < len(providers)
+        try:
+            pid, text, err = results.get(timeout=settings["hedge_delay"] if can_hedge else None)
+        except queue.Empty:
+            _launch_next()
+            pending += 1
+            continue
+        pending -= 1
+        ok, reason = validate_blocks(text, require_main) if text else (False, err)
+        if ok:
+            winner = (pid, text, time.time() - start)
+            break
+        print(f"⚠️ {names[pid]} dropped out of the race: {reason}")
+        progress[pid]["dropped"] = reason
+        if text and fallback is None:
+            fallback = (pid, text)
+        if len(launched) < len(providers):
+            _launch_next()
+            pending += 1
+    with lock:
+        cancel.set()
+        streamed = leader[0] if leader else None
+
+    def _deliver(pid, text):
+        if not on_token or pid == streamed:
+            return
+        reset = stream_reset(on_token)
+        if streamed and reset:
+            print(f"↩️ Replacing the streamed {names[streamed]} output with {names[pid]}'s")
+            reset()
+        on_token(text)
+
+    if not winner:
+        print("❌ No provider returned a valid response")
+        if fallback:
+            _deliver(*fallback)
+        return fallback and fallback[1]
+
+    pid, text, elapsed = winner
+    others = []
+    for other in providers:
+        if other == pid:
+            continue
+        if other not in progress:
+            others.append(f"{names[other]} not started")
+        elif "dropped" in progress[other]:
+            others.append(f"{names[other]} failed")
+        else:
+            p = progress[other]
+            others.append(f"{names[other]} cancelled after {elapsed - p['started']:.1f}s at {p['chars']} chars")
+    lead = elapsed - progress[pid]["started"]
+    print(f"🏆 {names[pid]} won in {elapsed:.1f}s ({lead:.1f}s of its own)" + (f" — {'; '.join(others)}" if others else ""))
+    _deliver(pid, text)
+    return text
+
+
+PATCH_FORMAT_PROMPT = """Output ONLY edits, one section per file you change, in this exact format:
+=== main.py ===
+<<<<<<< SEARCH
+exact lines copied from the current file
+=======
+the lines that replace them
+>>>>>>> REPLACE
+Use as many SEARCH/REPLACE blocks as needed. Keep each SEARCH short but unique and copy it exactly, including indentation.
+For a new file or requirements.txt, put the full content under its header without SEARCH/REPLACE markers.
+No explanations, no markdown."""
+
+WHOLE_FORMAT_PROMPT = """Output ONLY the updated code in this exact format:
+=== requirements.txt ===
+updated packages (if changed)
+=== main.py ===
+full updated code
+=== utils.py ===
+full updated code (if needed)
+No explanations, no markdown."""
+
+
+def get_fix_format(config=None):
+    if config is None:
+        config = load_config()
+    return config.get("fix_format", FIX_FORMAT)
+
 
+def _finish_fix(writer, fixed, fix_format, started):
+    writer.close(fixed)
+    tokens = len(fixed or "") // 4
+    if fix_format == "patch":
+        print(f"✏️ Applied {writer.edits} edits — ~{tokens} output tokens in {time.time() - started:.1f}s")
+        if writer.failed_edits:
+            return False
+    else:
+        print(f"📄 Rewrote {len(writer.written)} file(s) — ~{tokens} output tokens in {time.time() - started:.1f}s")
+    return True
 
-def ping_pong_fix(folder, error_log="", user_feedback="", use_browser_for_grok=False, browser_config=None, is_new_project=False, fixer_choice='2', selected_provider=None, config=None):
-    restart_ollama()
 
-    if user_feedback and user_feedback != "Make it perfect":
-        print("🔍 Expanding user feedback with Ollama...")
-        expand_feedback_prompt = f"""You are an expert app planner.
+def _packed_code(folder, error_text, provider_id, config=None, fix_format="patch"):
+    # Whole-file replies rewrite every file they were shown, so code left out
+    # of the context would be dropped; only patch fixes get a packed context.
+    budget = token_budget(provider_id, config) if fix_format == "patch" else None
+    packed, info = pack_context(folder, error_text, budget)
+    if info["sections"] is not None:
+        print(f"📦 Packed {info['sections']} relevant sections: ~{info['tokens']} of ~{info['total']} tokens")
+        packed += "\n\n(Lines marked '# ... N lines omitted ...' are existing code that was left out to save space.)"
+    return packed
+
+
+def idea_expansion_prompt(app_idea):
+    return f"""You are an expert software architect specializing in modern Python desktop apps using CustomTkinter.
+Use only CustomTkinter. Apply sleek glassmorphism dark theme with neon accents, gradients, glow borders, high corner radii.
+Expand this user request into a hyper-detailed specification.
+User request: {app_idea}"""
+
+
+def generation_prompt(expanded_idea):
+    return f"""You are an expert Python coder. Generate complete code using ONLY CustomTkinter.
+Use EXACTLY this skeleton—fill in the # UI code comment with ALL widgets/logic:
+import customtkinter as ctk
+class AppFrame(ctk.CTkFrame):
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        # UI code here using self as master
+Output ONLY the Python code for main.py, no explanations, no markdown.
+Use glassmorphism dark theme with neon accents.
+{expanded_idea}"""
+
+
+def expand_feedback(user_feedback):
+    if not user_feedback or user_feedback == "Make it perfect":
+        return user_feedback or "None"
+    print("🔍 Expanding user feedback with Ollama...")
+    expand_feedback_prompt = f"""You are an expert app planner.
 Expand this user improvement request into a clear, detailed specification update for the existing Python desktop app.
 User improvement request: {user_feedback}
 Output ONLY a concise but detailed description including:
@@ -122,22 +471,34 @@ Output ONLY a concise but detailed description including:
 - Important behavior or edge cases
 - Integration with existing functionality
 No code. No markdown. Plain text paragraphs."""
-        resp = ollama.chat(model=EXPAND_MODEL, messages=[{"role": "user", "content": expand_feedback_prompt}])
-        expanded_feedback = resp['message']['content'].strip()
-        print(" → Feedback expanded.\n")
-    else:
-        expanded_feedback = user_feedback or "None"
+    expanded = chat_ollama(EXPAND_MODEL, expand_feedback_prompt, request_class="fix").strip()
+    print(" → Feedback expanded.\n")
+    return expanded
+
 
-    code_summary = "\n\n".join([f"=== {fname} ===\n{code[:1000]}..." for fname, code in get_all_code(folder).items()])
+def ping_pong_fix(folder, error_log="", user_feedback="", use_browser_for_grok=False, browser_config=None, is_new_project=False, fixer_choice='2', selected_provider=None, config=None, on_token=None, use_cache=True, expanded_feedback=None, fix_format=None):
+    fix_format = fix_format or get_fix_format(config)
+    output_format = PATCH_FORMAT_PROMPT if fix_format == "patch" else WHOLE_FORMAT_PROMPT
+    started = time.time()
+
+    if expanded_feedback is None:
+        expanded_feedback = expand_feedback(user_feedback)
+
+    writer = StreamingFileWriter(folder, on_file=lambda fname, path, fallback: print(" ✓ Overwrote main.py" if fallback else f" ✓ Rewrote {fname}"))
+    tee = _tee_to_writer(writer, on_token)
 
     actual_provider = None
-    if fixer_choice == '2' and selected_provider and selected_provider != "ollama":
+    if fixer_choice == '2' and selected_provider == "hybrid" and get_race_settings(config)["enabled"]:
+        actual_provider = "hybrid"
+    elif fixer_choice == '2' and selected_provider and selected_provider != "ollama":
         actual_provider = get_fix_provider(selected_provider, config)
     elif fixer_choice == '2':
         actual_provider = "xai"
 
+    code_summary = _packed_code(folder, f"{error_log}\n{user_feedback}", actual_provider or "ollama", config, fix_format)
+
     if actual_provider and actual_provider != "ollama":
-        provider_name = LLM_PROVIDERS.get(actual_provider, {}).get("name", actual_provider)
+        provider_name = LLM_PROVIDERS.get(actual_provider, {}).get("name", actual_provider.capitalize())
         print(f"\n🧠 Using {provider_name} for fix...")
         user_prompt = f"""You are an expert Python coder. Update/fix this Python desktop app based on the current code, error log, and expanded feedback/spec update:
 
@@ -159,20 +520,15 @@ Before outputting code, think step-by-step:
 
 If info is insufficient, add minimal logical assumptions but note in comments.
 
-Output ONLY the updated code in this exact format:
-=== requirements.txt ===
-updated packages (if changed)
-=== main.py ===
-full updated code
-=== utils.py ===
-full updated code (if needed)
+{output_format}
 
 Make it fully runnable out-of-the-box, modern-looking, and error-free."""
 
         if actual_provider == "xai" and use_browser_for_grok:
             fixed = get_grok_response_via_browser(user_prompt, browser_config)
         else:
-            fixed = generate_code_with_provider(actual_provider, user_prompt, config, use_browser_for_grok, browser_config)
+            fixed = generate_code_with_provider(actual_provider, user_prompt, config, use_browser_for_grok, browser_config, tee, use_cache,
+                                                require_main=False, request_class="fix")
 
         if not fixed:
             print(f"Error: {provider_name} returned no response")
@@ -181,21 +537,15 @@ Make it fully runnable out-of-the-box, modern-looking, and error-free."""
     else:
         print(f"\n🔄 PING → Ollama fixer ({FIX_MODEL})")
         prompt = f"""You are the second half of the Gemini ping-pong system.
-Return ONLY clean Python code. NO markdown, NO ```, NO explanations.
 Current files:
 {code_summary}
 Last run:
 {error_log or "None"}
 User feedback (expanded):
 {expanded_feedback}
-Output ONLY in this exact format:
-=== filename.py ===
-full clean code here
-=== another.py ===
-full clean code here"""
+{output_format}"""
         try:
-            resp = ollama.chat(model=FIX_MODEL, messages=[{"role": "user", "content": prompt}])
-            fixed = resp['message']['content']
+            fixed = chat_ollama(FIX_MODEL, prompt, tee, use_cache, request_class="fix", config=config)
         except Exception as e:
             err_str = str(e)
             print(f"Fixer error: {err_str}")
@@ -203,68 +553,52 @@ full clean code here"""
                 print(f"⚠️ Model '{FIX_MODEL}' not installed. Run: ollama pull {FIX_MODEL}")
             return False
 
-    blocks = re.split(r'===\s*(.+?)\s*===', fixed)
-    if len(blocks) > 1:
-        for i in range(1, len(blocks), 2):
-            fname = blocks[i].strip()
-            content = blocks[i+1].strip()
-            content = re.sub(r'^```(?:python)?\s*\n', '', content, flags=re.IGNORECASE)
-            content = re.sub(r'\n```$', '', content)
-            with open(os.path.join(folder, fname), "w", encoding="utf-8") as f:
-                f.write(content)
-            print(f" ✓ Rewrote {fname}")
-    else:
-        with open(os.path.join(folder, "main.py"), "w", encoding="utf-8") as f:
-            f.write(fixed)
-        print(" ✓ Overwrote main.py")
+    if not _finish_fix(writer, fixed, fix_format, started):
+        print("↩️ Some edits did not apply — asking again for whole files")
+        return ping_pong_fix(folder, error_log, user_feedback, use_browser_for_grok, browser_config, is_new_project, fixer_choice,
+                             selected_provider, config, on_token, use_cache, expanded_feedback, fix_format="whole")
     return True
 
-def grok_syntax_rescue(folder, error, use_browser_for_grok=False, browser_config=None, selected_provider=None, config=None):
+def grok_syntax_rescue(folder, error, use_browser_for_grok=False, browser_config=None, selected_provider=None, config=None, on_token=None, use_cache=True, fix_format=None):
+    fix_format = fix_format or get_fix_format(config)
+    started = time.time()
     actual_provider = None
     if selected_provider and selected_provider not in ("ollama", "hybrid"):
         actual_provider = selected_provider
     elif selected_provider == "hybrid":
-        actual_provider = get_fix_provider("hybrid", config)
+        actual_provider = "hybrid" if get_race_settings(config)["enabled"] else get_fix_provider("hybrid", config, "syntax_rescue")
     else:
         actual_provider = "xai"
 
     if actual_provider == "ollama":
         actual_provider = "xai"
 
-    provider_name = LLM_PROVIDERS.get(actual_provider, {}).get("name", actual_provider)
+    provider_name = LLM_PROVIDERS.get(actual_provider, {}).get("name", actual_provider.capitalize())
     print(f"\n🛠️ Calling {provider_name} for syntax rescue...")
-    code_summary = "\n\n".join([f"=== {f} ===\n{c}" for f, c in get_all_code(folder).items()])
+    code_summary = _packed_code(folder, error, actual_provider, config, fix_format)
+
+    writer = StreamingFileWriter(folder, on_file=lambda fname, path, fallback: print(f" ✓ {provider_name} overwrote main.py" if fallback else f" ✓ {provider_name} fixed {fname}"))
+    tee = _tee_to_writer(writer, on_token)
 
     user_prompt = f"""Fix ONLY the syntax errors in this Python code. Do not change logic, just make it valid Python.
 Error:
 {error}
 Code:
 {code_summary}
-Return ONLY the corrected files in === filename.py === format. No explanations, no markdown."""
+{PATCH_FORMAT_PROMPT if fix_format == "patch" else "Return ONLY the corrected files in === filename.py === format. No explanations, no markdown."}"""
 
     if actual_provider == "xai" and use_browser_for_grok:
         fixed = get_grok_response_via_browser(user_prompt, browser_config)
     else:
-        fixed = generate_code_with_provider(actual_provider, user_prompt, config, use_browser_for_grok, browser_config)
+        fixed = generate_code_with_provider(actual_provider, user_prompt, config, use_browser_for_grok, browser_config, tee, use_cache,
+                                            require_main=False, request_class="syntax_rescue")
 
     if not fixed:
         print(f"Error: {provider_name} returned no response for syntax rescue")
         return
 
-    blocks = re.split(r'===\s*(.+?)\s*===', fixed)
-    if len(blocks) > 1:
-        for i in range(1, len(blocks), 2):
-            fname = blocks[i].strip()
-            content = blocks[i+1].strip()
-            content = re.sub(r'^```(?:python)?\s*\n', '', content, flags=re.IGNORECASE)
-            content = re.sub(r'\n```$', '', content)
-            with open(os.path.join(folder, fname), "w", encoding="utf-8") as f:
-                f.write(content)
-            print(f" ✓ {provider_name} fixed {fname}")
-    else:
-        content = blocks[0].strip() if blocks else fixed
-        with open(os.path.join(folder, "main.py"), "w", encoding="utf-8") as f:
-            f.write(content)
-        print(f" ✓ {provider_name} overwrote main.py")
+    if not _finish_fix(writer, fixed, fix_format, started):
+        print("↩️ Some edits did not apply — asking again for whole files")
+        return grok_syntax_rescue(folder, error, use_browser_for_grok, browser_config, selected_provider, config, on_token, use_cache, fix_format="whole")
 
     print(f"✅ {provider_name} syntax rescue complete.")
@@ -2,18 +2,13 @@ import os
 import json
 import subprocess
 import time
-import requests
-import ollama
 import tempfile
 import random
 import shutil
 
-try:
-    import pyautogui
-except Exception:
-    pyautogui = None
-
 from config import BROWSER_CMD_TEMPLATE, WINDSCRIBE_DOWNLOAD_URL, WINDSCRIBE_INSTALLER, WINDSCRIBE_CLI, ROTATION_FILE, VISION_MODEL
+from llm_clients import get_ollama_client
+import local_scheduler
 try:
     from utils import get_offset_pos, human_like_mouse_move, gaussian_delay, optional_human_noise, paste_text
 except Exception:
@@ -25,6 +20,7 @@ def is_windscribe_installed():
 
 def download_windscribe_installer():
     print("Downloading Windscribe installer...")
+    import requests
     response = requests.get(WINDSCRIBE_DOWNLOAD_URL, stream=True)
     with open(WINDSCRIBE_INSTALLER, 'wb') as f:
         shutil.copyfileobj(response.raw, f)
@@ -98,6 +94,8 @@ def get_grok_response_via_browser(user_prompt, config):
     print(f"Using profile: {profile_path}")
     input("Press Enter once loaded/ready...")
 
+    import pyautogui
+    import pyperclip
     current_x, current_y = pyautogui.position()
 
     ix, iy = get_offset_pos(INPUT_X, INPUT_Y, OFFSET_RADIUS)
@@ -124,7 +122,8 @@ def get_grok_response_via_browser(user_prompt, config):
 - If response is long and needs expansion (down button visible), stage: needs_expand, action: click_down
 Output in JSON format: {"stage": "generating/complete/needs_expand", "action": "wait/click_copy/click_down"}"""
 
-        res = ollama.chat(model=VISION_MODEL, messages=[{'role': 'user', 'content': vision_prompt, 'images': [img_path]}])
+        with local_scheduler.slot("generate"):
+            res = get_ollama_client().chat(model=VISION_MODEL, messages=[{'role': 'user', 'content': vision_prompt, 'images': [img_path]}])
         response_content = res['message']['content'].strip()
         os.remove(img_path)
 
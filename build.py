@@ -52,6 +52,9 @@ def build():
         "idna",
         "sniffio",
         "h11",
+        "h2",
+        "hpack",
+        "hyperframe",
         "pydantic",
         "tqdm",
     ]
@@ -92,6 +95,11 @@ def build():
         projects_dir = os.path.join(dist_path, "projects")
         os.makedirs(projects_dir, exist_ok=True)
         print(f"  Created projects folder: {projects_dir}")
+
+        if "--bench" in sys.argv:
+            exe = os.path.join(dist_path, app_name + (".exe" if os.name == "nt" else ""))
+            print(f"\n[BENCH] Measuring frozen startup: {exe}")
+            sys.exit(subprocess.call([sys.executable, "startup_bench.py", "--frozen", exe]))
     else:
         print()
         print("=" * 60)
@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import gemini_folder, ensure_dirs, load_config, EXPAND_MODEL, CACHE_DIR
+from ai_functions import (chat_ollama, generate_code_with_provider, get_generation_provider, get_race_settings,
+                          idea_expansion_prompt, generation_prompt, GenerationCancelled)
+from file_blocks import StreamingFileWriter, validate_blocks
+from project_files import project_name, list_project_files
+from fix_engine import get_fix_settings, smoke_test
+from llm_clients import close_all_clients
+import dep_store
+import wheelhouse
+import model_residency
+import local_scheduler
+
+# Headless batch mode: every idea in a file goes through the same pipeline as
+# the GUI's Create button (expand -> generate -> write -> validate -> deps ->
+# smoke run) on a pool of workers. Each idea gets a JSON report under the
+# batch folder and batch.json records which ideas are finished, so an
+# interrupted run picks up where it stopped. Local model calls still go
+# through the scheduler, so workers overlap cloud generation, installs and
+# smoke runs rather than Qwen requests.
+BATCH_DIR = os.path.join(CACHE_DIR, "batches")
+FINISHED = ("passed", "unverified", "failed")
+
+_lock = threading.Lock()
+
+
+class StepFailed(Exception):
+    pass
+
+
+def read_ideas(path):
+    # One idea per line; blank lines and # comments are skipped.
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def idea_key(idea):
+    return hashlib.sha1(idea.encode("utf-8")).hexdigest()[:12]
+
+
+def _write_json(path, data):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _load_progress(batch_dir):
+    try:
+        with open(os.path.join(batch_dir, "batch.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"ideas": {}}
+
+
+def _record(batch_dir, progress, key, status, report_path=None):
+    with _lock:
+        progress["ideas"][key] = {"status": status, "report": report_path, "at": time.time()}
+        _write_json(os.path.join(batch_dir, "batch.json"), progress)
+
+
+def _step(report, name, run):
+    start = time.time()
+    entry = {"step": name, "status": "ok", "seconds": 0.0, "detail": ""}
+    report["steps"].append(entry)
+    try:
+        result = run()
+    except StepFailed as e:
+        entry["status"], entry["detail"] = "failed", str(e)
+        raise
+    except GenerationCancelled:
+        entry["status"] = "cancelled"
+        raise
+    except Exception as e:
+        entry["status"], entry["detail"] = "failed", f"{type(e).__name__}: {e}"
+        raise StepFailed(entry["detail"])
+    finally:
+        entry["seconds"] = round(time.time() - start, 2)
+    return result
+
+
+def build_idea(idea, out_dir, provider, config, settings, label=""):
+    key = idea_key(idea)
+    folder = os.path.join(out_dir, f"{project_name(idea)[:53]}-{key[:6]}")
+    report = {"idea": idea, "key": key, "project": folder, "provider": provider, "status": "failed",
+              "failed_step": None, "steps": [], "files": [],
+              "started_at": datetime.datetime.now().isoformat(timespec="seconds")}
+    started = time.time()
+    pip_cmd = [sys.executable, "-m", "pip"]
+    state = {}
+
+    def expand():
+        text = chat_ollama(EXPAND_MODEL, idea_expansion_prompt(idea), request_class="expand", config=config).strip()
+        if not text:
+            raise StepFailed("empty expansion")
+        return text
+
+    def generate():
+        # Start from an empty folder so a retry doesn't keep modules from the failed attempt.
+        shutil.rmtree(folder, ignore_errors=True)
+        os.makedirs(folder, exist_ok=True)
+        state["writer"] = StreamingFileWriter(folder)
+        raw = generate_code_with_provider(provider, generation_prompt(state["expanded"]), config,
+                                          on_token=state["writer"].feed)
+        if not raw:
+            raise StepFailed("no response")
+        return raw
+
+    def write():
+        written = state["writer"].close(state["raw"])
+        if not written:
+            raise StepFailed("no files in response")
+        return written
+
+    def validate():
+        ok, reason = validate_blocks(state["raw"])
+        if not ok:
+            raise StepFailed(reason)
+        for rel in list_project_files(folder):
+            with open(os.path.join(folder, rel), "r", encoding="utf-8", errors="ignore") as f:
+                compile(f.read(), rel, "exec")
+
+    def deps():
+        ok, err, deps_dir, reused = dep_store.ensure_project_deps(folder, pip_cmd, timeout=300,
+                                                                  index_args=wheelhouse.pip_index_args(config))
+        if not ok:
+            raise StepFailed(f"install failed: {err[-600:]}")
+        report["deps_reused"] = reused
+        return deps_dir
+
+    def smoke():
+        result, detail = smoke_test(folder, state["deps_dir"], settings)
+        if result == "failed":
+            raise StepFailed(detail)
+        return result
+
+    try:
+        print(f"🚀 {label} {idea[:70]}")
+        state["expanded"] = _step(report, "expand", expand)
+        state["raw"] = _step(report, "generate", generate)
+        report["files"] = _step(report, "write", write)
+        _step(report, "validate", validate)
+        state["deps_dir"] = _step(report, "deps", deps)
+        smoke_result = _step(report, "smoke", smoke)
+        report["status"] = "passed" if smoke_result == "ok" else "unverified"
+        if smoke_result == "skipped":
+            report["steps"][-1]["detail"] = "no display to run the app against"
+    except StepFailed:
+        report["failed_step"] = report["steps"][-1]["step"]
+    except GenerationCancelled:
+        report["status"] = "cancelled"
+    report["seconds"] = round(time.time() - started, 1)
+    report["finished_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+    icon = {"passed": "✅", "unverified": "🟡", "cancelled": "⏹️"}.get(report["status"], "❌")
+    where = f" at {report['failed_step']}: {report['steps'][-1]['detail'][:200]}" if report["failed_step"] else ""
+    print(f"{icon} {label} {report['status']} in {report['seconds']:.0f}s{where}")
+    return report
+
+
+def run_batch(ideas_path, out_dir, workers, provider=None, retry_failed=False, limit=None):
+    config = load_config()
+    settings = get_fix_settings(config)
+    name = os.path.splitext(os.path.basename(ideas_path))[0]
+    batch_dir = os.path.join(BATCH_DIR, name)
+    os.makedirs(batch_dir, exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
+
+    ideas = list(dict.fromkeys(read_ideas(ideas_path)))
+    progress = _load_progress(batch_dir)
+    skip = ("passed", "unverified") if retry_failed else FINISHED
+    todo = [i for i in ideas if progress["ideas"].get(idea_key(i), {}).get("status") not in skip]
+    done = len(ideas) - len(todo)
+    if limit:
+        todo = todo[:limit]
+    print(f"📋 {len(ideas)} ideas · {done} already done · {len(todo)} to build · {workers} workers")
+    if not todo:
+        return summarize(batch_dir, ideas, progress)
+
+    selected = provider or config.get("selected_llm", "hybrid")
+    gen_provider = "hybrid" if selected == "hybrid" and get_race_settings(config)["enabled"] else get_generation_provider(selected, config)
+    model_residency.configure(config)
+    local_scheduler.configure(config)
+    if not model_residency.wait_ready():
+        print("❌ Ollama API is not reachable; it is needed to expand ideas")
+        return None
+    model_residency.preload(EXPAND_MODEL)
+
+    def _one(n, idea):
+        key = idea_key(idea)
+        _record(batch_dir, progress, key, "running")
+        report = build_idea(idea, out_dir, gen_provider, config, settings, f"[{n}/{len(todo)}]")
+        path = os.path.join(batch_dir, f"{key}.json")
+        _write_json(path, report)
+        _record(batch_dir, progress, key, report["status"], path)
+        return report
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        futures = [pool.submit(_one, n, idea) for n, idea in enumerate(todo, 1)]
+        for future in as_completed(futures):
+            future.result()
+    except KeyboardInterrupt:
+        print("⏹️ Interrupted — unfinished ideas will be rebuilt on the next run")
+        pool.shutdown(wait=False, cancel_futures=True)
+        local_scheduler.cancel()
+        raise
+    pool.shutdown()
+    return summarize(batch_dir, ideas, progress)
+
+
+def summarize(batch_dir, ideas, progress):
+    counts = {}
+    rows = []
+    for idea in ideas:
+        entry = progress["ideas"].get(idea_key(idea), {})
+        status = entry.get("status", "pending")
+        counts[status] = counts.get(status, 0) + 1
+        rows.append({"idea": idea, "key": idea_key(idea), "status": status, "report": entry.get("report")})
+    summary = {"counts": counts, "ideas": rows, "generated_at": datetime.datetime.now().isoformat(timespec="seconds")}
+    _write_json(os.path.join(batch_dir, "summary.json"), summary)
+    print("📊 " + " · ".join(f"{n} {status}" for status, n in sorted(counts.items())) +
+          f"\n   Reports: {batch_dir}")
+    return summary
+
+
+if __name__ == "__main__":
+    ensure_dirs()
+    parser = argparse.ArgumentParser(description="Build apps without the GUI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    batch = sub.add_parser("batch", help="expand, generate, install and smoke-run every idea in a file")
+    batch.add_argument("ideas", help="text file with one app idea per line")
+    batch.add_argument("--out", default=gemini_folder, help="folder for the generated projects")
+    batch.add_argument("--workers", type=int, default=2)
+    batch.add_argument("--provider", help="generation provider (ollama, xai, openai, anthropic, google or hybrid)")
+    batch.add_argument("--retry-failed", action="store_true", help="rebuild ideas that failed in an earlier run")
+    batch.add_argument("--limit", type=int, help="build at most this many ideas in this run")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "batch":
+            summary = run_batch(args.ideas, os.path.abspath(args.out), args.workers, args.provider,
+                                args.retry_failed, args.limit)
+            ok = summary is not None and set(summary["counts"]) <= {"passed", "unverified"}
+            sys.exit(0 if ok else 1)
+    finally:
+        model_residency.release_all()
+        close_all_clients()
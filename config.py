@@ -42,6 +42,138 @@ LLM_PROVIDERS = {
     },
 }
 
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://127.0.0.1:11434")
+
+LLM_POOL_SETTINGS = {
+    "http2": True,
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 300.0,
+    "timeout": 120.0,
+    "connect_timeout": 10.0,
+    "max_retries": 2,
+}
+
+LLM_CACHE_SETTINGS = {
+    "enabled": True,
+    "max_bytes": 64 * 1024 * 1024,
+    "ttl_seconds": 7 * 24 * 3600,
+}
+
+# Hybrid mode sends the same prompt to several providers and keeps the first
+# valid answer. A provider is only added after hedge_delay seconds without a
+# winner (0 starts them all at once) or as soon as an earlier one fails.
+HYBRID_RACE_SETTINGS = {
+    "enabled": True,
+    "max_providers": 3,
+    "hedge_delay": 8.0,
+    "per_provider_concurrency": 2,
+    "include_ollama": False,
+}
+
+ROUTER_SETTINGS = {
+    "window": 50,
+    "failure_threshold": 3,
+    "cooldown": 60.0,
+    "max_cooldown": 900.0,
+    "unknown_latency": 30.0,
+}
+
+# Fixes are requested from several fixers at once, each written to its own
+# sandbox under .candidates/ and smoke-run headless before the best one wins.
+FIX_ENGINE_SETTINGS = {
+    "max_candidates": 3,
+    "grace_seconds": 15.0,
+    "smoke_seconds": 2.0,
+    "smoke_timeout": 60,
+    "timeout": 600,
+}
+
+# Successful fixes are remembered by crash signature and replayed (and
+# verified like any other candidate) before asking a model again.
+FIX_MEMORY_SETTINGS = {
+    "enabled": True,
+    "max_entries": 500,
+    "max_patches": 3,
+    "max_changed_lines": 40,
+}
+
+# Local models stay loaded in Ollama between requests (keep_alive -1 pins
+# them) and are unloaded by the builder only when free system memory drops
+# below min_free_mb. On exit they fall back to keep_alive_on_exit.
+OLLAMA_RESIDENCY_SETTINGS = {
+    "keep_alive": -1,
+    "keep_alive_on_exit": "10m",
+    "ready_timeout": 60,
+    "start_server": True,
+    "check_interval": 10,
+    "min_free_mb": 2048,
+    "ttft_window": 20,
+}
+
+# Requests to the local model are queued by priority (interactive >
+# generation > fix > background); max_concurrent run at once. A running
+# request in a preemptible class is cancelled when a higher class has to wait.
+LOCAL_SCHEDULER_SETTINGS = {
+    "max_concurrent": 1,
+    "preemptible": ["background"],
+    "wait_window": 50,
+}
+
+# Suggestion bubbles come from an on-disk pool. It is refilled in the
+# background once fewer than min_fresh unseen ideas are left, and only after
+# the local model has been idle for idle_seconds.
+SUGGESTION_POOL_SETTINGS = {
+    "size": 24,
+    "min_fresh": 8,
+    "max_shows": 2,
+    "idle_seconds": 20,
+    "retry_delay": 60,
+}
+
+# The preview runs in a separate interpreter embedded into the builder window.
+# Hosts are started ahead of time with customtkinter already imported; one
+# that doesn't load, stops sending heartbeats or exceeds memory_mb is killed.
+# Edits to the project are picked up by a file watcher and hot-reloaded once
+# they have been quiet for reload_debounce seconds.
+PREVIEW_HOST_SETTINGS = {
+    "pool_size": 1,
+    "load_timeout": 20,
+    "hang_timeout": 5,
+    "heartbeat": 0.5,
+    "memory_mb": 1024,
+    "reload_debounce": 0.3,
+    "poll_interval": 0.5,
+}
+
+# Log lines are queued and drained into the log widgets fps times a second;
+# each widget keeps only its last max_lines lines. Everything is mirrored to
+# LOG_DIR/builder.log, rotated at max_bytes.
+LOG_SETTINGS = {
+    "fps": 20,
+    "max_lines": 3000,
+    "max_bytes": 2 * 1024 * 1024,
+    "backups": 3,
+}
+
+# Cold-start budgets enforced by startup_bench.py: cumulative `import main`
+# time from -X importtime, and time until the first window is drawn for the
+# source tree and for the frozen PyInstaller build.
+STARTUP_BUDGETS = {
+    "import_ms": 1500,
+    "window_ms": 4000,
+    "frozen_window_ms": 6000,
+}
+
+# "patch" asks fixers for SEARCH/REPLACE edits; "whole" for complete files.
+FIX_FORMAT = "patch"
+
+# Token budget for the code section of fix prompts, by model.
+CONTEXT_TOKEN_BUDGETS = {
+    FIX_MODEL: 6000,
+    "default": 24000,
+}
+
 BROWSER_CMD_TEMPLATE = 'start chrome --user-data-dir="{profile_path}" https://grok.com/'
 WINDSCRIBE_DOWNLOAD_URL = "https://assets.windscribe.com/desktop/windows/latest/Windscribe.exe"
 WINDSCRIBE_INSTALLER = "Windscribe.exe"
@@ -58,10 +190,18 @@ CONFIG_FILE = os.path.join(APP_DIR, "grok_automation_config.json")
 ROTATION_FILE = os.path.join(APP_DIR, "grok_profile_rotation.json")
 
 gemini_folder = os.path.join(APP_DIR, "projects")
-os.makedirs(gemini_folder, exist_ok=True)
+
+DEP_STORE_DIR = os.path.join(APP_DIR, "dep_store")
+CACHE_DIR = os.path.join(APP_DIR, ".cache")
+WHEELHOUSE_DIR = os.path.join(APP_DIR, "wheelhouse")
+LOG_DIR = os.path.join(APP_DIR, "logs")
 
 DEFAULT_XAI_API_KEY = "xai-"
 
+def ensure_dirs():
+    # Called by entry points at startup; importing config has no side effects.
+    os.makedirs(gemini_folder, exist_ok=True)
+
 def load_config():
     if os.path.exists(CONFIG_FILE):
         with open(CONFIG_FILE, 'r') as f:
@@ -95,7 +235,11 @@ def get_xai_api_key():
         return llm_keys["xai"]
     return DEFAULT_XAI_API_KEY
 
-XAI_API_KEY = get_xai_api_key()
+def __getattr__(name):
+    # XAI_API_KEY reads the config file, so it is resolved on first access.
+    if name == "XAI_API_KEY":
+        return get_xai_api_key()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_available_providers(config):
     available = ["ollama"]
@@ -12,6 +12,7 @@ ACCENT_PURPLE = "#a855f7"
 ACCENT_GREEN = "#4ade80"
 ACCENT_CYAN = "#22d3ee"
 ACCENT_BLUE = "#3b82f6"
+ACCENT_RED = "#f87171"
 
 GLOW_PURPLE = "#c084fc"
 GLOW_GREEN = "#86efac"
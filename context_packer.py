@@ -0,0 +1,165 @@
+import re
+import ast
+
+from config import CONTEXT_TOKEN_BUDGETS, FIX_MODEL, LLM_PROVIDERS
+from project_files import iter_project_sources
+
+# Builds the "current code" section of fix prompts. Small projects are sent
+# whole; larger ones are cut into top-level functions, classes/methods and
+# module-level code, ranked by how close they are to the error, and packed
+# into the model's token budget. Omitted ranges are marked so the model
+# knows the code exists.
+FRAME_RE = re.compile(r'File "([^"]+)", line (\d+)')
+IDENT_RE = re.compile(r'\b[A-Za-z_][A-Za-z0-9_]{2,}\b')
+BIG_CLASS_LINES = 80
+WINDOW_LINES = 40
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def token_budget(provider_id, config=None):
+    budgets = dict(CONTEXT_TOKEN_BUDGETS)
+    if config:
+        budgets.update(config.get("context_budgets", {}))
+    model = FIX_MODEL if provider_id == "ollama" else LLM_PROVIDERS.get(provider_id, {}).get("model")
+    return budgets.get(model, budgets["default"])
+
+
+def parse_frames(error_log, files):
+    # -> [(rel_path, line)] for traceback frames that point into the project,
+    # innermost frame last as in the traceback itself.
+    frames = []
+    for path, line in FRAME_RE.findall(error_log or ""):
+        path = path.replace("\\", "/")
+        for rel in files:
+            if path == rel or path.endswith("/" + rel):
+                frames.append((rel, int(line)))
+                break
+    return frames
+
+
+def _names_used(node):
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            names.add(child.id)
+        elif isinstance(child, ast.Attribute):
+            names.add(child.attr)
+    return names
+
+
+def _units(rel, code):
+    # -> list of dicts: rel, start, end (1-based, inclusive), name, kind, uses
+    lines = code.splitlines()
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return [{"rel": rel, "start": i + 1, "end": min(i + WINDOW_LINES, len(lines)), "name": None,
+                 "kind": "window", "uses": set()} for i in range(0, len(lines), WINDOW_LINES)]
+    units = []
+    covered = set()
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        end = node.end_lineno
+        covered.update(range(start, end + 1))
+        methods = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        if isinstance(node, ast.ClassDef) and end - start >= BIG_CLASS_LINES and methods:
+            first = min([methods[0].lineno] + [d.lineno for d in methods[0].decorator_list])
+            units.append({"rel": rel, "start": start, "end": first - 1, "name": node.name,
+                          "kind": "class", "uses": set()})
+            for m in methods:
+                m_start = min([m.lineno] + [d.lineno for d in m.decorator_list])
+                units.append({"rel": rel, "start": m_start, "end": m.end_lineno, "name": m.name,
+                              "kind": "method", "owner": node.name, "uses": _names_used(m)})
+        else:
+            units.append({"rel": rel, "start": start, "end": end, "name": node.name,
+                          "kind": "def", "uses": _names_used(node)})
+    # Module-level code between definitions (imports, constants, __main__ guard).
+    run_start = None
+    for i in range(1, len(lines) + 2):
+        inside = i in covered or i > len(lines)
+        if not inside and run_start is None:
+            run_start = i
+        elif inside and run_start is not None:
+            if any(l.strip() for l in lines[run_start - 1:i - 1]):
+                units.append({"rel": rel, "start": run_start, "end": i - 1, "name": None,
+                              "kind": "module", "uses": set()})
+            run_start = None
+    return units
+
+
+def _score(unit, frames, error_words, hot_names, hot_classes, frame_files):
+    score = 0
+    for idx, (rel, line) in enumerate(frames):
+        if rel == unit["rel"] and unit["start"] <= line <= unit["end"]:
+            score = max(score, 100 + idx)
+        elif unit["kind"] == "window" and rel == unit["rel"] and abs(line - unit["start"]) <= WINDOW_LINES:
+            score = max(score, 90)
+    if unit["kind"] == "class" and unit["name"] in hot_classes:
+        score = max(score, 80)
+    if unit["kind"] == "module":
+        score = max(score, 60 if unit["rel"] in frame_files else 30)
+    if unit["name"] and unit["name"] in error_words:
+        score = max(score, 50)
+    if unit["name"] and unit["name"] in hot_names:
+        score = max(score, 40)
+    if unit["name"] == "AppFrame" or (unit.get("owner") == "AppFrame" and unit["name"] == "__init__"):
+        score = max(score, 35)
+    if not score:
+        score = 10 if unit["rel"] == "main.py" else 5
+    return score
+
+
+def _render(sources, chosen):
+    parts = []
+    for rel, code in sources.items():
+        lines = code.splitlines()
+        ranges = sorted((u["start"], u["end"]) for u in chosen if u["rel"] == rel)
+        out = []
+        cursor = 1
+        for start, end in ranges + [(len(lines) + 1, len(lines))]:
+            gap = lines[cursor - 1:start - 1]
+            if any(l.strip() for l in gap):
+                out.append(f"# ... {len(gap)} lines omitted ...")
+            else:
+                out.extend(gap)
+            out.extend(lines[max(start, cursor) - 1:end])
+            cursor = max(cursor, end + 1)
+        parts.append(f"=== {rel} ===\n" + "\n".join(out))
+    return "\n\n".join(parts)
+
+
+def pack_context(folder, error_log="", budget=6000):
+    # budget=None always sends every file whole.
+    sources = dict(iter_project_sources(folder))
+    full = "\n\n".join(f"=== {rel} ===\n{code}" for rel, code in sources.items())
+    total = estimate_tokens(full)
+    if budget is None or total <= budget:
+        return full, {"tokens": total, "total": total, "sections": None}
+
+    files = list(sources)
+    frames = parse_frames(error_log, files)
+    error_words = set(IDENT_RE.findall(error_log or ""))
+    units = [u for rel, code in sources.items() for u in _units(rel, code)]
+    hit = [u for u in units if any(rel == u["rel"] and u["start"] <= line <= u["end"] for rel, line in frames)]
+    hot_names = set().union(*(u["uses"] for u in hit)) if hit else set()
+    hot_classes = {u.get("owner") for u in hit if u.get("owner")}
+    frame_files = {rel for rel, _ in frames}
+    for u in units:
+        u["score"] = _score(u, frames, error_words, hot_names, hot_classes, frame_files)
+
+    chosen = []
+    used = sum(estimate_tokens(f"=== {rel} ===\n# ... omitted ...\n") for rel in files)
+    for u in sorted(units, key=lambda u: (-u["score"], u["rel"], u["start"])):
+        lines = sources[u["rel"]].splitlines()[u["start"] - 1:u["end"]]
+        cost = estimate_tokens("\n".join(lines)) + 8
+        if used + cost > budget:
+            continue
+        chosen.append(u)
+        used += cost
+    packed = _render(sources, chosen)
+    return packed, {"tokens": estimate_tokens(packed), "total": total, "sections": len(chosen)}
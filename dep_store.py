@@ -0,0 +1,214 @@
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import platform
+import subprocess
+
+from config import DEP_STORE_DIR
+
+# Content-addressed package store shared by every generated project. Each
+# entry is a `pip install --target` tree keyed by the normalized requirement
+# set plus interpreter, so projects with the same requirements share a single
+# copy. A project points at its entry through a small link file instead of
+# owning a private deps/ folder.
+LINK_FILE = "deps.link"
+LOCK_FILE = "deps.lock"
+COMPLETE_MARKER = ".complete"
+GC_GRACE_SECONDS = 3600
+
+
+def normalize_requirement(line):
+    line = line.split("#", 1)[0].strip()
+    if not line or line.startswith("-"):
+        return None
+    m = re.match(r'^([A-Za-z0-9][A-Za-z0-9._-]*)(.*)$', line)
+    if not m:
+        return line
+    name = re.sub(r'[-_.]+', '-', m.group(1)).lower()
+    return name + re.sub(r'\s+', '', m.group(2))
+
+
+def read_requirements(folder):
+    req_path = os.path.join(folder, "requirements.txt")
+    reqs = set()
+    if os.path.exists(req_path):
+        with open(req_path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                req = normalize_requirement(line)
+                if req:
+                    reqs.add(req)
+    return sorted(reqs)
+
+
+def requirement_key(requirements):
+    h = hashlib.sha256()
+    h.update(f"{sys.version_info.major}.{sys.version_info.minor}|{sys.platform}|{platform.machine()}\n".encode())
+    for req in requirements:
+        h.update(req.encode() + b"\n")
+    return h.hexdigest()[:32]
+
+
+def store_path(key):
+    return os.path.join(DEP_STORE_DIR, key)
+
+
+def is_ready(key):
+    return os.path.exists(os.path.join(store_path(key), COMPLETE_MARKER))
+
+
+def begin_install(key):
+    os.makedirs(DEP_STORE_DIR, exist_ok=True)
+    staging = os.path.join(DEP_STORE_DIR, f"{key}.tmp-{uuid.uuid4().hex[:8]}")
+    os.makedirs(staging)
+    return staging
+
+
+def finish_install(key, staging, requirements, replace=False):
+    with open(os.path.join(staging, COMPLETE_MARKER), "w", encoding="utf-8") as f:
+        json.dump({"requirements": requirements, "python": sys.version.split()[0], "created": time.time()}, f)
+    final = store_path(key)
+    retired = None
+    if replace and os.path.exists(final):
+        retired = f"{final}.old-{uuid.uuid4().hex[:8]}"
+        os.replace(final, retired)
+    try:
+        os.replace(staging, final)
+    except OSError:
+        # Another install of the same requirement set finished first.
+        shutil.rmtree(staging, ignore_errors=True)
+    if retired:
+        shutil.rmtree(retired, ignore_errors=True)
+    return final
+
+
+def abort_install(staging):
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def installed_versions(deps_dir):
+    versions = {}
+    try:
+        names = os.listdir(deps_dir)
+    except OSError:
+        return versions
+    for name in names:
+        if name.endswith(".dist-info"):
+            dist, _, version = name[:-len(".dist-info")].partition("-")
+            versions[re.sub(r'[-_.]+', '-', dist).lower()] = version
+    return versions
+
+
+def write_lock(folder, key):
+    lock = {
+        "key": key,
+        "requirements": read_requirements(folder),
+        "installed": installed_versions(store_path(key)),
+        "locked": time.time(),
+    }
+    with open(os.path.join(folder, LOCK_FILE), "w", encoding="utf-8") as f:
+        json.dump(lock, f, indent=2)
+    return lock
+
+
+def lock_matches(folder, key):
+    try:
+        with open(os.path.join(folder, LOCK_FILE), "r", encoding="utf-8") as f:
+            lock = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if lock.get("key") != key or read_link(folder) != key or not is_ready(key):
+        return False
+    return lock.get("installed") == installed_versions(store_path(key))
+
+
+def link_project(folder, key):
+    with open(os.path.join(folder, LINK_FILE), "w", encoding="utf-8") as f:
+        json.dump({"key": key, "path": store_path(key)}, f)
+    write_lock(folder, key)
+    legacy = os.path.join(folder, "deps")
+    if os.path.isdir(legacy):
+        shutil.rmtree(legacy, ignore_errors=True)
+    return store_path(key)
+
+
+def read_link(folder):
+    try:
+        with open(os.path.join(folder, LINK_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("key")
+    except (OSError, ValueError):
+        return None
+
+
+def resolve_deps_dir(folder):
+    key = read_link(folder)
+    if key and is_ready(key):
+        return store_path(key)
+    deps_dir = os.path.join(folder, "deps")
+    os.makedirs(deps_dir, exist_ok=True)
+    return deps_dir
+
+
+def ensure_project_deps(folder, pip_cmd, timeout=300, refresh=False, index_args=()):
+    requirements = read_requirements(folder)
+    key = requirement_key(requirements)
+    if not refresh:
+        if lock_matches(folder, key):
+            return True, "", store_path(key), True
+        if is_ready(key):
+            return True, "", link_project(folder, key), True
+    staging = begin_install(key)
+    if not requirements:
+        finish_install(key, staging, requirements, replace=refresh)
+        return True, "", link_project(folder, key), False
+    upgrade = ["--upgrade"] if refresh else []
+    try:
+        result = subprocess.run(pip_cmd + ["install", "--target", staging, "--quiet"] + list(index_args) + upgrade + requirements,
+                                cwd=folder, timeout=timeout, capture_output=True, text=True)
+    except Exception:
+        abort_install(staging)
+        raise
+    if result.returncode != 0:
+        abort_install(staging)
+        return False, result.stderr or "Unknown install error", resolve_deps_dir(folder), False
+    finish_install(key, staging, requirements, replace=refresh)
+    return True, "", link_project(folder, key), False
+
+
+def _referenced_keys(projects_root):
+    keys = set()
+    if not os.path.isdir(projects_root):
+        return keys
+    for name in os.listdir(projects_root):
+        project = os.path.join(projects_root, name)
+        for folder in (project, os.path.join(project, ".pending")):
+            key = read_link(folder)
+            if key:
+                keys.add(key)
+    return keys
+
+
+def gc_store(projects_root, grace_seconds=GC_GRACE_SECONDS):
+    if not os.path.isdir(DEP_STORE_DIR):
+        return []
+    keep = _referenced_keys(projects_root)
+    now = time.time()
+    removed = []
+    for name in os.listdir(DEP_STORE_DIR):
+        path = os.path.join(DEP_STORE_DIR, name)
+        key = name.split(".", 1)[0]
+        if key in keep and "." not in name:
+            continue
+        try:
+            age = now - os.path.getmtime(path)
+        except OSError:
+            continue
+        if age < grace_seconds:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(name)
+    return removed
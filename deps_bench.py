@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+import dep_store
+
+# Launch dependency benchmark. Each launch used to run
+# `pip install --upgrade --target deps -r requirements.txt`; now a launch
+# whose requirements and installed versions match deps.lock skips pip. The
+# store is kept in a temp folder so the builder's own dep_store is left
+# alone. pip needs an index (or --find-links) for the requirements given.
+PIP = [sys.executable, "-m", "pip"]
+
+
+def _timed(run):
+    start = time.perf_counter()
+    result = run()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def old_launch(folder, index_args, timeout):
+    result = subprocess.run(PIP + ["install", "--upgrade", "--target", os.path.join(folder, "deps"), "--quiet"]
+                            + index_args + ["-r", "requirements.txt"],
+                            cwd=folder, timeout=timeout, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-1000:])
+
+
+def new_launch(folder, index_args, timeout):
+    ok, err, _, reused = dep_store.ensure_project_deps(folder, PIP, timeout=timeout, index_args=index_args)
+    if not ok:
+        raise RuntimeError(err[-1000:])
+    return reused
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time launch dependency checks with and without deps.lock.")
+    parser.add_argument("requirements", nargs="*", default=["customtkinter"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--find-links", help="install from this folder of wheels instead of the index")
+    parser.add_argument("--timeout", type=int, default=300)
+    args = parser.parse_args()
+    index_args = ["--no-index", "--find-links", args.find_links] if args.find_links else []
+
+    work = tempfile.mkdtemp(prefix="deps-bench-")
+    try:
+        dep_store.DEP_STORE_DIR = os.path.join(work, "store")
+        old_folder, new_folder = os.path.join(work, "old"), os.path.join(work, "new")
+        for folder in (old_folder, new_folder):
+            os.makedirs(folder)
+            with open(os.path.join(folder, "requirements.txt"), "w", encoding="utf-8") as f:
+                f.write("\n".join(args.requirements) + "\n")
+
+        first_old, _ = _timed(lambda: old_launch(old_folder, index_args, args.timeout))
+        first_new, _ = _timed(lambda: new_launch(new_folder, index_args, args.timeout))
+        old = [_timed(lambda: old_launch(old_folder, index_args, args.timeout))[0] for _ in range(args.runs)]
+        new = []
+        for _ in range(args.runs):
+            ms, reused = _timed(lambda: new_launch(new_folder, index_args, args.timeout))
+            if not reused:
+                raise RuntimeError("deps.lock did not match on a repeated launch")
+            new.append(ms)
+
+        print(f"requirements: {', '.join(args.requirements)}")
+        print(f"  first launch:  pip every time {first_old:9.1f} ms · deps.lock {first_new:9.1f} ms")
+        print(f"  later launches: pip every time {_median(old):8.1f} ms · deps.lock {_median(new):8.2f} ms "
+              f"(median of {args.runs})")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
@@ -0,0 +1,243 @@
+import os
+import re
+import tempfile
+
+from patches import has_edits, parse_edits, apply_edits
+
+# Matches "=== main.py ===" headers, including the decorated variants models
+# like to emit: "**=== main.py ===**", "### === main.py ===", "`=== main.py ===`".
+HEADER_RE = re.compile(r'^[\s#*`>]*={3,}\s*[`*]*\s*([^=`*\n]+?)\s*[`*]*\s*={3,}[\s*`]*$')
+FENCE_RE = re.compile(r'^\s*```')
+FILENAME_RE = re.compile(r'^[\w\-. /\\]+$')
+
+
+def match_header(line):
+    m = HEADER_RE.match(line)
+    if not m:
+        return None
+    name = re.sub(r'\s*\(.*\)$', '', m.group(1).strip()).replace("\\", "/")
+    if not FILENAME_RE.match(name) or ("." not in name and "/" not in name):
+        return None
+    return name
+
+
+def strip_fences(lines):
+    while lines and not lines[0].strip():
+        lines = lines[1:]
+    while lines and not lines[-1].strip():
+        lines = lines[:-1]
+    if lines and FENCE_RE.match(lines[0]):
+        lines = lines[1:]
+    if lines and FENCE_RE.match(lines[-1]):
+        lines = lines[:-1]
+    return "\n".join(lines).strip()
+
+
+class FileBlockParser:
+    def __init__(self, on_block=None):
+        self.on_block = on_block
+        self.blocks = []
+        self.fed = False
+        self._buffer = ""
+        self._current = None
+        self._lines = []
+        self._fenced = False
+        self._preamble = []
+        self._closed = False
+
+    def feed(self, chunk):
+        if not chunk or self._closed:
+            return
+        self.fed = True
+        self._buffer += chunk
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            self._feed_line(line.rstrip("\r"))
+
+    def close(self):
+        if self._closed:
+            return self.blocks
+        self._closed = True
+        if self._buffer:
+            self._feed_line(self._buffer.rstrip("\r"))
+            self._buffer = ""
+        self._finish_block()
+        if not self.blocks:
+            self._emit("main.py", self._fallback_content(), fallback=True)
+        return self.blocks
+
+    def _feed_line(self, line):
+        name = match_header(line)
+        if name:
+            self._finish_block()
+            self._current = name
+            self._lines = []
+            self._fenced = False
+            return
+        if self._current is None:
+            self._preamble.append(line)
+            return
+        if FENCE_RE.match(line):
+            if not any(l.strip() for l in self._lines):
+                self._fenced = True
+            elif self._fenced and not has_edits("\n".join(self._lines)):
+                # The code fence that opened this block just closed, so the
+                # file is complete even though the next header hasn't arrived.
+                # Patch sections often fence every edit block separately, so
+                # they stay open until the next header.
+                self._lines.append(line)
+                self._finish_block()
+                return
+        self._lines.append(line)
+
+    def _finish_block(self):
+        if self._current is None:
+            return
+        name, lines = self._current, self._lines
+        self._current = None
+        self._lines = []
+        self._fenced = False
+        self._emit(name, strip_fences(lines))
+
+    def _fallback_content(self):
+        lines = self._preamble
+        fences = [i for i, l in enumerate(lines) if FENCE_RE.match(l)]
+        if fences:
+            end = fences[-1] if len(fences) > 1 else len(lines)
+            lines = lines[fences[0] + 1:end]
+        return "\n".join(lines).strip()
+
+    def _emit(self, name, content, fallback=False):
+        self.blocks.append((name, content))
+        if self.on_block:
+            self.on_block(name, content, fallback)
+
+
+def parse_file_blocks(text):
+    parser = FileBlockParser()
+    parser.feed(text or "")
+    return parser.close()
+
+
+def validate_blocks(text, require_main=True):
+    if not text or not text.strip():
+        return False, "empty response"
+    blocks = parse_file_blocks(text)
+    names = [name for name, _ in blocks]
+    if require_main and "main.py" not in names:
+        return False, "no main.py block"
+    for name, content in blocks:
+        if has_edits(content):
+            if not parse_edits(content):
+                return False, f"{name} has a malformed edit block"
+            continue
+        if not name.endswith(".py"):
+            continue
+        if name == "main.py" and not content.strip():
+            return False, "main.py is empty"
+        try:
+            compile(content, name, "exec")
+        except (SyntaxError, ValueError) as e:
+            return False, f"{name} does not compile: {e}"
+    return True, ""
+
+
+def safe_join(folder, name):
+    folder = os.path.abspath(folder)
+    path = os.path.abspath(os.path.join(folder, name))
+    if os.path.commonpath([folder, path]) != folder or path == folder:
+        return None
+    return path
+
+
+def write_file_atomic(folder, name, content):
+    path = safe_join(folder, name)
+    if path is None:
+        print(f"⚠️ Skipped unsafe file path from model output: {name}")
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+class StreamingFileWriter:
+    def __init__(self, folder, on_file=None):
+        self.folder = folder
+        self.on_file = on_file
+        self.written = []
+        self.edits = 0
+        self.failed_edits = []
+        self.parser = FileBlockParser(on_block=self._write)
+        self._originals = {}
+
+    def feed(self, chunk):
+        self.parser.feed(chunk)
+
+    def reset(self):
+        # Puts back every file this stream touched, for a stream that was
+        # abandoned in favour of another one (see race_generation).
+        for name, original in self._originals.items():
+            path = safe_join(self.folder, name)
+            if original is not None:
+                write_file_atomic(self.folder, name, original)
+            elif path and os.path.exists(path):
+                os.remove(path)
+        self._originals = {}
+        self.written = []
+        self.edits = 0
+        self.failed_edits = []
+        self.parser = FileBlockParser(on_block=self._write)
+
+    def close(self, text=None):
+        if text is not None and not self.parser.fed:
+            self.parser.feed(text)
+        self.parser.close()
+        return self.written
+
+    def _apply_edits(self, name, content):
+        path = safe_join(self.folder, name)
+        original = ""
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                original = f.read()
+        edits = parse_edits(content)
+        patched, failed = apply_edits(original, edits)
+        if failed:
+            # Leave the file untouched rather than half-patched.
+            self.failed_edits.append((name, failed))
+            print(f"⚠️ {len(failed)} of {len(edits)} edits to {name} did not match — file left unchanged")
+            return None
+        self.edits += len(edits)
+        return patched
+
+    def _remember(self, name):
+        path = safe_join(self.folder, name)
+        if path is None or name in self._originals:
+            return
+        original = None
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                original = f.read()
+        self._originals[name] = original
+
+    def _write(self, name, content, fallback):
+        if has_edits(content):
+            content = self._apply_edits(name, content)
+            if content is None:
+                return
+        self._remember(name)
+        path = write_file_atomic(self.folder, name, content)
+        if path:
+            self.written.append(name)
+            if self.on_file:
+                self.on_file(name, path, fallback)
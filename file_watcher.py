@@ -0,0 +1,196 @@
+import os
+import sys
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+
+from project_files import PRUNED_DIRS, list_project_files
+
+# Reports debounced batches of changed project files (paths relative to the
+# project folder). Linux uses inotify through ctypes; elsewhere, or if inotify
+# can't be set up, the project's files are polled for mtime/size changes.
+WATCHED_EXTENSIONS = (".py", ".txt")
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc = _load_libc()
+
+
+def is_watched(rel):
+    parts = rel.replace("\\", "/").split("/")
+    if any(p in PRUNED_DIRS or p.startswith(".") for p in parts):
+        return False
+    return rel.endswith(WATCHED_EXTENSIONS)
+
+
+def module_names(changed):
+    # "main.py" -> "main", "pkg/util.py" -> "pkg.util", "pkg/__init__.py" -> "pkg"
+    names = []
+    for rel in sorted(changed):
+        if not rel.endswith(".py"):
+            continue
+        parts = rel[:-3].replace("\\", "/").split("/")
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        if parts:
+            names.append(".".join(parts))
+    return names
+
+
+class ProjectWatcher:
+    def __init__(self, folder, on_change, debounce=0.3, poll_interval=0.5):
+        self.folder = os.path.abspath(folder)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._pending = set()
+        self._timer = None
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._fd = None
+        self._wds = {}
+        self._snapshot = {}
+        if _libc:
+            self._fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if self._fd < 0:
+                self._fd = None
+        if self._fd is not None:
+            self.mode = "inotify"
+            self._add_tree(self.folder)
+        else:
+            self.mode = "polling"
+            self._snapshot = self._scan()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _add_tree(self, top):
+        for root, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if d not in PRUNED_DIRS and not d.startswith(".")]
+            wd = _libc.inotify_add_watch(self._fd, os.fsencode(root), WATCH_MASK)
+            if wd >= 0:
+                self._wds[wd] = root
+
+    def _read_events(self):
+        changed = set()
+        with self._read_lock:
+            while self._fd is not None:
+                try:
+                    buf = os.read(self._fd, 65536)
+                except BlockingIOError:
+                    break
+                except OSError:
+                    break
+                offset = 0
+                while offset + EVENT_HEADER.size <= len(buf):
+                    wd, mask, _, length = EVENT_HEADER.unpack_from(buf, offset)
+                    name = buf[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                    offset += EVENT_HEADER.size + length
+                    if mask & IN_Q_OVERFLOW:
+                        # Events were dropped; report every file so nothing is missed.
+                        changed.update(list_project_files(self.folder, WATCHED_EXTENSIONS))
+                        continue
+                    if wd not in self._wds:
+                        continue
+                    path = os.path.join(self._wds[wd], os.fsdecode(name))
+                    rel = os.path.relpath(path, self.folder).replace(os.sep, "/")
+                    if mask & IN_ISDIR:
+                        if mask & (IN_CREATE | IN_MOVED_TO) and is_watched(rel + "/x.py"):
+                            self._add_tree(path)
+                        continue
+                    if is_watched(rel):
+                        changed.add(rel)
+        return changed
+
+    def _scan(self):
+        snapshot = {}
+        for rel in list_project_files(self.folder, WATCHED_EXTENSIONS):
+            try:
+                st = os.stat(os.path.join(self.folder, rel))
+            except OSError:
+                continue
+            snapshot[rel] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def _poll(self):
+        with self._read_lock:
+            current = self._scan()
+            changed = {rel for rel in set(current) | set(self._snapshot)
+                       if current.get(rel) != self._snapshot.get(rel)}
+            self._snapshot = current
+        return changed
+
+    def _collect(self):
+        return self._read_events() if self.mode == "inotify" else self._poll()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.mode == "inotify":
+                try:
+                    select.select([self._fd], [], [], 0.5)
+                except (OSError, ValueError, TypeError):
+                    break
+            else:
+                self._stop.wait(self.poll_interval)
+            if self._stop.is_set():
+                break
+            changed = self._collect()
+            if changed:
+                with self._lock:
+                    self._pending |= changed
+                    if self._timer:
+                        self._timer.cancel()
+                    self._timer = threading.Timer(self.debounce, self._fire)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if self._fd is not None:
+            with self._read_lock:
+                os.close(self._fd)
+                self._fd = None
+
+    def _take(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            changed, self._pending = self._pending, set()
+        return changed
+
+    def _fire(self):
+        changed = self._take()
+        if changed and not self._stop.is_set():
+            self.on_change(changed)
+
+    def flush(self):
+        # Returns everything changed so far without waiting for the debounce,
+        # and without on_change being called for it. Used right after the
+        # builder writes files itself so the reload can start immediately.
+        changed = self._collect()
+        with self._lock:
+            self._pending |= changed
+        return self._take()
+
+    def stop(self):
+        self._stop.set()
+        self._take()
@@ -0,0 +1,288 @@
+import os
+import time
+import uuid
+import shutil
+import difflib
+import datetime
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config import LLM_PROVIDERS, FIX_ENGINE_SETTINGS
+from ai_functions import ping_pong_fix, expand_feedback, race_candidates, GenerationCancelled
+from utils import project_log
+import dep_store
+import wheelhouse
+import fix_memory
+from preview_host import python_command
+
+# Fix candidates are generated concurrently, each into its own copy of the
+# project under .candidates/, so a slow or broken fixer never blocks or
+# clobbers the others. Every candidate is validated, diff-checked and
+# smoke-run headless; the best one that passes is committed.
+CANDIDATES_DIR = ".candidates"
+
+# Builds the AppFrame under a withdrawn root and pumps events for a moment.
+# Exit code 3 means there is no display to test against.
+SMOKE_SCRIPT = r'''
+import sys, time, importlib.util
+import customtkinter as ctk
+try:
+    root = ctk.CTk()
+except Exception as e:
+    print(f"no display: {e}")
+    sys.exit(3)
+root.withdraw()
+spec = importlib.util.spec_from_file_location("main", "main.py")
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+frame = module.AppFrame(root)
+frame.pack(fill="both", expand=True)
+end = time.time() + float(sys.argv[1])
+while time.time() < end:
+    root.update()
+    time.sleep(0.02)
+root.destroy()
+'''
+
+SMOKE_RANK = {"ok": 0, "skipped": 1}
+
+
+def get_fix_settings(config=None):
+    settings = dict(FIX_ENGINE_SETTINGS)
+    if config:
+        settings.update(config.get("fix_engine", {}))
+    return settings
+
+
+def plan_fixers(selected_provider, config, use_browser_for_grok=False):
+    # (label, fixer_choice, provider, use_cache)
+    fixers = [("qwen", '1', None, True)]
+    if selected_provider == "hybrid":
+        fixers += [(pid, '2', pid, True) for pid in race_candidates(config, use_browser_for_grok, "fix") if pid != "ollama"]
+    elif selected_provider and selected_provider != "ollama":
+        fixers.append((selected_provider, '2', selected_provider, True))
+    else:
+        # Local only: a second uncached Qwen sample gives a different candidate.
+        fixers.append(("qwen-2", '1', None, False))
+    return fixers[:max(1, get_fix_settings(config)["max_candidates"])]
+
+
+def make_sandbox(app_folder, label):
+    folder = os.path.join(app_folder, CANDIDATES_DIR, f"{label}-{uuid.uuid4().hex[:6]}")
+    os.makedirs(folder)
+    for f in os.listdir(app_folder):
+        if f.endswith('.py') or f == 'requirements.txt':
+            shutil.copy(os.path.join(app_folder, f), os.path.join(folder, f))
+    req_path = os.path.join(folder, "requirements.txt")
+    if not os.path.exists(req_path):
+        with open(req_path, "w", encoding="utf-8") as f:
+            f.write("customtkinter\n")
+    return folder
+
+
+def changed_ratio(original_folder, folder):
+    changed = total = 0
+    for fname in os.listdir(folder):
+        if not fname.endswith('.py'):
+            continue
+        orig_path = os.path.join(original_folder, fname)
+        orig_lines = []
+        if os.path.exists(orig_path):
+            with open(orig_path, 'r', errors='ignore') as f:
+                orig_lines = f.readlines()
+        with open(os.path.join(folder, fname), 'r', errors='ignore') as f:
+            new_lines = f.readlines()
+        total += len(orig_lines)
+        changed += sum(1 for line in difflib.unified_diff(orig_lines, new_lines)
+                       if line[:1] in "+-" and not line.startswith(("+++", "---")))
+    return changed / max(total, 1)
+
+
+def smoke_run(self, folder, settings, cancel=None):
+    if cancel is not None and cancel.is_set():
+        return "failed", "cancelled"
+    ok, err, deps_dir, _ = dep_store.ensure_project_deps(folder, self._get_pip_cmd(), timeout=120,
+                                                         index_args=wheelhouse.pip_index_args(self.config))
+    if not ok:
+        return "failed", f"dependency install failed: {err[-300:]}"
+    if cancel is not None and cancel.is_set():
+        return "failed", "cancelled"
+    return smoke_test(folder, deps_dir, settings)
+
+
+def smoke_test(folder, deps_dir, settings):
+    # -> ("ok" | "skipped" | "failed", detail)
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [deps_dir, folder, env.get("PYTHONPATH", "")] if p)
+    try:
+        result = subprocess.run(python_command("--smoke", SMOKE_SCRIPT, str(settings["smoke_seconds"])),
+                                cwd=folder, env=env, capture_output=True, text=True,
+                                timeout=settings["smoke_timeout"])
+    except subprocess.TimeoutExpired:
+        return "failed", f"smoke run timed out after {settings['smoke_timeout']}s"
+    if result.returncode == 3:
+        return "skipped", result.stdout.strip()
+    if result.returncode != 0:
+        return "failed", (result.stderr or result.stdout)[-600:]
+    return "ok", ""
+
+
+def _run_candidate(self, fixer, instruction, expanded, settings, start, crash=None, cancel=None, stream=None):
+    # cancel is set once parallel_fix stops waiting; the candidate then stops
+    # streaming at the next token and skips the install and smoke run.
+    # stream(label, chunk) forwards tokens to the log.
+    label, fixer_choice, provider, use_cache = fixer
+    name = {"qwen": "Qwen", "qwen-2": "Qwen #2"}.get(label) or LLM_PROVIDERS.get(provider, {}).get("name", provider)
+    cand = {"label": label, "name": name, "folder": make_sandbox(self.app_folder, label), "passed": False}
+    cancel = cancel or threading.Event()
+
+    def _on_token(chunk):
+        if cancel.is_set():
+            raise GenerationCancelled(label)
+        if stream:
+            stream(label, chunk)
+
+    gen_start = time.time()
+    try:
+        produced = ping_pong_fix(cand["folder"], crash or "", instruction,
+                                 use_browser_for_grok=self.use_browser_for_grok, browser_config=self.config,
+                                 fixer_choice=fixer_choice, selected_provider=provider, config=self.config,
+                                 on_token=_on_token, use_cache=use_cache, expanded_feedback=expanded)
+    except GenerationCancelled:
+        produced = False
+    except Exception as e:
+        produced, cand["reason"] = False, f"fixer error: {e}"
+    cand["generated_at"] = time.time() - start
+    cand["seconds"] = time.time() - gen_start
+    if cancel.is_set():
+        cand["reason"] = "cancelled"
+        return cand
+    if not produced:
+        cand.setdefault("reason", "no response")
+        return cand
+    return verify_candidate(self, cand, settings, is_cloud=provider is not None, cancel=cancel)
+
+
+def verify_candidate(self, cand, settings, is_cloud=False, cancel=None):
+    valid, reason = self._validate_fix(cand["folder"])
+    if not valid:
+        cand["reason"] = f"invalid: {reason}"
+        return cand
+    safe, reason = self._check_diff_size(self.app_folder, cand["folder"], is_cloud=is_cloud)
+    if not safe:
+        cand["reason"] = f"too destructive: {reason}"
+        return cand
+    cand["ratio"] = changed_ratio(self.app_folder, cand["folder"])
+    cand["smoke"], detail = smoke_run(self, cand["folder"], settings, cancel)
+    if cand["smoke"] == "failed":
+        cand["reason"] = f"smoke run failed: {detail}"
+        return cand
+    cand["passed"] = True
+    return cand
+
+
+def replay_memory(self, settings, crash):
+    # Tries remembered patches for this crash signature; -> winner folder or None
+    start = time.time()
+    sig, patches = fix_memory.lookup(crash, self.config)
+    for patch in patches:
+        folder = make_sandbox(self.app_folder, "memory")
+        if not fix_memory.apply_patch(folder, patch):
+            shutil.rmtree(folder, ignore_errors=True)
+            continue
+        cand = verify_candidate(self, {"folder": folder, "passed": False}, settings)
+        stats = fix_memory.record_result(sig, patch, cand["passed"], time.time() - start)
+        if cand["passed"]:
+            saved = max(0.0, patch["fix_seconds"] - (time.time() - start))
+            self.after(0, lambda s=stats, d=fix_memory.describe(sig): project_log(
+                self, f"🧠 Reused a known fix for {d} — saved ~{saved:.0f}s "
+                      f"(hit rate {s['hits']}/{s['lookups']}, ~{s['saved_seconds']:.0f}s saved in total)"))
+            return folder
+        self.after(0, lambda r=cand["reason"]: project_log(self, f"  ✗ Remembered fix did not hold: {r[:200]}"))
+        shutil.rmtree(folder, ignore_errors=True)
+    return None
+
+
+def _leader_stream(on_token):
+    # Only the first candidate to produce a token streams into the log;
+    # several at once would interleave into noise.
+    if not on_token:
+        return None
+    leader = []
+    lock = threading.Lock()
+
+    def stream(label, chunk):
+        with lock:
+            if not leader:
+                leader.append(label)
+        if leader[0] == label:
+            on_token(chunk)
+    return stream
+
+
+def parallel_fix(self, instruction, fixers=None, crash=None, on_token=None):
+    # crash is the traceback behind a crash-driven fix; feature requests pass
+    # none, so they never replay or store remembered patches.
+    settings = get_fix_settings(self.config)
+    fixers = fixers or plan_fixers(getattr(self, 'selected_provider', 'hybrid'), self.config, self.use_browser_for_grok)
+    discard_candidates(self.app_folder)
+    winner = replay_memory(self, settings, crash) if crash else None
+    if winner:
+        return winner
+    stamp = datetime.datetime.now().strftime('%H:%M:%S')
+    self.after(0, lambda names=", ".join(f[0] for f in fixers): project_log(self, f"[{stamp}] 🧪 Requesting {len(fixers)} fix candidates in parallel ({names}) → {instruction[:80]}"))
+
+    start = time.time()
+    expanded = expand_feedback(instruction)
+    expand_seconds = time.time() - start
+    cancel = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=len(fixers))
+    stream = _leader_stream(on_token)
+    pending = {pool.submit(_run_candidate, self, f, instruction, expanded, settings, start, crash, cancel, stream)
+               for f in fixers}
+    results = []
+    deadline = start + settings["timeout"]
+    while pending:
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            break
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            c = future.result()
+            results.append(c)
+            elapsed = time.time() - start
+            if c["passed"]:
+                msg = f"  ✓ {c['name']}: {c['ratio']:.0%} changed, smoke {c['smoke']} (ready at {elapsed:.1f}s)"
+            else:
+                msg = f"  ✗ {c['name']}: {c['reason'][:300]} ({elapsed:.1f}s)"
+            self.after(0, lambda m=msg: project_log(self, m))
+            if c["passed"] and c["smoke"] == "ok":
+                # A fully verified fix exists; slower fixers only get a short grace period.
+                deadline = min(deadline, time.time() + settings["grace_seconds"])
+    cancel.set()
+    pool.shutdown(wait=False)
+    for future in pending:
+        future.cancel()
+    if pending:
+        self.after(0, lambda n=len(pending): project_log(self, f"⏱ Stopped waiting for {n} slower candidate(s)"))
+
+    passed = sorted((c for c in results if c["passed"]),
+                    key=lambda c: (SMOKE_RANK[c["smoke"]], c["ratio"], c["generated_at"]))
+    wall = time.time() - start
+    serial = expand_seconds * len(results) + sum(c["seconds"] for c in results)
+    if not passed:
+        self.after(0, lambda w=wall: project_log(self, f"❌ No fix candidate passed ({w:.1f}s)"))
+        return None
+    best = passed[0]
+    if crash:
+        fix_memory.remember(crash, self.app_folder, best["folder"], wall, self.config)
+    self.after(0, lambda w=wall, s=serial, n=len(passed): project_log(
+        self, f"🏆 Using {best['name']} fix ({n}/{len(fixers)} passed) in {w:.1f}s — back-to-back would have taken ~{s:.1f}s"))
+    return best["folder"]
+
+
+def discard_candidates(app_folder):
+    shutil.rmtree(os.path.join(app_folder, CANDIDATES_DIR), ignore_errors=True)
@@ -0,0 +1,228 @@
+import os
+import re
+import json
+import time
+import difflib
+import hashlib
+import threading
+
+from config import CACHE_DIR, FIX_MEMORY_SETTINGS
+from patches import apply_edits
+from file_blocks import write_file_atomic
+
+# Remembers which edits fixed a crash, keyed by a normalized signature of the
+# traceback (exception type, message template, offending API) rather than the
+# raw text, so the same mistake in another project maps to the same entry.
+# Patches are stored as SEARCH/REPLACE edits with a little context and are
+# re-applied with the same fuzzy matching used for model edits.
+MEMORY_FILE = os.path.join(CACHE_DIR, "fix_memory.json")
+
+EXC_RE = re.compile(r'^([A-Za-z_][\w.]*(?:Error|Exception|Warning|Exit)):[ \t]*(.*)$', re.M)
+QUOTED_RE = re.compile(r"""(['"])(.*?)\1""")
+CODE_LINE_RE = re.compile(r'File "[^"]+", line \d+, in [^\n]+\n[ \t]+(\S[^\n]*)')
+CALL_RE = re.compile(r'(\w+)\s*\(')
+# The name that is missing, which is what tells these crashes apart; the
+# first quoted name would be the module or type that lacks it.
+MISSING_RE = re.compile(r"has no attribute '([\w.]+)'|name '([\w.]+)' is not defined|"
+                        r"cannot import name '([\w.]+)'|No module named '([\w.]+)'")
+CONTEXT_LINES = 2
+
+_lock = threading.Lock()
+
+
+def get_memory_settings(config=None):
+    settings = dict(FIX_MEMORY_SETTINGS)
+    if config:
+        settings.update(config.get("fix_memory", {}))
+    return settings
+
+
+def signature(error_text):
+    # -> dict(type, template, api) or None when there is no exception line
+    matches = EXC_RE.findall(error_text or "")
+    if not matches:
+        return None
+    exc_type, message = matches[-1]
+    exc_type = exc_type.rsplit(".", 1)[-1]
+    quoted = [q for _, q in QUOTED_RE.findall(message)]
+    template = QUOTED_RE.sub("<*>", message)
+    template = re.sub(r'0x[0-9a-fA-F]+', '<addr>', template)
+    template = re.sub(r'\d+', 'N', template).strip()
+    missing = MISSING_RE.search(message)
+    if missing:
+        api = next(g for g in missing.groups() if g)
+    else:
+        api = next((q for q in quoted if re.fullmatch(r'[\w.]+', q)), None)
+    if api is None:
+        code_lines = CODE_LINE_RE.findall(error_text)
+        calls = CALL_RE.findall(code_lines[-1]) if code_lines else []
+        api = calls[-1] if calls else ""
+    return {"type": exc_type, "template": template, "api": api}
+
+
+def signature_key(sig):
+    return hashlib.sha1(f"{sig['type']}|{sig['template']}|{sig['api']}".encode("utf-8")).hexdigest()[:16]
+
+
+def describe(sig):
+    return f"{sig['type']}: {sig['template']}" + (f" [{sig['api']}]" if sig["api"] else "")
+
+
+def _load():
+    try:
+        with open(MEMORY_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"entries": {}, "stats": {"lookups": 0, "hits": 0, "saved_seconds": 0.0}}
+
+
+def _save(data):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{MEMORY_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, MEMORY_FILE)
+
+
+def _read_lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read().splitlines()
+
+
+def diff_edits(original_folder, fixed_folder):
+    # -> ({rel: [[search_lines, replace_lines], ...]}, changed_line_count)
+    edits, changed = {}, 0
+    for fname in sorted(os.listdir(fixed_folder)):
+        if not (fname.endswith(".py") or fname == "requirements.txt"):
+            continue
+        old = _read_lines(os.path.join(original_folder, fname))
+        new = _read_lines(os.path.join(fixed_folder, fname))
+        if old == new:
+            continue
+        file_edits = []
+        if fname == "requirements.txt":
+            added = [l for l in new if l.strip() and l not in old]
+            if added:
+                file_edits.append([[], added])
+            changed += len(added)
+        else:
+            matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+            for group in matcher.get_grouped_opcodes(CONTEXT_LINES):
+                i1, i2, j1, j2 = group[0][1], group[-1][2], group[0][3], group[-1][4]
+                file_edits.append([old[i1:i2], new[j1:j2]])
+                changed += sum(max(b - a, d - c) for tag, a, b, c, d in group if tag != "equal")
+        if file_edits:
+            edits[fname] = file_edits
+    return edits, changed
+
+
+def lookup(error_text, config=None):
+    # -> (signature, [patch, ...]) best patches first; counts as a lookup
+    sig = signature(error_text)
+    if not sig or not get_memory_settings(config)["enabled"]:
+        return sig, []
+    with _lock:
+        data = _load()
+        data["stats"]["lookups"] += 1
+        entry = data["entries"].get(signature_key(sig))
+        _save(data)
+    if not entry:
+        return sig, []
+    return sig, sorted(entry["patches"], key=lambda p: p["failures"] - p["uses"])
+
+
+def _core(search, replace):
+    # Drops the unchanged context around an edit, keeping one anchor line for
+    # pure insertions, so it can land in a file whose surroundings differ.
+    head = 0
+    while head < min(len(search), len(replace)) - 1 and search[head] == replace[head]:
+        head += 1
+    tail = 0
+    while tail < min(len(search), len(replace)) - head - 1 and search[-1 - tail] == replace[-1 - tail]:
+        tail += 1
+    return search[head:len(search) - tail], replace[head:len(replace) - tail]
+
+
+def apply_patch(folder, patch):
+    # Applies every edit or nothing; returns True when the folder changed.
+    results = {}
+    for rel, edits in patch["edits"].items():
+        path = os.path.join(folder, rel)
+        if not os.path.exists(path) and rel != "requirements.txt":
+            return False
+        original = "\n".join(_read_lines(path)) + "\n"
+        if rel == "requirements.txt":
+            have = set(original.splitlines())
+            edits = [[s, [l for l in r if l not in have]] for s, r in edits]
+        text, failed = apply_edits(original, [(s, r) for s, r in edits])
+        if failed:
+            text, failed = apply_edits(original, [_core(s, r) for s, r in edits])
+        if failed:
+            return False
+        if text != original:
+            results[rel] = text
+    for rel, text in results.items():
+        write_file_atomic(folder, rel, text)
+    return bool(results)
+
+
+def remember(error_text, original_folder, fixed_folder, fix_seconds, config=None):
+    settings = get_memory_settings(config)
+    sig = signature(error_text)
+    if not sig or not settings["enabled"]:
+        return False
+    edits, changed = diff_edits(original_folder, fixed_folder)
+    if not edits or changed > settings["max_changed_lines"]:
+        # Rewrites this large are specific to one project; not worth replaying.
+        return False
+    key = signature_key(sig)
+    with _lock:
+        data = _load()
+        entry = data["entries"].setdefault(key, {"signature": sig, "patches": []})
+        entry["last_used"] = time.time()
+        for patch in entry["patches"]:
+            if patch["edits"] == edits:
+                patch["fix_seconds"] = max(patch["fix_seconds"], fix_seconds)
+                break
+        else:
+            entry["patches"].append({"edits": edits, "fix_seconds": round(fix_seconds, 1),
+                                     "uses": 0, "failures": 0, "saved_at": time.time()})
+            entry["patches"].sort(key=lambda p: p["failures"] - p["uses"])
+            del entry["patches"][settings["max_patches"]:]
+        if len(data["entries"]) > settings["max_entries"]:
+            oldest = sorted(data["entries"], key=lambda k: data["entries"][k].get("last_used", 0))
+            for k in oldest[:len(data["entries"]) - settings["max_entries"]]:
+                del data["entries"][k]
+        _save(data)
+    print(f"🧠 Remembered fix for {describe(sig)}")
+    return True
+
+
+def record_result(sig, patch, ok, replay_seconds=0.0):
+    # -> stats dict; a hit adds the original fix time minus the replay time to saved_seconds
+    key = signature_key(sig)
+    with _lock:
+        data = _load()
+        entry = data["entries"].get(key)
+        stored = next((p for p in entry["patches"] if p["edits"] == patch["edits"]), None) if entry else None
+        if stored:
+            stored["uses" if ok else "failures"] += 1
+            entry["last_used"] = time.time()
+            if stored["failures"] > stored["uses"] + 2:
+                entry["patches"].remove(stored)
+        if ok:
+            data["stats"]["hits"] += 1
+            data["stats"]["saved_seconds"] += max(0.0, patch["fix_seconds"] - replay_seconds)
+        _save(data)
+        return dict(data["stats"])
+
+
+def report():
+    with _lock:
+        stats = _load()["stats"]
+    if not stats["lookups"]:
+        return "No crashes looked up yet."
+    return (f"{stats['hits']}/{stats['lookups']} crashes fixed from memory "
+            f"({stats['hits'] / stats['lookups']:.0%}) · ~{stats['saved_seconds']:.0f}s saved")
@@ -1,20 +1,32 @@
 import os
-import re
 import subprocess
 import threading
 import shutil
 import importlib.util
 import sys
-import ollama
-from openai import OpenAI
 import tkinter.messagebox as messagebox
 import datetime
 import time
 
-from config import gemini_folder, EXPAND_MODEL, XAI_API_KEY, GROK_MODEL, load_config, save_config, validate_config
-from utils import restart_ollama, log, project_log
+from config import gemini_folder, EXPAND_MODEL, GROK_MODEL, load_config, save_config, validate_config
+from utils import log, project_log, token_sink
 from browser_automation import get_grok_response_via_browser
-from ai_functions import ping_pong_fix, grok_syntax_rescue
+from ai_functions import ping_pong_fix, grok_syntax_rescue, chat_ollama, idea_expansion_prompt, generation_prompt, stream_reset
+from file_blocks import StreamingFileWriter
+from project_files import project_name
+import dep_store
+import wheelhouse
+from fix_engine import discard_candidates
+import local_fixers
+
+def _stream_sink(self, label, *widget_names):
+    if not self.config.get("stream_tokens", True):
+        return None
+    start = time.time()
+    def _first():
+        self.generating_done = True
+        self.after(0, lambda: log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] First {label} token after {time.time()-start:.1f}s"))
+    return token_sink(self, *(widget_names or ('build_log',)), on_first=_first)
 
 def start_generate_thread(self):
     threading.Thread(target=generate_app, args=(self,), daemon=True).start()
@@ -34,14 +46,10 @@ def generate_app(self):
             self.after(0, _no_idea_cleanup)
             return
         self.is_new_project = True
-        self.app_name = re.sub(r'[^a-zA-Z0-9]', '-', app_idea.lower()).strip('-')[:60] or "my-app"
+        self.app_name = project_name(app_idea)
         self.app_folder = os.path.join(gemini_folder, self.app_name)
         os.makedirs(self.app_folder, exist_ok=True)
         self.after(0, lambda: project_log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Creating new project: {self.app_name}"))
-        expand_prompt = f"""You are an expert software architect specializing in modern Python desktop apps using CustomTkinter.
-Use only CustomTkinter. Apply sleek glassmorphism dark theme with neon accents, gradients, glow borders, high corner radii.
-Expand this user request into a hyper-detailed specification.
-User request: {app_idea}"""
         self.after(0, lambda: log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Expanding idea with {EXPAND_MODEL}..."))
         start_time = time.time()
         self.generating_done = False
@@ -54,31 +62,23 @@ User request: {app_idea}"""
                     self.after(0, lambda: project_log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] [PROGRESS] Qwen still generating... ({elapsed}s)"))
         progress_thread = threading.Thread(target=show_progress, daemon=True)
         progress_thread.start()
-        resp = ollama.chat(model=EXPAND_MODEL, messages=[{"role": "user", "content": expand_prompt}])
-        expanded_idea = resp['message']['content'].strip()
+        expanded_idea = chat_ollama(EXPAND_MODEL, idea_expansion_prompt(app_idea), _stream_sink(self, "spec"), config=self.config).strip()
         self.after(0, lambda: log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Expansion complete in {time.time()-start_time:.1f}s"))
         self.generating_done = True
         progress_thread.join(timeout=1.0)
 
-        from ai_functions import generate_code_with_provider, get_generation_provider
+        from ai_functions import generate_code_with_provider, get_generation_provider, get_race_settings
         from config import LLM_PROVIDERS
-        gen_provider = get_generation_provider(getattr(self, 'selected_provider', 'hybrid'), self.config)
-        gen_name = LLM_PROVIDERS.get(gen_provider, {}).get("name", gen_provider)
+        selected = getattr(self, 'selected_provider', 'hybrid')
+        gen_provider = "hybrid" if selected == "hybrid" and get_race_settings(self.config)["enabled"] else get_generation_provider(selected, self.config)
+        gen_name = LLM_PROVIDERS.get(gen_provider, {}).get("name", "Hybrid race")
         self.after(0, lambda n=gen_name: project_log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Generating code with {n}..."))
-        user_prompt = f"""You are an expert Python coder. Generate complete code using ONLY CustomTkinter.
-Use EXACTLY this skeleton—fill in the # UI code comment with ALL widgets/logic:
-import customtkinter as ctk
-class AppFrame(ctk.CTkFrame):
-    def __init__(self, master, **kwargs):
-        super().__init__(master, **kwargs)
-        self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(0, weight=1)
-        # UI code here using self as master
-Output ONLY the Python code for main.py, no explanations, no markdown.
-Use glassmorphism dark theme with neon accents.
-{expanded_idea}"""
-        self.raw_text = generate_code_with_provider(gen_provider, user_prompt, self.config, self.use_browser_for_grok, self.config)
-        write_files(self)
+        self.after(0, lambda: self.build_log.insert("end", "\n"))
+        self._prefetched_packages = set()
+        writer = StreamingFileWriter(self.app_folder, on_file=lambda n, p, fb: _on_file_ready(self, n, p, fb))
+        self.raw_text = generate_code_with_provider(gen_provider, generation_prompt(expanded_idea), self.config, self.use_browser_for_grok, self.config,
+                                                    on_token=_combine_sinks(_stream_sink(self, "code"), writer.feed))
+        write_files(self, writer)
         def _finish_generation():
             self.load_project()
             project_log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] New project generated.")
@@ -94,101 +94,86 @@ Use glassmorphism dark theme with neon accents.
             self.generating = False
         self.after(0, _error_cleanup)
 
-def write_files(self):
+def _combine_sinks(*sinks):
+    sinks = [s for s in sinks if s]
+    if not sinks:
+        return None
+    def on_token(chunk):
+        for sink in sinks:
+            sink(chunk)
+    def reset():
+        for sink in sinks:
+            sink_reset = stream_reset(sink)
+            if sink_reset:
+                sink_reset()
+    on_token.reset = reset
+    return on_token
+
+def _on_file_ready(self, name, path, fallback=False):
+    self.after(0, lambda: project_log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] ✓ {name}"))
+    if not name.endswith('.py'):
+        if name == "requirements.txt":
+            _prefetch_dependencies(self, os.path.dirname(path))
+        return
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            compile(f.read(), path, 'exec')
+    except SyntaxError as e:
+        self.after(0, lambda err=e: project_log(self, f"⚠️ {name} has a syntax error: {err}"))
+        return
+    _prefetch_dependencies(self, self.app_folder)
+
+def _prefetch_dependencies(self, folder):
+    # Starts installing packages for files that have already been written
+    # while the model is still streaming the rest of the response.
+    packages = [p for p in self._scan_imports(folder) if p not in self._prefetched_packages]
+    if not packages:
+        return
+    self._prefetched_packages.update(packages)
+    previous = getattr(self, '_dep_prefetch', None)
+    def _run():
+        if previous:
+            previous.join()
+        self._sync_requirements(folder)
+        self.after(0, lambda: project_log(self, f"📦 Early install: {', '.join(packages)}"))
+        try:
+            dep_store.ensure_project_deps(folder, self._get_pip_cmd(), index_args=wheelhouse.pip_index_args(self.config))
+        except Exception as e:
+            self.after(0, lambda err=e: project_log(self, f"⚠️ Early install failed: {err}"))
+    self._dep_prefetch = threading.Thread(target=_run, daemon=True)
+    self._dep_prefetch.start()
+
+def write_files(self, writer=None):
     if not self.raw_text: return
     self.after(0, lambda: project_log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Parsing output..."))
-    cleaned_raw = re.sub(r'^(?:.*\n)*?```(?:python)?\s*\n?', '', self.raw_text)
-    cleaned_raw = re.sub(r'\n?```(?:\s*python)?$', '', cleaned_raw)
-    cleaned_raw = cleaned_raw.strip()
-    files = re.split(r'===\s*(.+?)\s*===', cleaned_raw)
-    written = []
-    if len(files) > 1:
-        for i in range(1, len(files), 2):
-            filename = files[i].strip()
-            content = files[i+1].strip()
-            content = re.sub(r'^```(?:python)?\s*\n?', '', content)
-            content = re.sub(r'\n?```$', '', content)
-            content = content.strip()
-            full_path = os.path.join(self.app_folder, filename)
-            os.makedirs(os.path.dirname(full_path), exist_ok=True)
-            with open(full_path, "w", encoding="utf-8") as f:
-                f.write(content)
-            self.after(0, lambda f=filename: project_log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] ✓ {f}"))
-            written.append(filename)
-    else:
-        with open(os.path.join(self.app_folder, "main.py"), "w", encoding="utf-8") as f:
-            f.write(cleaned_raw)
-        written.append("main.py")
+    if writer is None:
+        writer = StreamingFileWriter(self.app_folder, on_file=lambda n, p, fb: _on_file_ready(self, n, p, fb))
+    written = writer.close(self.raw_text)
     self.after(0, lambda: project_log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {len(written)} file(s) written!"))
     self.after(0, self.load_projects)
 
-def ping_pong_fix_gui(self, user_feedback="", fixer_choice='1', auto_preview=True):
+def ping_pong_fix_gui(self, user_feedback="", auto_preview=True, crash=None):
     if not self.app_folder:
         self.after(0, lambda: messagebox.showerror("Error", "Select or create a project"))
-        return
-
-    max_attempts = 3
-    for attempt in range(1, max_attempts + 1):
-        try:
-            if not self.pending_folder or not os.path.exists(self.pending_folder):
-                self.after(0, self.prepare_pending)
-                time.sleep(0.5)
+        return None
 
-            from config import LLM_PROVIDERS
-            selected = getattr(self, 'selected_provider', 'hybrid')
-            if fixer_choice == '2':
-                from ai_functions import get_fix_provider
-                actual = get_fix_provider(selected, self.config)
-                fixer_name = LLM_PROVIDERS.get(actual, {}).get("name", actual)
-            else:
-                fixer_name = "Qwen"
-            self.after(0, lambda a=attempt, fn=fixer_name: project_log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Fix attempt {a}/{max_attempts} ({fn}) → {user_feedback[:80]}"))
-            self.after(0, lambda fn=fixer_name, a=attempt: self._show_thinking_indicator(f"{fn} is thinking (attempt {a}/{max_attempts})..."))
-
-            success = ping_pong_fix(self.pending_folder, self.error_log, user_feedback,
-                                    use_browser_for_grok=self.use_browser_for_grok, browser_config=self.config, fixer_choice=fixer_choice,
-                                    selected_provider=selected, config=self.config)
-
-            self.after(0, self._hide_thinking_indicator)
-
-            if success:
-                if self.pending_folder and os.path.exists(self.pending_folder):
-                    valid, reason = self._validate_fix(self.pending_folder)
-                    if not valid:
-                        self.after(0, lambda r=reason: project_log(self, f"❌ Fix rejected (invalid): {r}"))
-                        continue
-
-                    if hasattr(self, 'app_folder') and self.app_folder:
-                        backup_dir = os.path.join(self.app_folder, ".backup")
-                        if os.path.exists(backup_dir):
-                            safe, reason = self._check_diff_size(backup_dir, self.pending_folder)
-                            if not safe:
-                                self.after(0, lambda r=reason: project_log(self, f"❌ Fix rejected (too destructive): {r}"))
-                                continue
-
-                self.after(0, lambda a=attempt: project_log(self, f"✅ Fix succeeded on attempt {a}!"))
-                if auto_preview:
-                    self.after(0, self.commit_pending)
-                    time.sleep(0.5)
-                    self.after(0, self.load_preview)
-                return
-            else:
-                self.after(0, lambda a=attempt: project_log(self, f"Fix attempt {a} failed. Retrying..."))
-                time.sleep(1.5)
+    self.after(0, lambda: self._show_thinking_indicator("Fixers are preparing candidates..."))
+    try:
+        winner = self.parallel_fix(user_feedback, crash=crash, on_token=_stream_sink(self, "fix"))
+    except Exception as e:
+        winner = None
+        self.after(0, lambda err=str(e): project_log(self, f"❌ Fix failed: {err}"))
+    finally:
+        self.after(0, self._hide_thinking_indicator)
 
-        except Exception as e:
-            self.after(0, self._hide_thinking_indicator)
-            err_str = str(e)
-            self.after(0, lambda a=attempt, err=err_str: project_log(self, f"Fix attempt {a} error: {err}"))
-            if attempt == max_attempts:
-                self.after(0, lambda err=err_str: project_log(self, f"❌ All retry attempts failed: {err}"))
-            else:
-                time.sleep(2.0)
+    if winner and auto_preview and not self._reload_preview_and_wait(lambda: commit_candidate(self, winner)):
+        self.after(0, self.load_preview)
+    return winner
 
 def start_launch_thread(self):
     threading.Thread(target=launch_app_gui, args=(self,), daemon=True).start()
 
-def launch_app_gui(self):
+def launch_app_gui(self, local_fix_round=0):
     try:
         if not self.app_folder:
             self.after(0, lambda: messagebox.showerror("Error", "Select or create a project"))
@@ -212,13 +197,16 @@ def launch_app_gui(self):
             with open(req_path, "w", encoding="utf-8") as f:
                 f.write("customtkinter\n")
 
-        deps_dir = os.path.join(launch_folder, "deps")
-        os.makedirs(deps_dir, exist_ok=True)
-        import shutil as _shutil
-        pip_path = _shutil.which("pip") or _shutil.which("pip3")
-        pip_cmd = [pip_path] if pip_path else [sys.executable, "-m", "pip"]
-        subprocess.run(pip_cmd + ["install", "--upgrade", "--target", deps_dir, "-r", "requirements.txt", "--quiet"], 
-                       cwd=launch_folder, timeout=120, check=False)
+        deps_start = time.time()
+        ok, err, deps_dir, reused = dep_store.ensure_project_deps(launch_folder, self._get_pip_cmd(), timeout=120,
+                                                                 index_args=wheelhouse.pip_index_args(self.config))
+        deps_ms = (time.time() - deps_start) * 1000
+        if reused:
+            self.after(0, lambda ms=deps_ms: project_log(self, f"Requirements unchanged — skipped pip ({ms:.0f} ms)"))
+        elif ok:
+            self.after(0, lambda ms=deps_ms: project_log(self, f"Dependencies installed in {ms / 1000:.1f}s"))
+        else:
+            self.after(0, lambda e=err[:800]: project_log(self, f"Dependency install failed: {e}"))
 
         launch_env = os.environ.copy()
         existing_pp = launch_env.get("PYTHONPATH", "")
@@ -229,23 +217,32 @@ def launch_app_gui(self):
                                 text=True, bufsize=1, env=launch_env)
         output, _ = proc.communicate()
         return_code = proc.returncode
-        self.error_log = output
+        self.error_log = "" if return_code == 0 else output
 
         if return_code == 0:
             self.after(0, lambda: project_log(self, "APP RAN SUCCESSFULLY!"))
             self.after(0, lambda: messagebox.showinfo("Success", "App ran successfully."))
+            return True
         else:
             self.after(0, lambda: project_log(self, "Crashed — auto-fixing now..."))
             self.after(0, lambda: project_log(self, output[-2000:] if len(output) > 2000 else output))
+            fixed_by = local_fixers.apply(launch_folder, output) if local_fix_round < 2 else []
+            if fixed_by:
+                self.after(0, lambda n=", ".join(fixed_by): project_log(self, f"🔧 Local fix applied ({n}) — relaunching"))
+                if launch_app_gui(self, local_fix_round + 1):
+                    local_fixers.record_avoided(fixed_by)
+                return False
             if "SyntaxError" in output:
                 self.syntax_fail_count += 1
                 if self.syntax_fail_count >= 3:
                     if messagebox.askyesno("Syntax Rescue", "Call cloud LLM for syntax fix?"):
                         grok_syntax_rescue(launch_folder, output, self.use_browser_for_grok, self.config,
-                                          selected_provider=getattr(self, 'selected_provider', 'hybrid'), config=self.config)
+                                          selected_provider=getattr(self, 'selected_provider', 'hybrid'), config=self.config,
+                                          on_token=_stream_sink(self, "rescue"))
                         self.syntax_fail_count = 0
             else:
-                self.after(0, lambda: self.ping_pong_fix_gui("Fix the crash/error shown above"))
+                threading.Thread(target=self.ping_pong_fix_gui, args=("Fix the crash/error shown above",),
+                                 kwargs={"crash": output}, daemon=True).start()
 
     except Exception as e:
         self.after(0, lambda err=e: project_log(self, f"Launch failed: {err}"))
@@ -271,6 +268,11 @@ def commit_pending(self):
     self.pending_folder = None
     self.after(0, lambda: project_log(self, "Committed changes."))
 
+def commit_candidate(self, folder):
+    self.pending_folder = folder
+    self.commit_pending()
+    discard_candidates(self.app_folder)
+
 def undo_changes(self):
     if self.pending_folder and os.path.exists(self.pending_folder):
         shutil.rmtree(self.pending_folder)
@@ -0,0 +1,203 @@
+import os
+import re
+import ast
+import sys
+import json
+import threading
+
+from config import CACHE_DIR
+from project_files import list_project_files, read_project_file
+
+# Import name -> PyPI distribution for packages whose names differ.
+IMPORT_TO_PIP = {
+    'cv2': 'opencv-python', 'PIL': 'pillow', 'skimage': 'scikit-image',
+    'sklearn': 'scikit-learn', 'yaml': 'pyyaml', 'bs4': 'beautifulsoup4',
+    'gi': 'PyGObject', 'wx': 'wxPython', 'attr': 'attrs',
+    'serial': 'pyserial', 'usb': 'pyusb', 'Crypto': 'pycryptodome',
+    'dateutil': 'python-dateutil', 'dotenv': 'python-dotenv',
+    'websocket': 'websocket-client', 'google.protobuf': 'protobuf',
+    'docx': 'python-docx', 'pptx': 'python-pptx', 'fitz': 'pymupdf',
+    'magic': 'python-magic', 'jwt': 'pyjwt', 'OpenSSL': 'pyopenssl',
+    'win32api': 'pywin32', 'win32con': 'pywin32', 'win32gui': 'pywin32',
+    'pythoncom': 'pywin32', 'pywintypes': 'pywin32', 'Xlib': 'python-xlib',
+    'mpl_toolkits': 'matplotlib', 'tkcalendar': 'tkcalendar',
+    'CTkMessagebox': 'CTkMessagebox', 'vlc': 'python-vlc', 'telegram': 'python-telegram-bot',
+    'discord': 'discord.py', 'speech_recognition': 'SpeechRecognition',
+    'pyttsx3': 'pyttsx3', 'googleapiclient': 'google-api-python-client',
+    'sounddevice': 'sounddevice', 'soundfile': 'soundfile', 'mutagen': 'mutagen',
+    'psycopg2': 'psycopg2-binary', 'MySQLdb': 'mysqlclient', 'zmq': 'pyzmq',
+    'lxml': 'lxml', 'markdown': 'Markdown', 'qrcode': 'qrcode', 'emoji': 'emoji',
+}
+
+_FALLBACK_STDLIB = {
+    'os', 'sys', 'io', 're', 'math', 'json', 'time', 'datetime', 'random',
+    'collections', 'itertools', 'functools', 'pathlib', 'shutil', 'subprocess',
+    'threading', 'multiprocessing', 'socket', 'http', 'urllib', 'email',
+    'logging', 'unittest', 'typing', 'abc', 'copy', 'string', 'textwrap',
+    'struct', 'hashlib', 'hmac', 'secrets', 'tempfile', 'glob', 'fnmatch',
+    'csv', 'configparser', 'argparse', 'gettext', 'locale', 'calendar',
+    'pprint', 'enum', 'dataclasses', 'contextlib', 'decimal', 'fractions',
+    'statistics', 'array', 'queue', 'heapq', 'bisect', 'weakref',
+    'types', 'operator', 'pickle', 'shelve', 'sqlite3', 'zlib', 'gzip',
+    'zipfile', 'tarfile', 'xml', 'html', 'webbrowser', 'uuid', 'platform',
+    'ctypes', 'traceback', 'warnings', 'signal', 'mmap', 'codecs',
+    'importlib', 'pkgutil', 'inspect', 'dis', 'ast', 'token', 'tokenize',
+    'tkinter', '_tkinter', 'idlelib', 'asyncio', 'concurrent', 'winsound',
+    'winreg', 'msvcrt', 'base64', 'binascii', 'colorsys', 'sched', 'select',
+    'ssl', 'wave', 'audioop', 'getpass', 'timeit', 'cProfile', 'profile',
+}
+STDLIB = set(getattr(sys, 'stdlib_module_names', ())) or _FALLBACK_STDLIB
+
+CACHE_FILE = os.path.join(CACHE_DIR, "import_cache.json")
+_cache = None
+_cache_dirty = False
+_lock = threading.Lock()
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_FILE, "r", encoding="utf-8") as f:
+                _cache = json.load(f)
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+
+def _save_cache():
+    global _cache_dirty
+    with _lock:
+        if not _cache_dirty:
+            return
+        data = json.dumps(_cache)
+        _cache_dirty = False
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{CACHE_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, CACHE_FILE)
+
+
+def _dynamic_import_target(node):
+    # importlib.import_module("x") / __import__("x") with a literal name
+    func = node.func
+    name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+    if name not in ("import_module", "__import__") or not node.args:
+        return None
+    arg = node.args[0]
+    if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+        return arg.value
+    return None
+
+
+def extract_imports(code):
+    # Returns [module, level] pairs. level > 0 marks a relative import.
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return _extract_imports_fallback(code)
+    found = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                found.append([alias.name, 0])
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                found.append([node.module or "", node.level])
+            elif node.module:
+                found.append([node.module, 0])
+        elif isinstance(node, ast.Call):
+            target = _dynamic_import_target(node)
+            if target:
+                found.append([target, 0])
+    return found
+
+
+def _extract_imports_fallback(code):
+    # Used for files that don't parse yet (the fixer will get to them).
+    found = []
+    for line in code.splitlines():
+        line = line.strip()
+        m = re.match(r'^from\s+(\.*)([\w.]*)\s+import\b', line)
+        if m:
+            found.append([m.group(2), len(m.group(1))])
+            continue
+        m = re.match(r'^import\s+(.+)$', line)
+        if m:
+            for part in m.group(1).split(","):
+                name = part.strip().split(" ")[0]
+                if re.match(r'^[\w.]+$', name):
+                    found.append([name, 0])
+    return found
+
+
+def scan_file(folder, rel_path):
+    global _cache_dirty
+    path = os.path.abspath(os.path.join(folder, rel_path))
+    st = os.stat(path)
+    stamp = [st.st_mtime_ns, st.st_size]
+    with _lock:
+        entry = _load_cache().get(path)
+    if entry and entry["stamp"] == stamp:
+        return entry["imports"]
+    imports = extract_imports(read_project_file(folder, rel_path))
+    with _lock:
+        _cache[path] = {"stamp": stamp, "imports": imports}
+        _cache_dirty = True
+    return imports
+
+
+def local_modules(files):
+    names = set()
+    for rel in files:
+        parts = rel[:-3].split("/")
+        names.add(parts[0])
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        if parts:
+            names.add(".".join(parts))
+    return names
+
+
+def pip_name_for(module):
+    parts = module.split(".")
+    for i in range(len(parts), 0, -1):
+        prefix = ".".join(parts[:i])
+        if prefix in IMPORT_TO_PIP:
+            return IMPORT_TO_PIP[prefix]
+    return parts[0]
+
+
+def scan_project(folder):
+    files = list_project_files(folder)
+    local = local_modules(files)
+    found = set()
+    for rel in files:
+        try:
+            imports = scan_file(folder, rel)
+        except OSError:
+            continue
+        for module, level in imports:
+            if level:
+                continue
+            top = module.split(".")[0]
+            if not top or top in STDLIB or top.startswith('_') or top in local:
+                continue
+            found.add(pip_name_for(module))
+    _save_cache()
+    found.add('customtkinter')
+    return sorted(found)
+
+
+def prune_cache():
+    global _cache_dirty
+    with _lock:
+        cache = _load_cache()
+        stale = [p for p in cache if not os.path.exists(p)]
+        for p in stale:
+            del cache[p]
+        if stale:
+            _cache_dirty = True
+    _save_cache()
+    return len(stale)
@@ -0,0 +1,105 @@
+import threading
+
+from config import LLM_PROVIDERS, LLM_POOL_SETTINGS, OLLAMA_HOST
+
+# Process-wide registry of long-lived LLM clients. Every call path shares the
+# same keep-alive connection pools instead of paying a fresh TCP+TLS handshake
+# per request. Clients are keyed by (kind, provider, api key).
+_clients = {}
+_lock = threading.Lock()
+
+ANTHROPIC_MESSAGES_URL = "https://api.anthropic.com/v1/messages"
+
+
+def get_pool_settings(config=None):
+    settings = dict(LLM_POOL_SETTINGS)
+    if config:
+        settings.update(config.get("llm_pool", {}))
+    return settings
+
+
+def _http2_available():
+    try:
+        import h2
+        return True
+    except ImportError:
+        return False
+
+
+def _build_http_client(settings, http2=True, **kwargs):
+    import httpx
+    limits = httpx.Limits(
+        max_connections=settings["max_connections"],
+        max_keepalive_connections=settings["max_keepalive_connections"],
+        keepalive_expiry=settings["keepalive_expiry"],
+    )
+    timeout = httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"])
+    return httpx.Client(http2=http2 and settings["http2"] and _http2_available(),
+                        limits=limits, timeout=timeout, **kwargs)
+
+
+def get_http_client(provider_id, api_key="", config=None):
+    key = ("http", provider_id, api_key)
+    with _lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            client = _build_http_client(get_pool_settings(config))
+            _clients[key] = client
+        return client
+
+
+def get_openai_client(provider_id, api_key, base_url=None, config=None):
+    base_url = base_url or LLM_PROVIDERS.get(provider_id, {}).get("base_url")
+    key = ("openai", provider_id, api_key, base_url)
+    http_client = get_http_client(provider_id, api_key, config)
+    with _lock:
+        cached = _clients.get(key)
+        if cached is None or cached[1] is not http_client:
+            from openai import OpenAI
+            client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client,
+                            max_retries=get_pool_settings(config)["max_retries"])
+            cached = (client, http_client)
+            _clients[key] = cached
+        return cached[0]
+
+
+def get_anthropic_client(api_key, config=None):
+    return get_http_client("anthropic", api_key, config)
+
+
+def get_ollama_client(host=None, config=None):
+    host = host or OLLAMA_HOST
+    key = ("ollama", host)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            import httpx
+            import ollama
+            settings = get_pool_settings(config)
+            limits = httpx.Limits(
+                max_connections=settings["max_connections"],
+                max_keepalive_connections=settings["max_keepalive_connections"],
+                keepalive_expiry=settings["keepalive_expiry"],
+            )
+            # Local generations with the 32B model routinely take minutes, so
+            # only the connect phase gets a timeout.
+            client = ollama.Client(host=host, limits=limits,
+                                   timeout=httpx.Timeout(None, connect=settings["connect_timeout"]))
+            _clients[key] = client
+        return client
+
+
+def close_all_clients():
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        if isinstance(client, tuple):
+            client = client[1]
+        try:
+            if hasattr(client, "close"):
+                client.close()
+            elif hasattr(client, "_client"):
+                client._client.close()
+        except Exception:
+            pass
@@ -0,0 +1,149 @@
+import os
+import re
+import ast
+import json
+import time
+import threading
+
+from config import CACHE_DIR
+from file_blocks import FENCE_RE, write_file_atomic
+from project_files import list_project_files, read_project_file
+from import_scanner import local_modules, pip_name_for
+from dep_store import read_requirements, normalize_requirement
+
+# Rule-based repairs for crash signatures that don't need a model. Each rule
+# maps an error regex to a transform over the project folder and returns True
+# when it changed something. Other modules can register more with @rule.
+STATS_FILE = os.path.join(CACHE_DIR, "local_fix_stats.json")
+
+CTK_WIDGETS = [
+    "CTk", "CTkToplevel", "CTkFrame", "CTkScrollableFrame", "CTkTabview", "CTkTextbox",
+    "CTkScrollbar", "CTkButton", "CTkLabel", "CTkEntry", "CTkCheckBox", "CTkRadioButton",
+    "CTkSwitch", "CTkSlider", "CTkProgressBar", "CTkOptionMenu", "CTkComboBox",
+    "CTkSegmentedButton", "CTkInputDialog", "CTkFont", "CTkImage", "CTkCanvas",
+]
+
+RULES = []
+_lock = threading.Lock()
+
+
+def rule(name, pattern):
+    regex = re.compile(pattern)
+    def register(fn):
+        RULES.append((name, regex, fn))
+        return fn
+    return register
+
+
+def _py_files(folder):
+    return [rel for rel in list_project_files(folder) if rel.endswith(".py")]
+
+
+def _rewrite(folder, rel, transform):
+    code = read_project_file(folder, rel)
+    new = transform(code)
+    if new == code:
+        return False
+    write_file_atomic(folder, rel, new)
+    return True
+
+
+@rule("missing_module", r"No module named '([\w.]+)'")
+def fix_missing_module(folder, match, error):
+    module = match.group(1)
+    if module.split(".")[0] in local_modules(list_project_files(folder)):
+        return False
+    package = normalize_requirement(pip_name_for(module))
+    installed = {re.split(r'[<>=!~\[;]', r, 1)[0] for r in read_requirements(folder)}
+    if package in installed:
+        return False
+    with open(os.path.join(folder, "requirements.txt"), "a", encoding="utf-8") as f:
+        f.write(f"\n{pip_name_for(module)}\n")
+    return True
+
+
+@rule("missing_appframe", r"No AppFrame|has no attribute 'AppFrame'")
+def fix_missing_appframe(folder, match, error):
+    if not os.path.exists(os.path.join(folder, "main.py")):
+        return False
+    code = read_project_file(folder, "main.py")
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return False
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = {getattr(b, "attr", None) or getattr(b, "id", None) for b in node.bases}
+        if bases & {"CTkFrame", "CTkScrollableFrame", "Frame"}:
+            write_file_atomic(folder, "main.py", code.rstrip("\n") + f"\n\n\nAppFrame = {node.name}\n")
+            return True
+    return False
+
+
+@rule("stray_fence", r"SyntaxError|invalid syntax|```")
+def fix_stray_fences(folder, match, error):
+    strip = lambda code: "\n".join(l for l in code.split("\n") if not FENCE_RE.match(l))
+    return any([_rewrite(folder, rel, strip) for rel in _py_files(folder)])
+
+
+@rule("renamed_widget", r"has no attribute '(CTk\w+)'")
+def fix_renamed_widget(folder, match, error):
+    wrong = match.group(1)
+    right = {w.lower(): w for w in CTK_WIDGETS}.get(wrong.lower())
+    if not right or right == wrong:
+        return False
+    pattern = re.compile(rf'\b{re.escape(wrong)}\b')
+    return any([_rewrite(folder, rel, lambda code: pattern.sub(right, code)) for rel in _py_files(folder)])
+
+
+@rule("mixed_tabs", r"TabError|IndentationError|inconsistent use of tabs")
+def fix_mixed_tabs(folder, match, error):
+    def expand(code):
+        return "\n".join(re.sub(r'^[ \t]+', lambda m: m.group(0).expandtabs(4), l) for l in code.split("\n"))
+    return any([_rewrite(folder, rel, expand) for rel in _py_files(folder)])
+
+
+def apply(folder, error):
+    applied = []
+    start = time.time()
+    for name, regex, fn in RULES:
+        match = regex.search(error or "")
+        if not match:
+            continue
+        try:
+            if fn(folder, match, error):
+                applied.append(name)
+        except Exception as e:
+            print(f"⚠️ Local fixer {name} failed: {e}")
+    if applied:
+        _bump("applied", applied)
+        print(f"🔧 Local fixers applied {', '.join(applied)} in {(time.time() - start) * 1000:.0f} ms")
+    return applied
+
+
+def _load_stats():
+    try:
+        with open(STATS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"applied": {}, "avoided": {}}
+
+
+def _bump(kind, names):
+    with _lock:
+        stats = _load_stats()
+        for name in names:
+            stats[kind][name] = stats[kind].get(name, 0) + 1
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(STATS_FILE, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+    return stats
+
+
+def record_avoided(names):
+    # Called once the app runs after a local fix, i.e. a fix round was skipped.
+    stats = _bump("avoided", ["+".join(names)])
+    total = sum(stats["avoided"].values())
+    print(f"⚡ Local fix avoided an LLM round ({total} avoided so far)")
+    return total
@@ -0,0 +1,161 @@
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+
+from config import LOCAL_SCHEDULER_SETTINGS
+
+# Every request to the local model goes through here. Requests wait in one
+# priority queue (interactive > generation > fix > background, FIFO within a
+# class) and at most max_concurrent run at once. When a request has to wait
+# while a preemptible class is running, the running one is cancelled so
+# interactive latency doesn't depend on background work. Cancellation is
+# cooperative: the caller checks ticket.cancelled between streamed chunks.
+PRIORITIES = {"interactive": 0, "generation": 1, "fix": 2, "background": 3}
+REQUEST_PRIORITIES = {
+    "chat": "interactive",
+    "expand": "generation",
+    "generate": "generation",
+    "warmup": "generation",
+    "fix": "fix",
+    "background": "background",
+}
+
+_cond = threading.Condition()
+_settings = dict(LOCAL_SCHEDULER_SETTINGS)
+_queue = []
+_running = []
+_seq = itertools.count()
+_stats = {name: {"requests": 0, "cancelled": 0, "preempted": 0, "max_depth": 0, "waits": []} for name in PRIORITIES}
+
+
+def get_scheduler_settings(config=None):
+    settings = dict(LOCAL_SCHEDULER_SETTINGS)
+    if config:
+        settings.update(config.get("local_scheduler", {}))
+    return settings
+
+
+def configure(config=None):
+    with _cond:
+        _settings.update(get_scheduler_settings(config))
+        _cond.notify_all()
+
+
+def priority_class(request_class):
+    return REQUEST_PRIORITIES.get(request_class, "generation")
+
+
+class Ticket:
+    def __init__(self, request_class):
+        self.request_class = request_class
+        self.priority_class = priority_class(request_class)
+        self.priority = PRIORITIES[self.priority_class]
+        self.cancelled = threading.Event()
+        self.queued_at = time.time()
+        self.started_at = None
+
+
+def _depth(name):
+    return sum(1 for _, _, t in _queue if t.priority_class == name)
+
+
+def _preempt(ticket):
+    # Called with _cond held when ticket can't start right away.
+    victims = [t for t in _running if t.priority_class in _settings["preemptible"]
+               and t.priority > ticket.priority and not t.cancelled.is_set()]
+    if victims:
+        victim = max(victims, key=lambda t: (t.priority, t.started_at))
+        victim.cancelled.set()
+        _stats[victim.priority_class]["preempted"] += 1
+        print(f"⏸️ Paused {victim.request_class} request for a {ticket.request_class} request")
+
+
+def acquire(ticket):
+    # Blocks until the ticket may run; -> False if it was cancelled while queued.
+    with _cond:
+        entry = (ticket.priority, next(_seq), ticket)
+        heapq.heappush(_queue, entry)
+        stats = _stats[ticket.priority_class]
+        stats["requests"] += 1
+        stats["max_depth"] = max(stats["max_depth"], _depth(ticket.priority_class))
+        while True:
+            if ticket.cancelled.is_set():
+                _queue.remove(entry)
+                heapq.heapify(_queue)
+                stats["cancelled"] += 1
+                _cond.notify_all()
+                return False
+            if _queue[0] is entry and len(_running) < _settings["max_concurrent"]:
+                heapq.heappop(_queue)
+                ticket.started_at = time.time()
+                _running.append(ticket)
+                stats["waits"].append(ticket.started_at - ticket.queued_at)
+                del stats["waits"][:-_settings["wait_window"]]
+                _cond.notify_all()
+                return True
+            if _queue[0] is entry:
+                _preempt(ticket)
+            _cond.wait(0.5)
+
+
+def release(ticket):
+    with _cond:
+        if ticket in _running:
+            _running.remove(ticket)
+        if ticket.cancelled.is_set():
+            _stats[ticket.priority_class]["cancelled"] += 1
+        _cond.notify_all()
+
+
+@contextmanager
+def slot(request_class):
+    # Yields the ticket; check ticket.cancelled before and while using the model.
+    ticket = Ticket(request_class)
+    granted = acquire(ticket)
+    try:
+        yield ticket
+    finally:
+        if granted:
+            release(ticket)
+
+
+def cancel(name=None):
+    # Cancels queued and running requests of one priority class (or all); -> count
+    with _cond:
+        tickets = [t for _, _, t in _queue] + list(_running)
+        hit = [t for t in tickets if name in (None, t.priority_class) and not t.cancelled.is_set()]
+        for ticket in hit:
+            ticket.cancelled.set()
+        _cond.notify_all()
+    return len(hit)
+
+
+def stats():
+    with _cond:
+        result = {}
+        for name, s in _stats.items():
+            waits = sorted(s["waits"])
+            result[name] = {
+                "queued": _depth(name),
+                "running": sum(1 for t in _running if t.priority_class == name),
+                "requests": s["requests"], "cancelled": s["cancelled"], "preempted": s["preempted"],
+                "max_depth": s["max_depth"],
+                "median_wait": waits[len(waits) // 2] if waits else None,
+                "p95_wait": waits[min(len(waits) - 1, int(0.95 * len(waits)))] if waits else None,
+            }
+        return result
+
+
+def report():
+    lines = [f"Local model queue (max {_settings['max_concurrent']} at once):"]
+    for name, s in stats().items():
+        if not s["requests"]:
+            continue
+        wait = (f"wait median {s['median_wait']:.1f}s p95 {s['p95_wait']:.1f}s" if s["median_wait"] is not None
+                else "no waits yet")
+        lines.append(f"  {name}: {s['running']} running · {s['queued']} queued (peak {s['max_depth']}) · "
+                     f"{s['requests']} requests · {wait} · "
+                     f"{s['cancelled']} cancelled ({s['preempted']} preempted)")
+    return "\n".join(lines) if len(lines) > 1 else "Local model queue: no requests yet."
@@ -0,0 +1,181 @@
+import os
+import time
+import queue
+import argparse
+import threading
+import logging
+import logging.handlers
+
+from config import LOG_DIR, LOG_SETTINGS
+
+# Every log write from any thread lands in one queue. The Tk thread drains it
+# at a fixed rate, joins each batch per widget and inserts it with a single
+# insert/see, so a burst of pip output costs one redraw per frame instead of
+# one event per line. Widgets are capped to the last max_lines lines, and
+# lines that would be trimmed right away are never inserted. A background
+# thread mirrors the same text to a rotating file.
+LOG_WIDGETS = ('mini_log', 'log_text', 'build_log')
+PROJECT_WIDGETS = ('generate_output',) + LOG_WIDGETS
+
+MAX_DRAIN_ITEMS = 5000
+FILE_CHUNK_CHARS = 256 * 1024
+
+_queue = queue.SimpleQueue()
+_file_queue = queue.SimpleQueue()
+_app = None
+_settings = dict(LOG_SETTINGS)
+_stats = {"batches": 0, "chars": 0, "max_drain_ms": 0.0, "skipped_lines": 0}
+_file_thread = None
+_lock = threading.Lock()
+
+
+def _file_writer():
+    os.makedirs(LOG_DIR, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(os.path.join(LOG_DIR, "builder.log"), encoding="utf-8",
+                                                   maxBytes=_settings["max_bytes"], backupCount=_settings["backups"])
+    handler.terminator = ""
+    while True:
+        chunks = [_file_queue.get()]
+        size = len(chunks[0])
+        time.sleep(0.2)
+        while True:
+            try:
+                chunk = _file_queue.get_nowait()
+            except queue.Empty:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= FILE_CHUNK_CHARS:
+                # Emit in pieces so rollover happens close to max_bytes.
+                handler.emit(logging.makeLogRecord({"msg": "".join(chunks)}))
+                chunks, size = [], 0
+        if chunks:
+            handler.emit(logging.makeLogRecord({"msg": "".join(chunks)}))
+
+
+def _start_file_writer():
+    global _file_thread
+    with _lock:
+        if _file_thread is None:
+            _file_thread = threading.Thread(target=_file_writer, daemon=True)
+            _file_thread.start()
+
+
+def attach(app, config=None):
+    global _app
+    _settings.update((config or {}).get("log", {}))
+    if _app is app:
+        return
+    _app = app
+    _start_file_writer()
+    app.after(0, _drain)
+
+
+def write(widgets, text, app=None):
+    if not text:
+        return
+    if _app is None and app is not None and hasattr(app, 'after'):
+        attach(app)
+    _start_file_writer()
+    _file_queue.put(text)
+    if _app is not None:
+        _queue.put((widgets, text))
+
+
+def _tail(text, max_lines):
+    # Keep only what would survive the widget's line cap.
+    if text.count("\n") <= max_lines:
+        return text, 0
+    lines = text.split("\n")
+    keep = lines[-(max_lines + 1):]
+    return "\n".join(keep), len(lines) - len(keep)
+
+
+def _trim(widget, max_lines):
+    lines = int(widget.index("end-1c").split(".")[0])
+    if lines > max_lines:
+        widget.delete("1.0", f"{lines - max_lines + 1}.0")
+
+
+def _drain():
+    app = _app
+    if app is None:
+        return
+    start = time.perf_counter()
+    batches = {}
+    for _ in range(min(_queue.qsize(), MAX_DRAIN_ITEMS)):
+        try:
+            widgets, text = _queue.get_nowait()
+        except queue.Empty:
+            break
+        for name in widgets:
+            batches.setdefault(name, []).append(text)
+    max_lines = _settings["max_lines"]
+    for name, parts in batches.items():
+        widget = getattr(app, name, None)
+        if not widget:
+            continue
+        text, skipped = _tail("".join(parts), max_lines)
+        try:
+            widget.insert("end", text)
+            _trim(widget, max_lines)
+            widget.see("end")
+        except Exception:
+            continue
+        _stats["skipped_lines"] += skipped
+        _stats["chars"] += len(text)
+    if batches:
+        _stats["batches"] += 1
+        _stats["max_drain_ms"] = max(_stats["max_drain_ms"], (time.perf_counter() - start) * 1000)
+    try:
+        app.after(int(1000 / _settings["fps"]), _drain)
+    except Exception:
+        pass
+
+
+def stats():
+    return dict(_stats, queued=_queue.qsize())
+
+
+def _stress(lines):
+    import customtkinter as ctk
+    root = ctk.CTk()
+    root.geometry("900x600")
+    root.log_text = ctk.CTkTextbox(root)
+    root.log_text.pack(fill="both", expand=True)
+    attach(root)
+    gaps = []
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+        if _queue.qsize() or producer.is_alive():
+            root.after(10, tick)
+        else:
+            root.after(500, root.destroy)
+
+    def produce():
+        for i in range(lines):
+            write(LOG_WIDGETS, f"stress line {i} " + "x" * 60 + "\n")
+
+    started = time.perf_counter()
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    root.after(10, tick)
+    root.mainloop()
+    s = stats()
+    print(f"{lines} lines in {time.perf_counter() - started:.1f}s · {s['batches']} batches · "
+          f"slowest drain {s['max_drain_ms']:.0f} ms · longest UI stall {max(gaps) * 1000:.0f} ms · "
+          f"{s['skipped_lines']} lines never inserted")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log sink tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stress = sub.add_parser("stress", help="write many lines into a log widget and report UI stalls")
+    stress.add_argument("--lines", type=int, default=100000)
+    args = parser.parse_args()
+    if args.command == "stress":
+        _stress(args.lines)
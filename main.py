@@ -4,24 +4,36 @@ import shutil
 import difflib
 import threading
 import customtkinter as ctk
+import tkinter
 import tkinter.messagebox as messagebox
-import importlib.util
 import time
 import datetime
-import ollama
-from openai import OpenAI
 import subprocess
 import sys
+import traceback
 
-from config import gemini_folder, EXPAND_MODEL, XAI_API_KEY, GROK_MODEL, load_config, save_config, validate_config, LLM_PROVIDERS, get_available_providers
+from config import gemini_folder, ensure_dirs, EXPAND_MODEL, GROK_MODEL, get_xai_api_key, load_config, save_config, validate_config, LLM_PROVIDERS, get_available_providers
 from browser_automation import get_grok_response_via_browser
-from ai_functions import ping_pong_fix, grok_syntax_rescue, get_fix_provider
+from ai_functions import ping_pong_fix, grok_syntax_rescue, chat_ollama, GenerationCancelled
 from constants import *
 from views import (create_top_bar, create_sliding_menu, create_main_view, create_idea_chat_view,
                    create_logs_view, create_config_view, create_build_view, _build_llm_toggle, _highlight_selected)
-from utils import redirect_print_to_log, log, project_log, restart_ollama
+from utils import redirect_print_to_log, log, project_log, token_sink
+from llm_clients import get_openai_client, close_all_clients
+import dep_store
+import import_scanner
+import wheelhouse
+import provider_router
+import fix_memory
+import local_fixers
+import preview_host
+import model_residency
+import local_scheduler
+import suggestion_pool
+import file_watcher
 from handlers import (generate_app, write_files, ping_pong_fix_gui, start_launch_thread,
-                      launch_app_gui, prepare_pending, commit_pending, undo_changes, start_generate_thread)
+                      launch_app_gui, prepare_pending, commit_pending, commit_candidate, undo_changes, start_generate_thread)
+from fix_engine import parallel_fix, SMOKE_SCRIPT
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("dark-blue")
@@ -50,7 +62,8 @@ class AppBuilderGUI(ctk.CTk):
         self.error_log = ""
         self.pending_folder = None
         self.menu_open = False
-        self.preview_instance = None
+        self.preview_host = None
+        self.project_watcher = None
         self.preview_success = False
         self.chat_history = []
         self.generating = False
@@ -58,6 +71,8 @@ class AppBuilderGUI(ctk.CTk):
         self._loading_preview = False
         self._fixing_in_progress = False
         self._thinking_label = None
+        self._prefetched_packages = set()
+        self._dep_prefetch = None
 
         create_top_bar(self)
         create_sliding_menu(self)
@@ -77,6 +92,9 @@ class AppBuilderGUI(ctk.CTk):
         self._ollama_ready = threading.Event()
         threading.Thread(target=self.warmup_ollama, daemon=True).start()
         threading.Thread(target=self.load_suggestion_bubbles, daemon=True).start()
+        threading.Thread(target=dep_store.gc_store, args=(gemini_folder,), daemon=True).start()
+        threading.Thread(target=import_scanner.prune_cache, daemon=True).start()
+        threading.Thread(target=preview_host.warm, args=(preview_host.get_preview_settings(self.config),), daemon=True).start()
 
         self.start_generate_thread = start_generate_thread.__get__(self, AppBuilderGUI)
         self.generate_app = generate_app.__get__(self, AppBuilderGUI)
@@ -86,67 +104,43 @@ class AppBuilderGUI(ctk.CTk):
         self.launch_app_gui = launch_app_gui.__get__(self, AppBuilderGUI)
         self.prepare_pending = prepare_pending.__get__(self, AppBuilderGUI)
         self.commit_pending = commit_pending.__get__(self, AppBuilderGUI)
+        self.commit_candidate = commit_candidate.__get__(self, AppBuilderGUI)
+        self.parallel_fix = parallel_fix.__get__(self, AppBuilderGUI)
         self.undo_changes = undo_changes.__get__(self, AppBuilderGUI)
         self.build_from_ideate = self.build_from_ideate
         self.deploy_app = self.deploy_app
 
     def warmup_ollama(self):
+        # Loads Qwen once and keeps it resident; readiness comes from the API.
+        model_residency.configure(self.config)
+        local_scheduler.configure(self.config)
+        model_residency.add_listener(lambda model, state: self.after(0, self._show_model_state))
         try:
-            time.sleep(0.3)
             self.after(0, lambda: log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] [STARTUP] Warming up Ollama with Qwen..."))
-            restart_ollama()
-            time.sleep(5)
-            ollama.chat(model=EXPAND_MODEL, messages=[{"role": "user", "content": "warmup"}])
-            self.after(0, lambda: log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] [STARTUP] Qwen model ready."))
+            start = time.time()
+            if not model_residency.wait_ready():
+                raise RuntimeError("Ollama API is not reachable")
+            if not model_residency.preload(EXPAND_MODEL):
+                raise RuntimeError(f"could not load {EXPAND_MODEL}")
+            self.after(0, lambda: log(self, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] [STARTUP] Qwen model ready in {time.time() - start:.1f}s."))
         except Exception as e:
             err_msg = f"[{datetime.datetime.now().strftime('%H:%M:%S')}] [STARTUP] Qwen warmup failed: {str(e)}"
             self.after(0, lambda msg=err_msg: log(self, msg))
         finally:
             self._ollama_ready.set()
+            model_residency.start_monitor()
+            self.after(0, self._show_model_state)
+
+    def _show_model_state(self):
+        state = model_residency.state(EXPAND_MODEL)
+        colors = {"ready": ACCENT_GREEN, "loading": ACCENT_CYAN, "failed": ACCENT_RED, "offline": ACCENT_RED}
+        try:
+            self.model_state_label.configure(text=f"● Qwen: {state}", text_color=colors.get(state, TEXT_DIM))
+        except Exception:
+            pass
 
     def _scan_imports(self, folder):
-        import_to_pip = {
-            'cv2': 'opencv-python', 'PIL': 'pillow', 'skimage': 'scikit-image',
-            'sklearn': 'scikit-learn', 'yaml': 'pyyaml', 'bs4': 'beautifulsoup4',
-            'gi': 'PyGObject', 'wx': 'wxPython', 'attr': 'attrs',
-            'serial': 'pyserial', 'usb': 'pyusb', 'Crypto': 'pycryptodome',
-            'dateutil': 'python-dateutil', 'dotenv': 'python-dotenv',
-            'websocket': 'websocket-client', 'google.protobuf': 'protobuf',
-        }
-        stdlib = set(sys.stdlib_module_names) if hasattr(sys, 'stdlib_module_names') else {
-            'os', 'sys', 'io', 're', 'math', 'json', 'time', 'datetime', 'random',
-            'collections', 'itertools', 'functools', 'pathlib', 'shutil', 'subprocess',
-            'threading', 'multiprocessing', 'socket', 'http', 'urllib', 'email',
-            'logging', 'unittest', 'typing', 'abc', 'copy', 'string', 'textwrap',
-            'struct', 'hashlib', 'hmac', 'secrets', 'tempfile', 'glob', 'fnmatch',
-            'csv', 'configparser', 'argparse', 'gettext', 'locale', 'calendar',
-            'pprint', 'enum', 'dataclasses', 'contextlib', 'decimal', 'fractions',
-            'statistics', 'array', 'queue', 'heapq', 'bisect', 'weakref',
-            'types', 'operator', 'pickle', 'shelve', 'sqlite3', 'zlib', 'gzip',
-            'zipfile', 'tarfile', 'xml', 'html', 'webbrowser', 'uuid', 'platform',
-            'ctypes', 'traceback', 'warnings', 'signal', 'mmap', 'codecs',
-            'importlib', 'pkgutil', 'inspect', 'dis', 'ast', 'token', 'tokenize',
-            'tkinter', '_tkinter', 'idlelib',
-        }
-        found = set()
-        for root, dirs, files in os.walk(folder):
-            for fname in files:
-                if not fname.endswith('.py'):
-                    continue
-                try:
-                    with open(os.path.join(root, fname), 'r', errors='ignore') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line.startswith('import ') or line.startswith('from '):
-                                parts = line.replace('from ', '').replace('import ', '').split()[0]
-                                top = parts.split('.')[0]
-                                if top and top not in stdlib and not top.startswith('_'):
-                                    pip_name = import_to_pip.get(top, top)
-                                    found.add(pip_name)
-                except Exception:
-                    pass
-        found.add('customtkinter')
-        return sorted(found)
+        return import_scanner.scan_project(folder)
 
     def _get_pip_cmd(self):
         import shutil
@@ -156,48 +150,57 @@ class AppBuilderGUI(ctk.CTk):
         return [sys.executable, "-m", "pip"]
 
     def _get_deps_dir(self, folder):
-        deps_dir = os.path.join(folder, "deps")
-        os.makedirs(deps_dir, exist_ok=True)
-        return deps_dir
-
-    def _add_deps_to_path(self, folder):
-        deps_dir = self._get_deps_dir(folder)
-        if deps_dir not in sys.path:
-            sys.path.insert(0, deps_dir)
+        return dep_store.resolve_deps_dir(folder)
+
+    def _sync_requirements(self, folder):
+        scanned = self._scan_imports(folder)
+        req_path = os.path.join(folder, "requirements.txt")
+        existing = set()
+        if os.path.exists(req_path):
+            with open(req_path, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        existing.add(line.split('>=')[0].split('==')[0].split('<')[0].strip().lower())
+        for p in scanned:
+            if p.lower() not in existing:
+                with open(req_path, "a") as f:
+                    f.write(f"{p}\n")
+        return scanned
 
     def ensure_dependencies(self, folder, callback=None):
         def install_thread():
             try:
+                if self._dep_prefetch:
+                    self._dep_prefetch.join()
                 self.after(0, lambda: project_log(self, "🔧 Detecting missing modules..."))
-                scanned = self._scan_imports(folder)
+                scanned = self._sync_requirements(folder)
                 pkg_list = ", ".join(scanned)
                 self.after(0, lambda msg=pkg_list: project_log(self, f"📋 Detected packages: {msg}"))
 
-                req_path = os.path.join(folder, "requirements.txt")
-                existing = set()
-                if os.path.exists(req_path):
-                    with open(req_path, "r") as f:
-                        for line in f:
-                            line = line.strip()
-                            if line and not line.startswith('#'):
-                                existing.add(line.split('>=')[0].split('==')[0].split('<')[0].strip().lower())
-                for p in scanned:
-                    if p.lower() not in existing:
-                        with open(req_path, "a") as f:
-                            f.write(f"{p}\n")
+                start = time.time()
+                requirements = dep_store.read_requirements(folder)
+                key = dep_store.requirement_key(requirements)
+                if dep_store.lock_matches(folder, key) or dep_store.is_ready(key):
+                    if not dep_store.lock_matches(folder, key):
+                        dep_store.link_project(folder, key)
+                    self.after(0, lambda k=key[:12], ms=(time.time() - start) * 1000: project_log(self, f"✅ Requirements unchanged ({k}) — skipped pip, ready in {ms:.0f} ms"))
+                    if callback:
+                        self.after(500, callback)
+                    return
 
                 pip_cmd = self._get_pip_cmd()
-                deps_dir = self._get_deps_dir(folder)
-                self.after(0, lambda: project_log(self, "📦 Installing packages to project deps folder..."))
+                staging = dep_store.begin_install(key)
+                self.after(0, lambda: project_log(self, "📦 Installing packages to shared dependency store..."))
                 result = subprocess.run(
-                    pip_cmd + ["install", "--upgrade", "--target", deps_dir, "-r", "requirements.txt", "--quiet"],
+                    pip_cmd + ["install", "--target", staging, "--quiet"] + wheelhouse.pip_index_args(self.config) + requirements,
                     cwd=folder, timeout=300, capture_output=True, text=True
-                )
-
-                self._add_deps_to_path(folder)
+                ) if requirements else subprocess.CompletedProcess([], 0, "", "")
 
                 if result.returncode == 0:
-                    self.after(0, lambda: project_log(self, "✅ All dependencies installed & up to date"))
+                    dep_store.finish_install(key, staging, requirements)
+                    dep_store.link_project(folder, key)
+                    self.after(0, lambda secs=time.time() - start: project_log(self, f"✅ All dependencies installed & up to date ({secs:.1f}s)"))
                     if callback:
                         self.after(500, callback)
                     return
@@ -205,28 +208,34 @@ class AppBuilderGUI(ctk.CTk):
                 stderr_msg = result.stderr[:800] if result.stderr else "Unknown install error"
                 self.after(0, lambda msg=stderr_msg: project_log(self, f"❌ Batch install failed: {msg}"))
 
-                self.after(0, lambda: project_log(self, "🔄 Retrying packages individually..."))
-                all_ok = True
-                with open(req_path, "r") as f:
-                    pkgs = [l.strip() for l in f if l.strip() and not l.startswith('#')]
-                for pkg in pkgs:
-                    r = subprocess.run(
-                        pip_cmd + ["install", "--upgrade", "--target", deps_dir, pkg, "--quiet"],
-                        timeout=120, capture_output=True, text=True
-                    )
-                    if r.returncode != 0:
-                        fail_msg = f"⚠️ Failed: {pkg}"
-                        self.after(0, lambda msg=fail_msg: project_log(self, msg))
-                        all_ok = False
+                self.after(0, lambda: project_log(self, "🔄 Building packages in parallel into the local wheelhouse..."))
+                def _report(r):
+                    if r["ok"]:
+                        msg = f"  ✓ {r['requirement']} ({r['seconds']:.1f}s{', cached' if r['cached'] else ''})"
                     else:
-                        ok_msg = f"  ✓ {pkg}"
-                        self.after(0, lambda msg=ok_msg: project_log(self, msg))
+                        msg = f"⚠️ Failed: {r['requirement']} ({r['seconds']:.1f}s) {r['error'][-200:]}"
+                    self.after(0, lambda m=msg: project_log(self, m))
+                wheel_start = time.time()
+                results = wheelhouse.build_wheels(pip_cmd, requirements,
+                                                  max_workers=self.config.get("wheel_workers", wheelhouse.DEFAULT_WORKERS),
+                                                  timeout=120, on_result=_report,
+                                                  offline=wheelhouse.is_offline(self.config))
+                all_ok = all(r["ok"] for r in results)
+                if all_ok:
+                    r = wheelhouse.install_from_wheelhouse(pip_cmd, requirements, staging)
+                    all_ok = r.returncode == 0
+                    if not all_ok:
+                        stderr_msg = r.stderr[:800] if r.stderr else stderr_msg
+                self.after(0, lambda secs=time.time() - wheel_start: project_log(self, f"⏱ Wheelhouse fallback took {secs:.1f}s"))
 
                 if all_ok:
-                    self.after(0, lambda: project_log(self, "✅ All dependencies installed (individual mode)"))
+                    dep_store.finish_install(key, staging, requirements)
+                    dep_store.link_project(folder, key)
+                    self.after(0, lambda: project_log(self, "✅ All dependencies installed (wheelhouse mode)"))
                     if callback:
                         self.after(500, callback)
                     return
+                dep_store.abort_install(staging)
 
                 if not self._fixing_in_progress:
                     self._fixing_in_progress = True
@@ -241,6 +250,26 @@ class AppBuilderGUI(ctk.CTk):
 
         threading.Thread(target=install_thread, daemon=True).start()
 
+    def refresh_dependencies(self):
+        folder = self.app_folder
+        if not folder:
+            messagebox.showinfo("Info", "Create or select a project first.")
+            return
+        def _run():
+            start = time.time()
+            self.after(0, lambda: project_log(self, "⟳ Refreshing dependencies (forced upgrade)..."))
+            try:
+                self._sync_requirements(folder)
+                ok, err, _, _ = dep_store.ensure_project_deps(folder, self._get_pip_cmd(), refresh=True,
+                                                              index_args=wheelhouse.pip_index_args(self.config))
+            except Exception as e:
+                ok, err = False, str(e)
+            if ok:
+                self.after(0, lambda secs=time.time() - start: project_log(self, f"✅ Dependencies refreshed in {secs:.1f}s"))
+            else:
+                self.after(0, lambda msg=err[:800]: project_log(self, f"❌ Dependency refresh failed: {msg}"))
+        threading.Thread(target=_run, daemon=True).start()
+
     def create_snapshot(self):
         if not self.app_folder or not os.path.isdir(self.app_folder):
             return
@@ -273,7 +302,7 @@ class AppBuilderGUI(ctk.CTk):
         names = ", ".join(restored)
         self.after(0, lambda n=names: project_log(self, f"⏪ Restored from snapshot: {n}"))
         self._fixing_in_progress = False
-        self.after(0, self._try_load_module)
+        self.after(0, self._reload_now)
 
     def has_snapshot(self):
         if not self.app_folder:
@@ -332,62 +361,30 @@ class AppBuilderGUI(ctk.CTk):
 
     def smart_fix_loop(self, error):
         def _run():
+            err = error
             try:
                 self.create_snapshot()
-
-                for attempt in range(2):
-                    self.after(0, lambda a=attempt+1: project_log(self, f"🔄 Qwen smart fix attempt {a}/2..."))
-                    self.after(0, lambda a=attempt+1: self._show_thinking_indicator(f"Qwen is analyzing & fixing (attempt {a}/2)..."))
-
-                    snapshot_dir = os.path.join(self.app_folder, ".backup")
-                    self.ping_pong_fix_gui(f"Preview failed with error: {error}. This is Qwen attempt {attempt+1}/2. Fix the code so the AppFrame runs perfectly with current CustomTkinter (remove CTkProgressbar if not available). Output full main.py and requirements.txt.", fixer_choice='1', auto_preview=False)
-
-                    if self.pending_folder and os.path.exists(self.pending_folder):
-                        valid, reason = self._validate_fix(self.pending_folder)
-                        if not valid:
-                            self.after(0, lambda r=reason: project_log(self, f"❌ Fix rejected (invalid): {r}"))
-                            continue
-
-                        safe, reason = self._check_diff_size(snapshot_dir, self.pending_folder)
-                        if not safe:
-                            self.after(0, lambda r=reason: project_log(self, f"❌ Fix rejected (too destructive): {r}"))
-                            continue
-
-                    self.after(0, self.commit_pending)
-                    time.sleep(1)
-                    self.after(0, self._try_load_module)
-                    time.sleep(2)
-                    if self.preview_success:
-                        self.after(0, lambda: project_log(self, "✅ Preview succeeded after Qwen fix!"))
+                fixed_by = local_fixers.apply(self.app_folder, err)
+                if fixed_by:
+                    self.after(0, lambda n=", ".join(fixed_by): project_log(self, f"🔧 Local fix applied ({n}) — retrying preview"))
+                    if "missing_module" in fixed_by:
+                        dep_store.ensure_project_deps(self.app_folder, self._get_pip_cmd(),
+                                                      index_args=wheelhouse.pip_index_args(self.config))
+                    if self._reload_preview_and_wait():
+                        local_fixers.record_avoided(fixed_by)
+                        self.after(0, lambda: project_log(self, "✅ Preview fixed locally — no LLM call needed"))
                         self.after(0, self._update_undo_button_state)
                         return
+                    err = getattr(self, 'preview_error', None) or err
+                self.error_log = err
+                winner = self.ping_pong_fix_gui(f"Preview failed with error: {err}. Fix the code so the AppFrame runs perfectly with current CustomTkinter (remove CTkProgressbar if not available). Update requirements.txt if packages change.", auto_preview=False, crash=err)
+                if not winner:
+                    self.after(0, lambda: project_log(self, "⏪ Restoring snapshot..."))
+                    self.restore_snapshot()
+                    return
 
-                cloud_provider = get_fix_provider(self.selected_provider, self.config)
-                if cloud_provider == "ollama":
-                    cloud_provider = "xai"
-                cloud_name = LLM_PROVIDERS.get(cloud_provider, {}).get("name", cloud_provider)
-                self.after(0, lambda n=cloud_name: project_log(self, f"Qwen couldn't fix in 2 rounds → {n} taking over"))
-                self.after(0, lambda n=cloud_name: self._show_thinking_indicator(f"{n} is fixing the code..."))
-                self.ping_pong_fix_gui(f"Preview failed with error: {error}. Fix the code so the AppFrame runs perfectly with current CustomTkinter. Output full main.py and requirements.txt.", fixer_choice='2', auto_preview=False)
-
-                if self.pending_folder and os.path.exists(self.pending_folder):
-                    valid, reason = self._validate_fix(self.pending_folder)
-                    if not valid:
-                        self.after(0, lambda r=reason: project_log(self, f"❌ Cloud fix rejected (invalid): {r}"))
-                        self.after(0, lambda: project_log(self, "⏪ Restoring snapshot..."))
-                        self.restore_snapshot()
-                        return
-
-                    safe, reason = self._check_diff_size(snapshot_dir, self.pending_folder, is_cloud=True)
-                    if not safe:
-                        self.after(0, lambda r=reason: project_log(self, f"❌ Cloud fix rejected (too destructive): {r}"))
-                        self.after(0, lambda: project_log(self, "⏪ Restoring snapshot..."))
-                        self.restore_snapshot()
-                        return
-
-                self.after(0, self.commit_pending)
-                time.sleep(1)
-                self.after(0, self._try_load_module)
+                if self._reload_preview_and_wait(lambda: self.commit_candidate(winner)):
+                    self.after(0, lambda: project_log(self, "✅ Preview succeeded after fix!"))
                 self.after(0, self._update_undo_button_state)
             finally:
                 self._fixing_in_progress = False
@@ -478,43 +475,46 @@ class AppBuilderGUI(ctk.CTk):
                 self._bubble_descs[i].configure(text=desc_part)
 
     def load_suggestion_bubbles(self):
-        fallback = [
-            "GlassShelf: Sort and organize files with neon-lit panels and smooth drag-and-drop.",
-            "NeonDive: Explore data with glowing interactive charts and real-time filtering.",
-            "GlowZone: Dynamic wallpaper creator with gradient blending and light effects.",
-            "CodeFlow: Smart code formatter with syntax highlighting and neon color palettes."
-        ]
-        self.after(0, self.populate_bubbles, fallback)
-
-        self._ollama_ready.wait(timeout=120)
-
-        prompt = """Generate exactly 4 exciting modern Python desktop app ideas that MUST use CustomTkinter for the UI.
-Format each as: AppName: One-sentence description (60-100 characters) highlighting a sleek dark glassmorphism UI with neon glow effects.
-Do not mention 'CustomTkinter' in the description text.
-Do not add any introductory text, numbering, or extra lines.
-Output ONLY the 4 formatted lines."""
-        for attempt in range(5):
+        # Cards come from the on-disk pool right away; the model is only asked
+        # to top the pool up, later, when nothing else needs it.
+        ideas = suggestion_pool.take(4, self.config)
+        self.after(0, self.populate_bubbles, ideas + suggestion_pool.FALLBACK[len(ideas):])
+        self._ollama_ready.wait()
+        self._refill_suggestions(show_first_batch=len(ideas) < 4)
+
+    def _model_idle(self, settings):
+        return (not self.generating and model_residency.state(EXPAND_MODEL) == "ready"
+                and model_residency.idle_seconds(EXPAND_MODEL) >= settings["idle_seconds"])
+
+    def _yield_to_user(self, chunk):
+        # Other model requests preempt this through the scheduler; a generation
+        # that is between model calls should win too.
+        if self.generating:
+            raise GenerationCancelled("suggestions")
+
+    def _refill_suggestions(self, show_first_batch=False):
+        settings = suggestion_pool.get_pool_settings(self.config)
+        while suggestion_pool.fresh_count() < settings["min_fresh"]:
+            if not self._model_idle(settings):
+                time.sleep(1)
+                continue
             try:
-                resp = ollama.chat(model=EXPAND_MODEL, messages=[{"role": "user", "content": prompt}])
-                raw_lines = resp['message']['content'].strip().split('\n')
-                ideas = []
-                for line in raw_lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    import re
-                    line = re.sub(r'^\d+[\.\)\-]\s*', '', line).strip()
-                    if ':' in line and len(line) > 10:
-                        ideas.append(line)
-                if len(ideas) >= 2:
-                    while len(ideas) < 4:
-                        ideas.append(fallback[len(ideas)])
-                    self.after(0, self.populate_bubbles, ideas[:4])
-                    return
+                text = chat_ollama(EXPAND_MODEL, suggestion_pool.PROMPT, on_token=self._yield_to_user,
+                                   use_cache=False, request_class="background", config=self.config)
+            except GenerationCancelled:
+                continue
             except Exception as e:
-                err_msg = f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Suggestion attempt {attempt+1} failed: {e}"
+                err_msg = f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Suggestion refill failed: {e}"
                 self.after(0, lambda msg=err_msg: log(self, msg))
-                time.sleep(3)
+                time.sleep(settings["retry_delay"])
+                continue
+            if not suggestion_pool.add(suggestion_pool.parse_ideas(text), self.config):
+                time.sleep(settings["retry_delay"])
+                continue
+            if show_first_batch:
+                show_first_batch = False
+                ideas = suggestion_pool.take(4, self.config)
+                self.after(0, self.populate_bubbles, ideas + suggestion_pool.FALLBACK[len(ideas):])
 
     def use_suggestion(self, text):
         if self.generating: return
@@ -580,60 +580,145 @@ Output ONLY the 4 formatted lines."""
         self.title_label.configure(text=title_text)
         self.title(title_text)
         self.show_build_view()
+        self._watch_project()
         self.load_preview()
 
     def load_projects(self):
         projects = sorted([d for d in os.listdir(gemini_folder) if os.path.isdir(os.path.join(gemini_folder, d))])
         self.project_menu.configure(values=["Select project..."] + projects)
 
-    def _try_load_module(self):
+    def _try_load_module(self, on_done=None, modules=None):
+        host = self.preview_host
+        if modules and host and host.loaded and host.alive():
+            started = time.time()
+            host.reload(modules, lambda kind, detail: self.after(0, lambda: self._on_preview_event(host, kind, detail, on_done, started, True)))
+            return
+        if self.preview_host:
+            self.preview_host.stop()
+            self.preview_host = None
         for w in self.main_content.winfo_children():
             w.destroy()
-        if self.preview_instance:
-            self.preview_instance.destroy()
-            self.preview_instance = None
         self.preview_success = False
 
+        main_path = os.path.join(self.app_folder, "main.py")
+        if not os.path.exists(main_path):
+            self._on_preview_event(None, "failed", f"No main.py in {self.app_folder}", on_done, time.time(), False)
+            return
+        window_id = None
+        if sys.platform == "darwin":
+            # Aqua Tk can't embed another process's window; the preview opens on its own.
+            ctk.CTkLabel(self.main_content, text="Preview runs in its own window", font=ctk.CTkFont(size=16), text_color=TEXT_DIM).pack(pady=20)
+        else:
+            container = tkinter.Frame(self.main_content, container=True, bg=BG_GLASS, highlightthickness=0)
+            container.pack(fill="both", expand=True)
+            self.update_idletasks()
+            window_id = container.winfo_id()
+
+        started = time.time()
         try:
-            self._add_deps_to_path(self.app_folder)
-            main_path = os.path.join(self.app_folder, "main.py")
-            if not os.path.exists(main_path):
-                raise FileNotFoundError(f"No main.py in {self.app_folder}")
-            spec = importlib.util.spec_from_file_location("main", main_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            if hasattr(module, 'AppFrame'):
-                self.preview_instance = module.AppFrame(self.main_content)
-                self.preview_instance.pack(fill="both", expand=True)
-                self.preview_success = True
-                project_log(self, "App preview loaded.")
+            host, warm = preview_host.acquire(preview_host.get_preview_settings(self.config))
+        except OSError as e:
+            self._on_preview_event(None, "failed", f"Could not start preview process: {e}", on_done, started, False)
+            return
+        self.preview_host = host
+        host.load(self.app_folder, self._get_deps_dir(self.app_folder), window_id,
+                  lambda kind, detail: self.after(0, lambda: self._on_preview_event(host, kind, detail, on_done, started, warm)))
+
+    def _on_preview_event(self, host, kind, detail, on_done, started, warm):
+        if host is not self.preview_host:
+            return
+        last_line = detail.strip().splitlines()[-1] if detail.strip() else kind
+        if kind == "output":
+            project_log(self, f"[app] {detail}")
+        elif kind == "runtime_error":
+            self.preview_error = detail
+            project_log(self, f"⚠️ Preview error: {last_line}")
+        elif kind == "loaded":
+            self.preview_success = True
+            if detail:
+                project_log(self, f"🔄 Hot-reloaded {detail} ({(time.time() - started) * 1000:.0f} ms).")
             else:
-                raise AttributeError("No AppFrame")
-        except Exception as e:
-            project_log(self, f"Preview failed: {e}")
-            error_label = ctk.CTkLabel(self.main_content, text="Preview not available (auto-fixing...)", font=ctk.CTkFont(size=20), text_color=TEXT_DIM)
-            error_label.pack(pady=20)
+                project_log(self, f"App preview loaded ({(time.time() - started) * 1000:.0f} ms, {'warm' if warm else 'cold'} interpreter).")
+            if on_done:
+                on_done(True)
+        else:
+            self.preview_success = False
+            self.preview_error = detail
+            self.preview_host = None
+            for w in self.main_content.winfo_children():
+                w.destroy()
+            if kind == "died":
+                project_log(self, f"⚠️ Preview stopped: {last_line}")
+                ctk.CTkLabel(self.main_content, text="Preview stopped — reload the project to restart it", font=ctk.CTkFont(size=20), text_color=TEXT_DIM).pack(pady=20)
+                return
+            project_log(self, f"Preview failed: {last_line}")
+            ctk.CTkLabel(self.main_content, text="Preview not available (auto-fixing...)", font=ctk.CTkFont(size=20), text_color=TEXT_DIM).pack(pady=20)
+            if on_done:
+                on_done(False)
+
+    def _watch_project(self):
+        if self.project_watcher:
+            self.project_watcher.stop()
+        settings = preview_host.get_preview_settings(self.config)
+        self.project_watcher = file_watcher.ProjectWatcher(
+            self.app_folder, lambda changed: self.after(0, lambda: self._on_project_changed(changed)),
+            debounce=settings["reload_debounce"], poll_interval=settings["poll_interval"])
+
+    def _on_project_changed(self, changed):
+        # Edits made outside the builder. Generation and fixes reload on their own.
+        if self.generating or self._fixing_in_progress or self._loading_preview:
+            return
+        project_log(self, f"📝 Changed: {', '.join(sorted(changed))}")
+        self._reload_changed(changed)
+
+    def _reload_changed(self, changed, on_done=None):
+        modules = file_watcher.module_names(changed)
+        if "requirements.txt" in changed:
+            self.ensure_dependencies(self.app_folder, callback=lambda: self._try_load_module(on_done=on_done))
+        elif modules:
+            self._try_load_module(on_done=on_done, modules=modules)
+        elif on_done:
+            on_done(self.preview_success)
+
+    def _reload_now(self, on_done=None):
+        # Reload whatever the builder itself just wrote, without waiting for the watcher's debounce.
+        if self.project_watcher:
+            self._reload_changed(self.project_watcher.flush(), on_done)
+        else:
+            self._try_load_module(on_done=on_done)
+
+    def _reload_preview_and_wait(self, change=None):
+        # For worker threads: apply `change` on the UI thread, reload what it
+        # touched and block until the preview reports back.
+        done = threading.Event()
+        def _apply():
+            if change:
+                change()
+            self._reload_now(on_done=lambda ok: done.set())
+        self.after(0, _apply)
+        done.wait(preview_host.get_preview_settings(self.config)["load_timeout"] + 10)
+        return self.preview_success
 
     def load_preview(self):
         if self._loading_preview:
             return
         self._loading_preview = True
 
-        self._try_load_module()
-
-        if not self.preview_success:
-            self.ensure_dependencies(self.app_folder, callback=self._on_deps_installed)
-        else:
-            self._loading_preview = False
+        def _done(ok):
+            if ok:
+                self._loading_preview = False
+            else:
+                self.ensure_dependencies(self.app_folder, callback=self._on_deps_installed)
+        self._try_load_module(on_done=_done)
 
     def _on_deps_installed(self):
-        self._try_load_module()
-        self._loading_preview = False
-
-        if not self.preview_success and not self._fixing_in_progress:
-            self._fixing_in_progress = True
-            e_str = "Preview failed after dependency install"
-            self.after(1000, lambda: self.smart_fix_loop(e_str))
+        def _done(ok):
+            self._loading_preview = False
+            if not ok and not self._fixing_in_progress:
+                self._fixing_in_progress = True
+                e_str = getattr(self, 'preview_error', None) or "Preview failed after dependency install"
+                self.after(1000, lambda: self.smart_fix_loop(e_str))
+        self._try_load_module(on_done=_done)
 
     def toggle_browser(self):
         self.use_browser_for_grok = self.use_browser_var.get()
@@ -648,6 +733,7 @@ Output ONLY the 4 formatted lines."""
 
     def save_config_gui(self):
         self.config['vpn_cmd'] = self.vpn_entry.get()
+        self.config["package_index"] = "offline" if self.offline_deps_var.get() else "online"
         llm_keys = self.config.get("llm_keys", {})
         for pid, entry in self._api_key_entries.items():
             val = entry.get().strip()
@@ -691,6 +777,7 @@ Output ONLY the 4 formatted lines."""
         self.hide_all_views()
         self.config_view.pack(fill="both", expand=True)
         self.current_view = "config"
+        self.provider_stats_label.configure(text=f"{provider_router.report()}\n\nFix memory: {fix_memory.report()}\n\n{model_residency.report()}\n{local_scheduler.report()}")
         if self.menu_open:
             self.toggle_menu()
 
@@ -723,19 +810,41 @@ Output ONLY the 4 formatted lines."""
     def _get_llm_response(self, prompt):
         try:
             llm = self.llm_selector.get()
+            on_token = None
+            if self.config.get("stream_tokens", True) and not (llm != "Ollama" and self.use_browser_for_grok):
+                self.after(0, lambda: self.chat_box.insert("end", f"{llm}: "))
+                on_token = token_sink(self, 'chat_box')
+            # Chat is never cached: asking the same thing again should get a fresh answer.
             if llm == "Ollama":
-                resp = ollama.chat(model=EXPAND_MODEL, messages=[{"role": "user", "content": prompt}])
-                answer = resp['message']['content']
+                answer = chat_ollama(EXPAND_MODEL, prompt, on_token, use_cache=False, request_class="chat",
+                                     config=self.config)
             else:
                 if self.use_browser_for_grok:
                     answer = get_grok_response_via_browser(prompt, self.config)
                 else:
-                    client = OpenAI(api_key=XAI_API_KEY, base_url="https://api.x.ai/v1")
-                    response = client.chat.completions.create(model=GROK_MODEL, messages=[{"role": "user", "content": prompt}])
-                    answer = response.choices[0].message.content
+                    client = get_openai_client("xai", get_xai_api_key(), config=self.config)
+                    messages = [{"role": "user", "content": prompt}]
+                    if on_token:
+                        stream = client.chat.completions.create(model=GROK_MODEL, messages=messages, stream=True)
+                        parts = []
+                        for event in stream:
+                            chunk = event.choices[0].delta.content if event.choices else None
+                            if chunk:
+                                parts.append(chunk)
+                                on_token(chunk)
+                        answer = "".join(parts)
+                    else:
+                        response = client.chat.completions.create(model=GROK_MODEL, messages=messages)
+                        answer = response.choices[0].message.content
             self.chat_history.append((llm, answer))
-            self.after(0, lambda: self.chat_box.insert("end", f"{llm}: {answer}\n\n"))
-            self.after(0, lambda: self.chat_box.see("end"))
+            if on_token:
+                def _end_answer():
+                    on_token.flush()
+                    self.chat_box.insert("end", "\n\n")
+                self.after(0, _end_answer)
+            else:
+                self.after(0, lambda: self.chat_box.insert("end", f"{llm}: {answer}\n\n"))
+            self.after(100, lambda: self.chat_box.see("end"))
         except Exception as e:
             error_msg = f"[{datetime.datetime.now().strftime('%H:%M:%S')}] [ERROR] {str(e)}"
             self.after(0, lambda: log(self, error_msg))
@@ -754,9 +863,29 @@ Output ONLY the 4 formatted lines."""
         threading.Thread(target=self.ping_pong_fix_gui, args=(user_feedback,), daemon=True).start()
         self.fix_entry.delete(0, "end")
 
+def run_child_script(script):
+    # Entry point for helper processes of a frozen build, which are started
+    # as the builder executable with a flag instead of `python -c`.
+    for fd, name in ((1, "stdout"), (2, "stderr")):
+        if getattr(sys, name) is None:
+            try:
+                setattr(sys, name, os.fdopen(fd, "w", buffering=1, encoding="utf-8", errors="replace"))
+            except OSError:
+                pass
+    sys.path[:0] = [p for p in os.environ.get("PYTHONPATH", "").split(os.pathsep) if p]
+    sys.argv = [sys.argv[0]] + sys.argv[2:]
+    exec(compile(script, "<child>", "exec"), {"__name__": "__main__"})
+    sys.exit(0)
+
+
 if __name__ == "__main__":
     import traceback
 
+    if len(sys.argv) > 1 and sys.argv[1] == "--preview-host":
+        run_child_script(preview_host.HOST_SCRIPT)
+    if len(sys.argv) > 1 and sys.argv[1] == "--smoke":
+        run_child_script(SMOKE_SCRIPT)
+
     if getattr(sys, 'frozen', False):
         import io
         log_path = os.path.join(os.path.dirname(sys.executable), "appbuilder.log")
@@ -784,8 +913,25 @@ if __name__ == "__main__":
     print(f"[STARTUP] Projects dir: {gemini_folder}")
     sys.stdout.flush()
 
+    ensure_dirs()
     ctk.set_widget_scaling(1.0)
     app = AppBuilderGUI()
+    probe_path = os.environ.get("APPBUILDER_STARTUP_PROBE")
+    if probe_path:
+        # startup_bench.py: note when the first window has been drawn, then quit.
+        def _first_window():
+            with open(probe_path, "w") as f:
+                f.write("shown")
+            app.destroy()
+        app.after_idle(_first_window)
     print("[STARTUP] App window created, entering mainloop")
     sys.stdout.flush()
     app.mainloop()
+    if app.project_watcher:
+        app.project_watcher.stop()
+    if app.preview_host:
+        app.preview_host.stop()
+    preview_host.shutdown()
+    local_scheduler.cancel()
+    model_residency.release_all()
+    close_all_clients()
@@ -0,0 +1,288 @@
+import time
+import shutil
+import threading
+import subprocess
+from contextlib import contextmanager
+
+from config import OLLAMA_RESIDENCY_SETTINGS
+from llm_clients import get_ollama_client
+import local_scheduler
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Keeps local models loaded in Ollama between requests. Models are preloaded
+# with an empty generate call and every chat passes keep_alive, so Ollama
+# never expires them on its own; readiness is checked through the API rather
+# than by sleeping. A monitor thread mirrors what Ollama reports as loaded and
+# unloads the least recently used idle model when free system memory drops
+# below min_free_mb. Time to first token is recorded per request class,
+# keeping the first request after startup apart from the ones after it.
+STATES = ("offline", "unloaded", "loading", "ready", "failed")
+
+_lock = threading.Lock()
+_settings = dict(OLLAMA_RESIDENCY_SETTINGS)
+_models = {}
+_listeners = []
+_ttft = {}
+_server = {"state": "offline", "spawned": False}
+_monitor = None
+
+
+def get_residency_settings(config=None):
+    settings = dict(OLLAMA_RESIDENCY_SETTINGS)
+    if config:
+        settings.update(config.get("ollama_residency", {}))
+    return settings
+
+
+def configure(config=None):
+    _settings.update(get_residency_settings(config))
+
+
+def keep_alive():
+    return _settings["keep_alive"]
+
+
+def add_listener(callback):
+    # callback(model, state) from whichever thread changed the state;
+    # model is None for server state changes.
+    _listeners.append(callback)
+
+
+def _notify(model, state):
+    for callback in list(_listeners):
+        try:
+            callback(model, state)
+        except Exception as e:
+            print(f"⚠️ Model state listener failed: {e}")
+
+
+def _model(model):
+    return _models.setdefault(model, {"state": "unloaded", "busy": 0, "last_used": 0.0, "size_mb": 0})
+
+
+def _set_state(model, state):
+    with _lock:
+        entry = _model(model)
+        changed = entry["state"] != state
+        entry["state"] = state
+    if changed:
+        _notify(model, state)
+
+
+def _set_server(state):
+    with _lock:
+        changed = _server["state"] != state
+        _server["state"] = state
+    if changed:
+        _notify(None, state)
+
+
+def state(model=None):
+    with _lock:
+        if model is None:
+            return _server["state"]
+        if _server["state"] == "offline":
+            return "offline"
+        return _model(model)["state"]
+
+
+def _loaded_models():
+    # -> {name: size_mb} as reported by Ollama
+    loaded = {}
+    for m in get_ollama_client().ps().get("models") or []:
+        name = m.get("model") or m.get("name")
+        loaded[name] = int((m.get("size") or 0) / (1024 * 1024))
+    return loaded
+
+
+def _start_server():
+    if _server["spawned"] or not _settings["start_server"] or not shutil.which("ollama"):
+        return
+    _server["spawned"] = True
+    print("🦙 Ollama is not running — starting `ollama serve`")
+    try:
+        subprocess.Popen(["ollama", "serve"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         stdin=subprocess.DEVNULL, start_new_session=True)
+    except OSError as e:
+        print(f"⚠️ Could not start Ollama: {e}")
+
+
+def wait_ready(timeout=None):
+    # Polls the API until the server answers; -> True when it did.
+    timeout = _settings["ready_timeout"] if timeout is None else timeout
+    deadline = time.time() + timeout
+    delay = 0.1
+    while True:
+        try:
+            _sync(_loaded_models())
+            _set_server("online")
+            return True
+        except Exception:
+            _start_server()
+        if time.time() + delay > deadline:
+            _set_server("offline")
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+
+def _sync(loaded):
+    with _lock:
+        names = set(loaded) | set(_models)
+    for name in names:
+        with _lock:
+            entry = _model(name)
+            entry["size_mb"] = loaded.get(name, entry["size_mb"])
+            current = entry["state"]
+        if name in loaded and current in ("unloaded", "failed"):
+            _set_state(name, "ready")
+        elif name not in loaded and current == "ready":
+            _set_state(name, "unloaded")
+
+
+def preload(model):
+    # Loads the model without generating anything; -> True when it is resident.
+    if state(model) == "ready" and model in _loaded_models():
+        return True
+    _set_state(model, "loading")
+    start = time.time()
+    try:
+        with local_scheduler.slot("warmup"):
+            get_ollama_client().generate(model=model, prompt="", keep_alive=keep_alive())
+    except Exception as e:
+        _set_state(model, "failed")
+        print(f"⚠️ Could not load {model}: {e}")
+        return False
+    with _lock:
+        _model(model)["last_used"] = time.time()
+    _set_state(model, "ready")
+    print(f"🦙 {model} loaded in {time.time() - start:.1f}s")
+    return True
+
+
+def unload(model):
+    try:
+        get_ollama_client().generate(model=model, prompt="", keep_alive=0)
+    except Exception as e:
+        print(f"⚠️ Could not unload {model}: {e}")
+        return False
+    _set_state(model, "unloaded")
+    return True
+
+
+@contextmanager
+def using(model):
+    # Marks the model busy so the monitor never unloads it mid-request.
+    with _lock:
+        entry = _model(model)
+        entry["busy"] += 1
+        cold = entry["state"] != "ready"
+    if cold:
+        _set_state(model, "loading")
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        with _lock:
+            entry["busy"] -= 1
+            entry["last_used"] = time.time()
+        if ok or not cold:
+            _set_state(model, "ready")
+        else:
+            _set_state(model, "failed")
+
+
+def idle_seconds(model):
+    # Time since the model last finished a request; 0 while one is running.
+    with _lock:
+        entry = _model(model)
+        return 0.0 if entry["busy"] else time.time() - entry["last_used"]
+
+
+def free_memory_mb():
+    if not psutil:
+        return None
+    return psutil.virtual_memory().available / (1024 * 1024)
+
+
+def _relieve_pressure():
+    free = free_memory_mb()
+    if free is None or free >= _settings["min_free_mb"]:
+        return
+    with _lock:
+        idle = sorted((e["last_used"], name) for name, e in _models.items()
+                      if e["state"] == "ready" and not e["busy"])
+    if idle:
+        name = idle[0][1]
+        print(f"🦙 Only {free:.0f} MB free — unloading idle model {name}")
+        unload(name)
+
+
+def _monitor_loop():
+    while True:
+        time.sleep(_settings["check_interval"])
+        try:
+            _sync(_loaded_models())
+            _set_server("online")
+        except Exception:
+            _set_server("offline")
+            continue
+        _relieve_pressure()
+
+
+def start_monitor():
+    global _monitor
+    with _lock:
+        if _monitor is not None:
+            return
+        _monitor = threading.Thread(target=_monitor_loop, daemon=True)
+    _monitor.start()
+
+
+def release_all():
+    # On exit hand the models back to Ollama's normal idle expiry instead of
+    # leaving them pinned after the builder is gone.
+    with _lock:
+        resident = [name for name, e in _models.items() if e["state"] == "ready"]
+    for name in resident:
+        try:
+            get_ollama_client().generate(model=name, prompt="", keep_alive=_settings["keep_alive_on_exit"])
+        except Exception:
+            pass
+
+
+def record_ttft(model, request_class, seconds, load_seconds=0.0):
+    with _lock:
+        samples = _ttft.setdefault(request_class, [])
+        samples.append({"model": model, "ttft": round(seconds, 3), "load": round(load_seconds, 3)})
+        del samples[1:-_settings["ttft_window"]]
+        first = len(samples) == 1
+    label = "first after startup" if first else "back-to-back"
+    print(f"⏱️ {request_class} first token after {seconds:.1f}s ({label}"
+          + (f", {load_seconds:.1f}s loading the model)" if load_seconds >= 0.05 else ", model resident)"))
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else None
+
+
+def report():
+    with _lock:
+        lines = [f"Ollama: {_server['state']}"]
+        for name, entry in sorted(_models.items()):
+            size = f" · {entry['size_mb']} MB" if entry["size_mb"] else ""
+            lines.append(f"  {name}: {entry['state']}{size}")
+        for request_class, samples in sorted(_ttft.items()):
+            first, rest = samples[0], samples[1:]
+            line = f"{request_class} TTFT: first {first['ttft']:.1f}s (load {first['load']:.1f}s)"
+            if rest:
+                line += (f" · back-to-back median {_median([s['ttft'] for s in rest]):.1f}s "
+                         f"(load {_median([s['load'] for s in rest]):.1f}s, n={len(rest)})")
+            lines.append(line)
+    return "\n".join(lines)
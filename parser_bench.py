@@ -0,0 +1,80 @@
+import os
+import re
+import time
+import argparse
+
+from file_blocks import FileBlockParser
+
+# Throughput benchmark for the incremental file block parser against the
+# regex split write_files used before it, over the response corpus the tests
+# use. The parser is fed token-sized chunks the way a stream arrives; the
+# regex split only ever sees the finished text. "first file" is how far into
+# the stream the first file was ready to write.
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(HERE, "tests", "corpus")
+
+
+def regex_split(text):
+    # The old write_files parsing, minus the disk writes.
+    cleaned = re.sub(r'^(?:.*\n)*?```(?:python)?\s*\n?', '', text)
+    cleaned = re.sub(r'\n?```(?:\s*python)?$', '', cleaned).strip()
+    files = re.split(r'===\s*(.+?)\s*===', cleaned)
+    if len(files) < 2:
+        return [("main.py", cleaned)]
+    blocks = []
+    for i in range(1, len(files), 2):
+        content = re.sub(r'^```(?:python)?\s*\n?', '', files[i + 1].strip())
+        blocks.append((files[i].strip(), re.sub(r'\n?```$', '', content).strip()))
+    return blocks
+
+
+def incremental(text, chunk):
+    # -> (blocks, chars fed when the first block closed)
+    first = []
+    parser = FileBlockParser(on_block=lambda name, content, fallback: first.append(fed[0]) if not first else None)
+    fed = [0]
+    for i in range(0, len(text), chunk):
+        parser.feed(text[i:i + chunk])
+        fed[0] = min(i + chunk, len(text))
+    blocks = parser.close()
+    return blocks, first[0] if first else len(text)
+
+
+def _best(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def load_corpus(folder):
+    texts = {}
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".txt"):
+            with open(os.path.join(folder, name), "r", encoding="utf-8", newline="") as f:
+                texts[name] = f.read()
+    return texts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the incremental file block parser with the old regex split.")
+    parser.add_argument("--corpus", default=CORPUS, help="folder of raw model responses (*.txt)")
+    parser.add_argument("--chunk", type=int, default=16, help="characters per streamed chunk")
+    parser.add_argument("--scale", type=int, default=50, help="repeat each response this many times as extra files")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    total_regex = total_inc = total_chars = 0
+    for name, text in load_corpus(args.corpus).items():
+        # Larger inputs: the same files again under new names, like a big multi-file answer.
+        big = text + "".join(text.replace("=== ", f"=== copy{n}_") for n in range(1, args.scale))
+        regex_s = _best(lambda: regex_split(big), args.repeat)
+        inc_s = _best(lambda: incremental(big, args.chunk), args.repeat)
+        blocks, first_at = incremental(text, args.chunk)
+        total_regex, total_inc, total_chars = total_regex + regex_s, total_inc + inc_s, total_chars + len(big)
+        print(f"{name:<26} {len(big) / 1e6 / regex_s:7.1f} MB/s regex · {len(big) / 1e6 / inc_s:7.1f} MB/s incremental"
+              f" · {len(blocks)} files · first file at {first_at / len(text):4.0%} of the stream")
+    print(f"{'total':<26} {total_chars / 1e6 / total_regex:7.1f} MB/s regex · "
+          f"{total_chars / 1e6 / total_inc:7.1f} MB/s incremental ({args.chunk}-char chunks)")
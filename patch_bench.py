@@ -0,0 +1,68 @@
+import time
+import argparse
+
+from patches import apply_edits
+
+# Patch application benchmark on a generated module. Each edit is applied the
+# way the model quoted it: copied exactly, with its indentation drifted, or
+# with a typo that only the fuzzy matcher finds. "reply" compares the size of
+# a SEARCH/REPLACE answer with resending the whole file, which is what the
+# fix prompt asked for before patches.
+
+
+def make_module(functions):
+    lines = []
+    for n in range(functions):
+        lines += [f"def handler_{n}(event, context):",
+                  f"    value = event.get('key_{n}', {n})",
+                  f"    if value > {n * 3}:",
+                  f"        return compute_{n}(value, context)",
+                  f"    return value + {n}",
+                  ""]
+    return "\n".join(lines) + "\n"
+
+
+def make_edits(functions, kind):
+    n = functions * 3 // 4
+    search = [f"    if value > {n * 3}:", f"        return compute_{n}(value, context)"]
+    replace = [f"    if value >= {n * 3}:", f"        return compute_{n}(value, context, retry=True)"]
+    if kind == "indent":
+        search = [line[2:] for line in search]
+        replace = [line[2:] for line in replace]
+    elif kind == "fuzzy":
+        search = [search[0], search[1].replace("context", "ctx")]
+    return [(search, replace)]
+
+
+def edit_reply(edits):
+    lines = ["=== main.py ==="]
+    for search, replace in edits:
+        lines += ["<<<<<<< SEARCH"] + search + ["======="] + replace + [">>>>>>> REPLACE"]
+    return "\n".join(lines) + "\n"
+
+
+def _best(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time exact, re-indented and fuzzy SEARCH/REPLACE application.")
+    parser.add_argument("--functions", type=int, nargs="*", default=[50, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for functions in args.functions:
+        original = make_module(functions)
+        print(f"{len(original.splitlines())} lines ({len(original) / 1000:.0f} kB)")
+        for kind in ("exact", "indent", "fuzzy"):
+            edits = make_edits(functions, kind)
+            ms, (text, failed) = _best(lambda: apply_edits(original, edits), args.repeat)
+            status = "failed" if failed else "applied"
+            print(f"  {kind:<7} {ms:9.2f} ms · {status}")
+        reply = edit_reply(make_edits(functions, "exact"))
+        print(f"  reply   {len(reply)} chars as edits · {len(original) + 16} chars as the whole file")
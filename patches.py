@@ -0,0 +1,124 @@
+import re
+import difflib
+
+# SEARCH/REPLACE edit blocks inside a "=== file ===" section:
+#
+#   <<<<<<< SEARCH
+#   lines copied from the current file
+#   =======
+#   replacement lines
+#   >>>>>>> REPLACE
+#
+# Models rarely copy the original perfectly, so matching falls back from an
+# exact match to whitespace-insensitive and finally fuzzy line matching.
+SEARCH_RE = re.compile(r'^\s*<{5,9}\s*SEARCH\s*$')
+DIVIDER_RE = re.compile(r'^\s*={5,9}\s*$')
+REPLACE_RE = re.compile(r'^\s*>{5,9}\s*REPLACE\s*$')
+FUZZY_THRESHOLD = 0.9
+
+
+def has_edits(content):
+    return any(SEARCH_RE.match(line) for line in content.splitlines())
+
+
+def parse_edits(content):
+    edits = []
+    search = replace = None
+    for line in content.splitlines():
+        if SEARCH_RE.match(line):
+            search, replace = [], None
+        elif search is not None and replace is None and DIVIDER_RE.match(line):
+            replace = []
+        elif replace is not None and REPLACE_RE.match(line):
+            edits.append((_trim(search), _trim(replace)))
+            search = replace = None
+        elif replace is not None:
+            replace.append(line)
+        elif search is not None:
+            search.append(line)
+    return edits
+
+
+def _trim(lines):
+    while lines and not lines[0].strip():
+        lines = lines[1:]
+    while lines and not lines[-1].strip():
+        lines = lines[:-1]
+    return lines
+
+
+def _indent(line):
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _find_exact(lines, search, key):
+    target = [key(l) for l in search]
+    n = len(search)
+    for i in range(len(lines) - n + 1):
+        if [key(l) for l in lines[i:i + n]] == target:
+            return i
+    return None
+
+
+def _find_fuzzy(lines, search):
+    n = len(search)
+    target = "\n".join(l.strip() for l in search)
+    best, best_ratio = None, FUZZY_THRESHOLD
+    matcher = difflib.SequenceMatcher(autojunk=False)
+    matcher.set_seq2(target)
+    for i in range(len(lines) - n + 1):
+        matcher.set_seq1("\n".join(l.strip() for l in lines[i:i + n]))
+        if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+            continue
+        ratio = matcher.ratio()
+        if ratio > best_ratio:
+            best, best_ratio = i, ratio
+    return best
+
+
+def _reindent(replace, search, found):
+    # Shift the replacement by the indentation difference between what the
+    # model quoted and what is actually in the file.
+    src = next((l for l in search if l.strip()), "")
+    dst = next((l for l in found if l.strip()), "")
+    have, want = _indent(src), _indent(dst)
+    if have == want:
+        return replace
+    out = []
+    for line in replace:
+        if line.startswith(have):
+            out.append(want + line[len(have):] if line.strip() else line)
+        else:
+            out.append(line)
+    return out
+
+
+def apply_edit(lines, search, replace):
+    if not search:
+        return lines + replace
+    for key in (lambda l: l, lambda l: l.rstrip(), lambda l: l.strip()):
+        i = _find_exact(lines, search, key)
+        if i is not None:
+            break
+    else:
+        i = _find_fuzzy(lines, search)
+        if i is None:
+            return None
+    found = lines[i:i + len(search)]
+    return lines[:i] + _reindent(replace, search, found) + lines[i + len(search):]
+
+
+def apply_edits(original, edits):
+    # -> (new_text, failed_search_snippets)
+    lines = original.splitlines()
+    failed = []
+    for search, replace in edits:
+        result = apply_edit(lines, search, replace)
+        if result is None:
+            failed.append("\n".join(search[:3]))
+            continue
+        lines = result
+    text = "\n".join(lines)
+    if original.endswith("\n") or not original:
+        text += "\n"
+    return text, failed
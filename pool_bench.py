@@ -0,0 +1,107 @@
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import llm_clients
+
+# Connection reuse micro-benchmark. A local OpenAI-compatible stub answers
+# chat completions instantly; --handshake-ms is added once per new connection
+# to stand in for the TCP+TLS setup of a real provider. Each request is made
+# once with a fresh client (what every call did before llm_clients) and once
+# through the shared pooled client, so the difference is the setup cost saved.
+REPLY = {"id": "bench", "object": "chat.completion", "created": 0, "model": "stub",
+         "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}],
+         "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}}
+
+
+def make_handler(handshake_ms, connections):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in one write; split writes on a kept-alive
+        # socket hit Nagle plus delayed ACK and add ~40 ms to every reply.
+        wbufsize = 65536
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+            time.sleep(handshake_ms / 1000)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            body = json.dumps(REPLY).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+
+def start_stub(handshake_ms):
+    connections = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(handshake_ms, connections))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, connections
+
+
+def _complete(client):
+    client.chat.completions.create(model="stub", messages=[{"role": "user", "content": "ping"}])
+
+
+def fresh_request(base_url):
+    from openai import OpenAI
+    client = OpenAI(api_key="bench", base_url=base_url)
+    try:
+        _complete(client)
+    finally:
+        client.close()
+
+
+def pooled_request(base_url):
+    _complete(llm_clients.get_openai_client("bench", "bench", base_url))
+
+
+def measure(request, base_url, runs):
+    # -> per-request latencies in ms
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        request(base_url)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare fresh and pooled LLM clients against a local stub server.")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=30.0,
+                        help="simulated connection setup cost per new connection")
+    args = parser.parse_args()
+
+    server, connections = start_stub(args.handshake_ms)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    try:
+        rows = []
+        for label, request in (("fresh client", fresh_request), ("pooled client", pooled_request)):
+            request(base_url)
+            del connections[:]
+            times = measure(request, base_url, args.runs)
+            rows.append((label, _median(times), len(connections)))
+            print(f"{label:>14}: median {_median(times):6.1f} ms · p95 {sorted(times)[int(0.95 * (len(times) - 1))]:6.1f} ms"
+                  f" · {len(connections)} new connections for {args.runs} requests")
+        saved = rows[0][1] - rows[1][1]
+        print(f"⏱️ Pooling saves {saved:.1f} ms per request ({args.handshake_ms:.0f} ms simulated handshake)")
+    finally:
+        llm_clients.close_all_clients()
+        server.shutdown()
@@ -0,0 +1,342 @@
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+from collections import deque
+
+from config import PREVIEW_HOST_SETTINGS
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Runs a project's AppFrame in its own interpreter so a broken, blocking or
+# leaky app can't take the builder down with it. The host imports
+# customtkinter, reports "ready" and waits for one load job on stdin; it then
+# builds the frame inside the builder's container window (Tk's use= option)
+# and talks back with JSON lines on the original stdout. App output goes to
+# stderr. Later "reload" commands re-run only the changed project modules
+# (and project modules that hold references to them) in the same root;
+# anything else gets a fresh host.
+HOST_SCRIPT = r'''
+import os, sys, json, queue, types, threading, traceback, importlib, importlib.util
+_proto = os.fdopen(os.dup(1), "w", buffering=1)
+os.dup2(2, 1)
+sys.stdout = sys.stderr
+
+def send(event, **data):
+    data["event"] = event
+    try:
+        _proto.write(json.dumps(data) + "\n")
+        _proto.flush()
+    except (OSError, ValueError):
+        os._exit(0)
+
+import tkinter
+import customtkinter as ctk
+send("ready", pid=os.getpid())
+line = sys.stdin.readline()
+if not line:
+    sys.exit(0)
+job = json.loads(line)
+
+stop = threading.Event()
+commands = queue.Queue()
+def _watch_stdin():
+    for line in sys.stdin:
+        try:
+            commands.put(json.loads(line))
+        except ValueError:
+            pass
+    stop.set()
+threading.Thread(target=_watch_stdin, daemon=True).start()
+
+os.chdir(job["folder"])
+sys.path[:0] = [p for p in (job.get("deps"), job["folder"]) if p]
+sys.argv = ["main.py"]
+
+def build():
+    for w in root.winfo_children():
+        w.destroy()
+    spec = importlib.util.spec_from_file_location("main", "main.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["main"] = module
+    spec.loader.exec_module(module)
+    if not hasattr(module, "AppFrame"):
+        raise AttributeError("No AppFrame")
+    frame = module.AppFrame(root)
+    frame.pack(fill="both", expand=True)
+
+def project_modules():
+    prefix = os.path.join(os.path.abspath(job["folder"]), "")
+    deps = os.path.join(os.path.abspath(job["deps"]), "") if job.get("deps") else None
+    for name, mod in list(sys.modules.items()):
+        path = os.path.abspath(getattr(mod, "__file__", None) or "/")
+        if path.startswith(prefix) and not (deps and path.startswith(deps)):
+            yield name, mod
+
+def stale(names):
+    # Changed modules plus project modules that hold references into them.
+    names = set(names) | {"main"}
+    grew = True
+    while grew:
+        grew = False
+        for name, mod in project_modules():
+            if name in names:
+                continue
+            for value in list(vars(mod).values()):
+                owner = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, "__module__", None)
+                if owner in names:
+                    names.add(name)
+                    grew = True
+                    break
+    return names
+
+def reload(names):
+    names = stale(names)
+    for name in names:
+        sys.modules.pop(name, None)
+    importlib.invalidate_caches()
+    try:
+        build()
+    except BaseException:
+        send("error", error=traceback.format_exc(), fatal=True)
+        os._exit(1)
+    send("loaded", reloaded=sorted(names))
+
+try:
+    root = ctk.CTk(**({"use": str(job["window"])} if job.get("window") else {}))
+    build()
+except BaseException:
+    send("error", error=traceback.format_exc(), fatal=True)
+    sys.exit(1)
+
+def _report(exc, val, tb):
+    send("error", error="".join(traceback.format_exception(exc, val, tb)), fatal=False)
+root.report_callback_exception = _report
+
+def _pump():
+    if stop.is_set():
+        root.destroy()
+        return
+    try:
+        command = commands.get_nowait()
+    except queue.Empty:
+        command = None
+    if command and command.get("cmd") == "reload":
+        reload(command.get("modules", []))
+    root.after(50, _pump)
+
+def _beat():
+    send("heartbeat")
+    root.after(int(job["heartbeat"] * 1000), _beat)
+
+send("loaded")
+_pump()
+_beat()
+root.mainloop()
+'''
+
+_idle = []
+_pool_lock = threading.Lock()
+
+
+def python_command(flag, script, *args):
+    # A frozen build has no interpreter that understands -c; its executable
+    # runs the script itself when started with flag (see main.py).
+    if getattr(sys, "frozen", False):
+        return [sys.executable, flag, *args]
+    return [sys.executable, "-u", "-c", script, *args]
+
+
+def get_preview_settings(config=None):
+    settings = dict(PREVIEW_HOST_SETTINGS)
+    if config:
+        settings.update(config.get("preview_host", {}))
+    return settings
+
+
+class PreviewHost:
+    # on_event(kind, detail) kinds: "loaded", "failed" (load didn't finish),
+    # "runtime_error" (callback exception, app keeps running), "died"
+    # (exited or killed after loading) and "output" (a line of app output).
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.spawned = time.time()
+        self.ready = threading.Event()
+        self.on_event = None
+        self.loaded = False
+        self.finished = False
+        self.stopping = False
+        self.kill_reason = None
+        self.started = None
+        self.last_beat = None
+        self.tail = deque(maxlen=40)
+        self.proc = subprocess.Popen(python_command("--preview-host", HOST_SCRIPT),
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                     text=True, bufsize=1, encoding="utf-8", errors="replace")
+        threading.Thread(target=self._read_events, daemon=True).start()
+        threading.Thread(target=self._read_output, daemon=True).start()
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def _emit(self, kind, detail=""):
+        if self.on_event:
+            try:
+                self.on_event(kind, detail)
+            except Exception as e:
+                print(f"⚠️ Preview event handler failed: {e}")
+
+    def _finish(self, kind, detail=""):
+        # Exactly one "loaded"/"failed" per load and at most one "died" after it.
+        if self.finished or self.stopping:
+            return
+        if kind == "loaded":
+            self.loaded = True
+            self.last_beat = time.time()
+        else:
+            self.finished = True
+            if not self.loaded:
+                kind = "failed"
+        self._emit(kind, detail)
+
+    def _read_events(self):
+        for line in self.proc.stdout:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            event = msg.get("event")
+            if event == "ready":
+                self.ready.set()
+            elif event == "heartbeat":
+                self.last_beat = time.time()
+            elif event == "loaded":
+                self._finish("loaded", ", ".join(msg.get("reloaded", [])))
+            elif event == "error" and msg.get("fatal"):
+                self._finish("failed", msg.get("error", ""))
+            elif event == "error":
+                self._emit("runtime_error", msg.get("error", ""))
+
+    def _read_output(self):
+        for line in self.proc.stderr:
+            line = line.rstrip("\n")
+            self.tail.append(line)
+            self._emit("output", line)
+
+    def _rss_mb(self):
+        # Resident memory, not address space: thread arenas and BLAS reserve
+        # far more virtual memory than a normal app ever touches.
+        if psutil:
+            try:
+                return psutil.Process(self.proc.pid).memory_info().rss / (1024 * 1024)
+            except psutil.Error:
+                return 0
+        try:
+            with open(f"/proc/{self.proc.pid}/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, ValueError, IndexError, AttributeError):
+            return 0
+
+    def _watch(self):
+        s = self.settings
+        while self.alive() and not self.stopping:
+            time.sleep(0.25)
+            now = time.time()
+            if not self.loaded and now - self.started > s["load_timeout"]:
+                self.kill(f"did not load within {s['load_timeout']}s")
+            elif self.loaded and now - self.last_beat > s["hang_timeout"]:
+                self.kill(f"stopped responding for more than {s['hang_timeout']}s")
+            elif s["memory_mb"] and self._rss_mb() > s["memory_mb"]:
+                self.kill(f"went over the {s['memory_mb']} MB memory limit")
+        code = self.proc.wait()
+        time.sleep(0.1)  # let the readers drain what the host wrote last
+        output = "\n".join(self.tail)
+        if self.kill_reason:
+            self._finish("died", f"Preview {self.kill_reason}\n{output}")
+        else:
+            self._finish("died", f"{output}\nPreview process exited with code {code}".strip())
+
+    def load(self, folder, deps_dir, window_id, on_event):
+        self.on_event = on_event
+        self.started = time.time()
+        job = {"folder": os.path.abspath(folder), "deps": deps_dir, "window": window_id,
+               "heartbeat": self.settings["heartbeat"]}
+        try:
+            self.proc.stdin.write(json.dumps(job) + "\n")
+            self.proc.stdin.flush()
+        except OSError:
+            pass
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def reload(self, modules, on_event):
+        # Same events as load(); a failed reload ends the host.
+        self.on_event = on_event
+        self.loaded = False
+        self.started = time.time()
+        try:
+            self.proc.stdin.write(json.dumps({"cmd": "reload", "modules": modules}) + "\n")
+            self.proc.stdin.flush()
+        except OSError:
+            pass
+
+    def kill(self, reason):
+        self.kill_reason = self.kill_reason or reason
+        try:
+            self.proc.kill()
+        except OSError:
+            pass
+
+    def stop(self, timeout=1.0):
+        # Closing stdin asks the host to destroy its root; kill it if it doesn't.
+        self.stopping = True
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.kill("stopped")
+
+
+def warm(settings):
+    with _pool_lock:
+        _idle[:] = [h for h in _idle if h.alive()]
+        need = settings["pool_size"] - len(_idle)
+    for _ in range(max(0, need)):
+        try:
+            host = PreviewHost(settings)
+        except OSError as e:
+            print(f"⚠️ Could not start preview host: {e}")
+            return
+        with _pool_lock:
+            _idle.append(host)
+
+
+def acquire(settings):
+    # -> (host, warm) where warm means the interpreter was already running
+    with _pool_lock:
+        while _idle:
+            host = _idle.pop(0)
+            if host.alive():
+                break
+        else:
+            host = None
+    is_warm = host is not None
+    if host is None:
+        host = PreviewHost(settings)
+    threading.Thread(target=warm, args=(settings,), daemon=True).start()
+    return host, is_warm
+
+
+def shutdown():
+    with _pool_lock:
+        hosts, _idle[:] = list(_idle), []
+    for host in hosts:
+        host.stop(timeout=0.5)
@@ -0,0 +1,124 @@
+import os
+import re
+import fnmatch
+import threading
+from collections import OrderedDict
+
+# Directories that never hold the project's own source: pip's --target
+# install folder, snapshot/pending copies and the usual tool caches.
+PRUNED_DIRS = {
+    "deps", ".backup", ".pending", ".candidates", "__pycache__", ".git", ".hg",
+    ".venv", "venv", "env", "node_modules", "build", "dist", ".mypy_cache",
+    ".pytest_cache", ".ruff_cache",
+}
+IGNORE_FILE = ".appbuilderignore"
+# File contents are kept least-recently-used first and trimmed past this many
+# characters, so switching between projects does not keep every one in memory.
+CONTENT_CACHE_CHARS = 32 * 1024 * 1024
+
+_listing_cache = {}
+_content_cache = OrderedDict()
+_content_chars = 0
+_lock = threading.Lock()
+
+
+def project_name(app_idea):
+    return re.sub(r'[^a-zA-Z0-9]', '-', app_idea.lower()).strip('-')[:60] or "my-app"
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_ignore_patterns(folder):
+    patterns = []
+    path = os.path.join(folder, IGNORE_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    patterns.append(line.replace("\\", "/"))
+    return patterns
+
+
+def is_ignored(rel_path, patterns, is_dir=False):
+    name = rel_path.rsplit("/", 1)[-1]
+    for pattern in patterns:
+        if pattern.endswith("/"):
+            if not is_dir:
+                continue
+            pattern = pattern.rstrip("/")
+        pattern = pattern.lstrip("/")
+        if fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern):
+            return True
+    return False
+
+
+def _walk(folder, extensions, patterns):
+    files = []
+    dir_mtimes = {}
+    for root, dirs, fs in os.walk(folder):
+        dir_mtimes[root] = _mtime(root)
+        rel_root = os.path.relpath(root, folder).replace(os.sep, "/")
+        rel_root = "" if rel_root == "." else rel_root + "/"
+        dirs[:] = sorted(d for d in dirs
+                         if d not in PRUNED_DIRS and not d.endswith(".egg-info")
+                         and not is_ignored(rel_root + d, patterns, is_dir=True))
+        for f in sorted(fs):
+            if extensions and not f.endswith(extensions):
+                continue
+            rel = rel_root + f
+            if not is_ignored(rel, patterns):
+                files.append(rel)
+    return files, dir_mtimes
+
+
+def list_project_files(folder, extensions=(".py",)):
+    folder = os.path.abspath(folder)
+    extensions = tuple(extensions or ())
+    key = (folder, extensions)
+    ignore_mtime = _mtime(os.path.join(folder, IGNORE_FILE))
+    with _lock:
+        cached = _listing_cache.get(key)
+    if cached and cached[0] == ignore_mtime and all(_mtime(d) == m for d, m in cached[1].items()):
+        return list(cached[2])
+    files, dir_mtimes = _walk(folder, extensions, load_ignore_patterns(folder))
+    with _lock:
+        _listing_cache[key] = (ignore_mtime, dir_mtimes, files)
+    return list(files)
+
+
+def read_project_file(folder, rel_path):
+    global _content_chars
+    path = os.path.abspath(os.path.join(folder, rel_path))
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        cached = _content_cache.get(path)
+        if cached and cached[0] == stamp:
+            _content_cache.move_to_end(path)
+            return cached[1]
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        content = fh.read()
+    with _lock:
+        old = _content_cache.pop(path, None)
+        if old:
+            _content_chars -= len(old[1])
+        _content_cache[path] = (stamp, content)
+        _content_chars += len(content)
+        while _content_chars > CONTENT_CACHE_CHARS and len(_content_cache) > 1:
+            _, (_, dropped) = _content_cache.popitem(last=False)
+            _content_chars -= len(dropped)
+    return content
+
+
+def iter_project_sources(folder, extensions=(".py",)):
+    for rel in list_project_files(folder, extensions):
+        try:
+            yield rel, read_project_file(folder, rel)
+        except OSError:
+            continue
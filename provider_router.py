@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import threading
+
+from config import CACHE_DIR, ROUTER_SETTINGS
+
+# Rolling per-provider/model health used to order providers in hybrid mode.
+# Each provider keeps its last few calls; a run of failures opens a circuit
+# breaker that keeps the provider out of rotation until its cooldown expires,
+# after which a single trial call decides whether it closes again.
+STATS_FILE = os.path.join(CACHE_DIR, "provider_stats.json")
+
+_lock = threading.Lock()
+_stats = None
+
+
+def _load():
+    global _stats
+    if _stats is None:
+        try:
+            with open(STATS_FILE, "r", encoding="utf-8") as f:
+                _stats = json.load(f)
+        except (OSError, ValueError):
+            _stats = {}
+    return _stats
+
+
+def _save():
+    with _lock:
+        data = json.dumps(_stats)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{STATS_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, STATS_FILE)
+
+
+def _entry(provider, model):
+    return _load().setdefault(f"{provider}/{model}", {
+        "provider": provider, "model": model, "samples": [],
+        "consecutive_failures": 0, "open_until": 0, "cooldown": ROUTER_SETTINGS["cooldown"],
+    })
+
+
+def record(provider, model, request_class, latency, ok, chars=0):
+    with _lock:
+        entry = _entry(provider, model)
+        entry["samples"].append({"class": request_class, "latency": round(latency, 3), "ok": ok,
+                                 "chars": chars, "at": time.time()})
+        del entry["samples"][:-ROUTER_SETTINGS["window"]]
+        if ok:
+            entry["consecutive_failures"] = 0
+            entry["open_until"] = 0
+            entry["cooldown"] = ROUTER_SETTINGS["cooldown"]
+        else:
+            entry["consecutive_failures"] += 1
+            if entry["consecutive_failures"] >= ROUTER_SETTINGS["failure_threshold"]:
+                entry["open_until"] = time.time() + entry["cooldown"]
+                entry["cooldown"] = min(entry["cooldown"] * 2, ROUTER_SETTINGS["max_cooldown"])
+                print(f"🔌 Circuit open for {provider} ({entry['consecutive_failures']} failures in a row) — "
+                      f"skipping it for {entry['open_until'] - time.time():.0f}s")
+    try:
+        _save()
+    except OSError:
+        pass
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def summarize(entry, request_class=None):
+    samples = entry["samples"]
+    if request_class and any(s["class"] == request_class for s in samples):
+        samples = [s for s in samples if s["class"] == request_class]
+    good = [s for s in samples if s["ok"]]
+    latencies = [s["latency"] for s in good]
+    throughput = [s["chars"] / s["latency"] for s in good if s["latency"] > 0 and s["chars"]]
+    return {
+        "calls": len(samples),
+        "error_rate": (1.0 - len(good) / len(samples)) if samples else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p90": _percentile(latencies, 90),
+        "chars_per_sec": _percentile(throughput, 50),
+        "open": entry["open_until"] > time.time(),
+    }
+
+
+def is_available(provider, model):
+    with _lock:
+        entry = _load().get(f"{provider}/{model}")
+        return not entry or entry["open_until"] <= time.time()
+
+
+def rank(candidates, request_class):
+    # candidates: [(provider, model)] in static preference order. Providers
+    # without history score 0 so they get tried once before being judged.
+    scored = []
+    with _lock:
+        stats = _load()
+        for order, (provider, model) in enumerate(candidates):
+            entry = stats.get(f"{provider}/{model}")
+            if not entry:
+                scored.append((False, 0.0, order, provider))
+                continue
+            s = summarize(entry, request_class)
+            latency = s["p90"] if s["p90"] is not None else ROUTER_SETTINGS["unknown_latency"]
+            scored.append((s["open"], latency * (1 + 4 * s["error_rate"]), order, provider))
+    scored.sort()
+    if not scored:
+        return []
+    available = [p for is_open, _, _, p in scored if not is_open]
+    # With every breaker open, keep going with whichever provider is least bad.
+    return available or [scored[0][3]]
+
+
+def report():
+    lines = []
+    with _lock:
+        stats = _load()
+        for key in sorted(stats):
+            s = summarize(stats[key])
+            if not s["calls"]:
+                continue
+            p50 = f"{s['p50']:.1f}s" if s["p50"] is not None else "—"
+            p90 = f"{s['p90']:.1f}s" if s["p90"] is not None else "—"
+            tput = f"{s['chars_per_sec']:.0f} ch/s" if s["chars_per_sec"] else "—"
+            state = "OPEN" if s["open"] else "ok"
+            lines.append(f"{key}: p50 {p50} · p90 {p90} · {tput} · errors {s['error_rate']:.0%} of {s['calls']} · {state}")
+    return "\n".join(lines) or "No provider calls recorded yet."
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from config import CACHE_DIR, LLM_CACHE_SETTINGS
+
+# On-disk cache of LLM responses, one JSON file per entry. The file mtime is
+# bumped on every hit so eviction can drop the least recently used entries
+# once the directory grows past max_bytes.
+RESPONSE_DIR = os.path.join(CACHE_DIR, "llm_responses")
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "saved_seconds": 0.0}
+
+
+def get_cache_settings(config=None):
+    settings = dict(LLM_CACHE_SETTINGS)
+    if config:
+        settings.update(config.get("llm_cache", {}))
+    return settings
+
+
+def make_key(provider, model, system_prompt, prompt, temperature=None):
+    payload = json.dumps([provider, model, system_prompt or "", prompt, temperature])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(RESPONSE_DIR, f"{key}.json")
+
+
+def get(key, ttl_seconds):
+    path = _entry_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if ttl_seconds and time.time() - entry.get("created", 0) > ttl_seconds:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return entry
+
+
+def put(key, response, latency, meta=None):
+    os.makedirs(RESPONSE_DIR, exist_ok=True)
+    entry = {"response": response, "latency": latency, "created": time.time()}
+    if meta:
+        entry.update(meta)
+    path = _entry_path(key)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+
+
+def evict(max_bytes):
+    try:
+        names = [n for n in os.listdir(RESPONSE_DIR) if n.endswith(".json")]
+    except OSError:
+        return 0
+    entries = []
+    total = 0
+    for name in names:
+        try:
+            st = os.stat(os.path.join(RESPONSE_DIR, name))
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, name))
+        total += st.st_size
+    removed = 0
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(RESPONSE_DIR, name))
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
+
+
+def _hit_rate():
+    total = _stats["hits"] + _stats["misses"]
+    return (100.0 * _stats["hits"] / total) if total else 0.0
+
+
+def cached_call(provider, model, system_prompt, prompt, temperature, call, on_token=None, use_cache=True, config=None):
+    settings = get_cache_settings(config)
+    if not use_cache or not settings["enabled"]:
+        return call()
+
+    key = make_key(provider, model, system_prompt, prompt, temperature)
+    entry = get(key, settings["ttl_seconds"])
+    if entry is not None:
+        with _lock:
+            _stats["hits"] += 1
+            _stats["saved_seconds"] += entry.get("latency", 0.0)
+            summary = f"hit rate {_hit_rate():.0f}% ({_stats['hits']}/{_stats['hits'] + _stats['misses']}), {_stats['saved_seconds']:.1f}s saved total"
+        print(f"⚡ Cached {provider}/{model} response — saved {entry.get('latency', 0.0):.1f}s · {summary}")
+        if on_token and entry["response"]:
+            on_token(entry["response"])
+        return entry["response"]
+
+    start = time.time()
+    response = call()
+    latency = time.time() - start
+    with _lock:
+        _stats["misses"] += 1
+    if response:
+        try:
+            put(key, response, latency, {"provider": provider, "model": model})
+            evict(settings["max_bytes"])
+        except OSError as e:
+            print(f"⚠️ Response cache write failed: {e}")
+    return response
@@ -0,0 +1,109 @@
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+from config import STARTUP_BUDGETS
+
+# Cold-start benchmark. `-X importtime` gives the cumulative cost of
+# `import main` and shows which optional heavy modules got pulled in;
+# time-to-first-window launches the builder with APPBUILDER_STARTUP_PROBE set,
+# which makes it write a marker file once the first window is drawn and quit.
+# The frozen build has no -X importtime, so only its window time is measured.
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("numpy", "scipy", "bezier", "pyautogui", "pyperclip", "openai", "httpx", "ollama", "requests")
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)')
+
+
+def import_profile(module="main"):
+    # -> (ok, {name: (self_us, cumulative_us, depth)}, stderr)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=HERE, capture_output=True, text=True)
+    rows = {}
+    for line in result.stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m:
+            rows[m.group(4)] = (int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2)
+    return result.returncode == 0, rows, result.stderr
+
+
+def time_to_window(cmd, timeout=60):
+    fd, probe = tempfile.mkstemp(prefix="startup-probe-")
+    os.close(fd)
+    os.remove(probe)
+    env = dict(os.environ, APPBUILDER_STARTUP_PROBE=probe)
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=os.path.dirname(cmd[-1]) or HERE, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        while not os.path.exists(probe):
+            if proc.poll() is not None:
+                raise RuntimeError(f"exited with code {proc.returncode} before showing a window "
+                                   f"(is a display available?)\n{proc.stderr.read()[-1500:]}")
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"no window after {timeout}s")
+            time.sleep(0.01)
+        elapsed = (time.perf_counter() - start) * 1000
+        proc.wait(timeout=30)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        if os.path.exists(probe):
+            os.remove(probe)
+    return elapsed
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def check_imports(budgets, top=15):
+    ok, rows, stderr = import_profile()
+    if not ok or "main" not in rows:
+        print(f"❌ import main failed:\n{stderr[-2000:]}")
+        return False
+    total_ms = rows["main"][1] / 1000
+    print(f"import main: {total_ms:.0f} ms (budget {budgets['import_ms']} ms)")
+    for name, (self_us, cum_us, depth) in sorted(rows.items(), key=lambda r: -r[1][0])[:top]:
+        print(f"  {self_us / 1000:8.1f} ms self  {cum_us / 1000:8.1f} ms total  {name}")
+    heavy = sorted(name for name in rows if name in HEAVY_MODULES)
+    passed = total_ms <= budgets["import_ms"]
+    if heavy:
+        print(f"❌ Heavy optional modules imported at startup: {', '.join(heavy)}")
+        passed = False
+    return passed
+
+
+def check_window(cmd, budget_ms, label, runs):
+    try:
+        times = [time_to_window(cmd) for _ in range(runs)]
+    except RuntimeError as e:
+        print(f"❌ {label}: {e}")
+        return False
+    median = _median(times)
+    print(f"{label} time to first window: {median:.0f} ms median of {runs} "
+          f"({', '.join(f'{t:.0f}' for t in times)}; budget {budget_ms} ms)")
+    return median <= budget_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if builder cold start exceeds its budget.")
+    parser.add_argument("--frozen", metavar="EXE", help="measure a PyInstaller build instead of the source tree")
+    parser.add_argument("--imports-only", action="store_true", help="skip the time-to-first-window check")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    budgets = dict(STARTUP_BUDGETS)
+    if args.frozen:
+        passed = check_window([os.path.abspath(args.frozen)], budgets["frozen_window_ms"], "frozen build", args.runs)
+    else:
+        passed = check_imports(budgets)
+        if not args.imports_only:
+            passed = check_window([sys.executable, os.path.join(HERE, "main.py")], budgets["window_ms"],
+                                  "source", args.runs) and passed
+    print("✅ Startup within budget" if passed else "❌ Startup budget exceeded")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,102 @@
+import os
+import re
+import json
+import time
+import threading
+
+from config import CACHE_DIR, SUGGESTION_POOL_SETTINGS
+
+# Ideas for the suggestion bubbles, generated ahead of time and kept on disk
+# so startup can show them without asking the model. Each idea is shown at
+# most max_shows times, least-shown first; the builder tops the pool up in
+# the background while the local model has nothing else to do.
+POOL_FILE = os.path.join(CACHE_DIR, "suggestions.json")
+
+PROMPT = """Generate exactly 4 exciting modern Python desktop app ideas that MUST use CustomTkinter for the UI.
+Format each as: AppName: One-sentence description (60-100 characters) highlighting a sleek dark glassmorphism UI with neon glow effects.
+Do not mention 'CustomTkinter' in the description text.
+Do not add any introductory text, numbering, or extra lines.
+Output ONLY the 4 formatted lines."""
+
+FALLBACK = [
+    "GlassShelf: Sort and organize files with neon-lit panels and smooth drag-and-drop.",
+    "NeonDive: Explore data with glowing interactive charts and real-time filtering.",
+    "GlowZone: Dynamic wallpaper creator with gradient blending and light effects.",
+    "CodeFlow: Smart code formatter with syntax highlighting and neon color palettes.",
+]
+
+_lock = threading.Lock()
+
+
+def get_pool_settings(config=None):
+    settings = dict(SUGGESTION_POOL_SETTINGS)
+    if config:
+        settings.update(config.get("suggestion_pool", {}))
+    return settings
+
+
+def _load():
+    try:
+        with open(POOL_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def _save(pool):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{POOL_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(pool, f)
+    os.replace(tmp, POOL_FILE)
+
+
+def _title(idea):
+    return idea.split(":", 1)[0].strip().lower()
+
+
+def parse_ideas(text):
+    ideas = []
+    for line in (text or "").strip().split("\n"):
+        line = re.sub(r'^\d+[\.\)\-]\s*', '', line.strip()).strip()
+        if ':' in line and len(line) > 10:
+            ideas.append(line)
+    return ideas
+
+
+def take(count, config=None):
+    # -> up to count ideas, least shown first; marks them as shown
+    settings = get_pool_settings(config)
+    with _lock:
+        pool = _load()
+        pool.sort(key=lambda e: (e["shows"], e["added"]))
+        picked = pool[:count]
+        for entry in picked:
+            entry["shows"] += 1
+        pool = [e for e in pool if e["shows"] < settings["max_shows"]]
+        _save(pool)
+    return [e["idea"] for e in picked]
+
+
+def add(ideas, config=None):
+    # -> number of new ideas kept
+    settings = get_pool_settings(config)
+    with _lock:
+        pool = _load()
+        seen = {_title(e["idea"]) for e in pool}
+        added = 0
+        for idea in ideas:
+            if _title(idea) in seen:
+                continue
+            seen.add(_title(idea))
+            pool.append({"idea": idea, "shows": 0, "added": time.time()})
+            added += 1
+        pool.sort(key=lambda e: (e["shows"], -e["added"]))
+        del pool[settings["size"]:]
+        _save(pool)
+    return added
+
+
+def fresh_count():
+    with _lock:
+        return sum(1 for e in _load() if not e["shows"])
@@ -0,0 +1,21 @@
+import ai_functions
+
+
+def _fake_stream(calls):
+    def stream(model, prompt, request_class="expand"):
+        calls.append(prompt)
+        yield f"answer {len(calls)}"
+    return stream
+
+
+def test_cache_settings_from_config_apply_to_ollama(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ai_functions, "stream_ollama", _fake_stream(calls))
+    monkeypatch.setattr(ai_functions.provider_router, "record", lambda *args: None)
+    config = {"llm_cache": {"enabled": False}}
+
+    first = ai_functions.chat_ollama("qwen", "same prompt", config=config)
+    second = ai_functions.chat_ollama("qwen", "same prompt", config=config)
+
+    assert (first, second) == ("answer 1", "answer 2")
+    assert len(calls) == 2
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+import cli
+from ai_functions import GenerationCancelled
+
+
+def _raise(exc):
+    def run():
+        raise exc
+    return run
+
+
+def test_step_wraps_errors_as_step_failed():
+    report = {"steps": []}
+    with pytest.raises(cli.StepFailed):
+        cli._step(report, "validate", _raise(SyntaxError("bad")))
+    assert report["steps"][0]["status"] == "failed"
+
+
+def test_step_lets_cancellation_through():
+    report = {"steps": []}
+    with pytest.raises(GenerationCancelled):
+        cli._step(report, "generate", _raise(GenerationCancelled("generate")))
+    assert report["steps"][0]["status"] == "cancelled"
+
+
+def _stub_pipeline(monkeypatch, tmp_path, generated):
+    monkeypatch.setattr(cli, "BATCH_DIR", str(tmp_path / "batches"))
+    monkeypatch.setattr(cli, "load_config", lambda: {})
+    monkeypatch.setattr(cli.model_residency, "configure", lambda config: None)
+    monkeypatch.setattr(cli.model_residency, "wait_ready", lambda: True)
+    monkeypatch.setattr(cli.model_residency, "preload", lambda model: None)
+    monkeypatch.setattr(cli.local_scheduler, "configure", lambda config: None)
+    monkeypatch.setattr(cli, "chat_ollama", lambda model, prompt, **kwargs: "A spec.")
+
+    def fake_generate(provider, prompt, config, on_token=None):
+        generated.append(provider)
+        text = "=== main.py ===\nprint('hi')\n"
+        on_token(text)
+        return text
+
+    monkeypatch.setattr(cli, "generate_code_with_provider", fake_generate)
+    monkeypatch.setattr(cli.dep_store, "ensure_project_deps",
+                        lambda folder, pip_cmd, timeout=300, index_args=(): (True, "", "deps", False))
+    monkeypatch.setattr(cli, "smoke_test", lambda folder, deps_dir, settings: ("ok", ""))
+
+
+def test_run_batch_resumes_and_writes_a_report_per_idea(tmp_path, monkeypatch):
+    generated = []
+    _stub_pipeline(monkeypatch, tmp_path, generated)
+    ideas = ["a todo list", "a pomodoro timer", "a unit converter"]
+    (tmp_path / "ideas.txt").write_text("\n".join(ideas) + "\n")
+    batch_dir = tmp_path / "batches" / "ideas"
+    batch_dir.mkdir(parents=True)
+    finished, interrupted, fresh = (cli.idea_key(i) for i in ideas)
+    (batch_dir / "batch.json").write_text(json.dumps({"ideas": {
+        finished: {"status": "passed", "report": None, "at": 0},
+        interrupted: {"status": "running", "report": None, "at": 0},
+    }}))
+    # The interrupted attempt left a broken module behind; the rebuild must not see it.
+    out = tmp_path / "out"
+    stale = out / f"{cli.project_name(ideas[1])[:53]}-{interrupted[:6]}"
+    stale.mkdir(parents=True)
+    (stale / "half_written.py").write_text("def broken(:\n")
+
+    summary = cli.run_batch(str(tmp_path / "ideas.txt"), str(out), workers=2, provider="ollama")
+
+    assert generated == ["ollama", "ollama"]
+    assert summary["counts"] == {"passed": 3}
+    assert not (batch_dir / f"{finished}.json").exists()
+    for key in (interrupted, fresh):
+        report = json.loads((batch_dir / f"{key}.json").read_text())
+        assert report["status"] == "passed"
+        assert [s["step"] for s in report["steps"]] == ["expand", "generate", "write", "validate", "deps", "smoke"]
+        assert report["files"] == ["main.py"]
+    assert not (stale / "half_written.py").exists()
+    progress = json.loads((batch_dir / "batch.json").read_text())
+    assert progress["ideas"][interrupted]["report"] == str(batch_dir / f"{interrupted}.json")
@@ -0,0 +1,51 @@
+import ai_functions
+from context_packer import pack_context, estimate_tokens
+
+
+def _project(tmp_path, functions=40):
+    body = "\n".join(f"def func_{n}(value):\n" + "".join(f"    value += {i}\n" for i in range(12)) + "    return value\n"
+                     for n in range(functions))
+    (tmp_path / "main.py").write_text("import os\n\n\n" + body + "\n\nclass AppFrame:\n    pass\n")
+    return str(tmp_path)
+
+
+def _line_of(folder, text):
+    with open(f"{folder}/main.py") as f:
+        return next(i for i, line in enumerate(f, 1) if text in line)
+
+
+def test_small_projects_are_sent_whole(tmp_path):
+    folder = _project(tmp_path, functions=2)
+    packed, info = pack_context(folder, "", budget=6000)
+    assert info["sections"] is None
+    assert "omitted" not in packed
+
+
+def test_function_in_the_traceback_is_kept_and_the_rest_cut_to_budget(tmp_path):
+    folder = _project(tmp_path)
+    line = _line_of(folder, "def func_27(")
+    error = f'Traceback (most recent call last):\n  File "{folder}/main.py", line {line + 3}, in func_27\nTypeError: boom'
+
+    packed, info = pack_context(folder, error, budget=300)
+
+    assert info["total"] > 300
+    assert estimate_tokens(packed) <= 300
+    assert "def func_27(value):" in packed
+    assert "lines omitted" in packed
+    assert packed.count("def func_") < 40
+
+
+def test_names_in_the_error_rank_above_unrelated_code(tmp_path):
+    folder = _project(tmp_path)
+    packed, _ = pack_context(folder, "NameError: func_33 broke", budget=200)
+    assert "def func_33(value):" in packed
+    assert "def func_34(value):" not in packed
+
+
+def test_whole_file_fixes_get_every_file_unpacked(tmp_path):
+    folder = _project(tmp_path)
+    config = {"context_budgets": {"default": 200}}
+    assert "lines omitted" in ai_functions._packed_code(folder, "", "unknown", config, "patch")
+    whole = ai_functions._packed_code(folder, "", "unknown", config, "whole")
+    assert "omitted" not in whole
+    assert whole.count("def func_") == 40
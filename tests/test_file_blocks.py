@@ -0,0 +1,84 @@
+import os
+import json
+
+import pytest
+
+from file_blocks import FileBlockParser, StreamingFileWriter, parse_file_blocks, validate_blocks
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus")
+with open(os.path.join(CORPUS, "expected.json"), "r", encoding="utf-8") as f:
+    EXPECTED = json.load(f)
+
+
+def _read(name):
+    with open(os.path.join(CORPUS, name), "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def _feed(text, size):
+    parser = FileBlockParser()
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    return parser.close()
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_corpus_file_names(name):
+    assert [n for n, _ in parse_file_blocks(_read(name))] == EXPECTED[name]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 61])
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_chunk_boundaries_do_not_change_blocks(name, size):
+    text = _read(name)
+    assert _feed(text, size) == parse_file_blocks(text)
+
+
+def test_python_blocks_compile_unless_truncated():
+    assert validate_blocks(_read("multi_file_fenced.txt")) == (True, "")
+    ok, reason = validate_blocks(_read("truncated_mid_block.txt"))
+    assert not ok and reason.startswith("timer.py does not compile")
+
+
+def test_writer_writes_each_file_as_its_fence_closes(tmp_path):
+    text = _read("multi_file_fenced.txt")
+    cut = text.index("=== widgets.py ===")
+    writer = StreamingFileWriter(str(tmp_path))
+    for ch in text[:cut]:
+        writer.feed(ch)
+
+    assert writer.written == ["main.py"]
+    assert "class AppFrame" in (tmp_path / "main.py").read_text()
+    assert not (tmp_path / "widgets.py").exists()
+
+    writer.feed(text[cut:])
+    assert writer.close(text) == ["main.py", "widgets.py", "requirements.txt"]
+    assert (tmp_path / "requirements.txt").read_text() == "customtkinter"
+
+
+def test_writer_keeps_the_truncated_last_file_on_close(tmp_path):
+    writer = StreamingFileWriter(str(tmp_path))
+    writer.feed(_read("truncated_mid_block.txt"))
+    assert writer.written == ["main.py"]
+    assert writer.close() == ["main.py", "timer.py"]
+    assert (tmp_path / "timer.py").read_text().endswith("time.time() - self.")
+
+
+def test_feed_after_close_is_ignored():
+    parser = FileBlockParser()
+    parser.feed("=== main.py ===\nx = 1\n")
+    blocks = parser.close()
+    parser.feed("=== extra.py ===\ny = 2\n")
+    assert parser.close() == blocks == [("main.py", "x = 1")]
+
+
+def test_patch_section_with_separately_fenced_edits_applies_every_edit(tmp_path):
+    (tmp_path / "main.py").write_text("a = 1\nb = 2\nc = 3\n")
+    writer = StreamingFileWriter(str(tmp_path))
+    text = _read("patch_fenced_edits.txt")
+    for i in range(0, len(text), 5):
+        writer.feed(text[i:i + 5])
+    writer.close(text)
+
+    assert (writer.edits, writer.failed_edits) == (2, [])
+    assert (tmp_path / "main.py").read_text() == "a = 10\nb = 20\nc = 3\n"
@@ -0,0 +1,48 @@
+import fix_memory
+
+PROGRESSBAR = '''Traceback (most recent call last):
+  File "/home/me/apps/timer/main.py", line 14, in __init__
+    self.bar = ctk.CTkProgressbar(self)
+AttributeError: module 'customtkinter' has no attribute 'CTkProgressbar'
+'''
+
+
+def test_attribute_errors_are_keyed_on_the_missing_attribute():
+    sig = fix_memory.signature(PROGRESSBAR)
+    other = fix_memory.signature("AttributeError: module 'customtkinter' has no attribute 'CTkSpinbox'")
+
+    assert sig == {"type": "AttributeError", "template": "module <*> has no attribute <*>", "api": "CTkProgressbar"}
+    assert fix_memory.signature_key(sig) != fix_memory.signature_key(other)
+    assert fix_memory.signature("AttributeError: 'NoneType' object has no attribute 'pack'")["api"] == "pack"
+
+
+def test_name_and_import_errors_are_keyed_on_the_missing_name():
+    assert fix_memory.signature("NameError: name 'ctk' is not defined")["api"] == "ctk"
+    assert fix_memory.signature("ImportError: cannot import name 'Tooltip' from 'widgets'")["api"] == "Tooltip"
+    assert fix_memory.signature("ModuleNotFoundError: No module named 'PIL'")["api"] == "PIL"
+
+
+def test_other_messages_fall_back_to_the_call_on_the_crashing_line():
+    error = ('  File "main.py", line 3, in <module>\n    total = compute(items)\n'
+             'TypeError: unsupported operand type(s) for +: int and str')
+    assert fix_memory.signature(error)["api"] == "compute"
+    assert fix_memory.signature("no exception here") is None
+
+
+def test_remembered_patch_applies_to_another_project(tmp_path):
+    original, fixed, other = tmp_path / "original", tmp_path / "fixed", tmp_path / "other"
+    for folder in (original, fixed, other):
+        folder.mkdir()
+    code = ("import customtkinter as ctk\n\n\nclass AppFrame(ctk.CTkFrame):\n    def __init__(self, master):\n"
+            "        super().__init__(master)\n        self.bar = ctk.CTkProgressbar(self)\n        self.bar.pack()\n\n"
+            "    def reset(self):\n        self.bar.set(0)\n\n\nTITLE = 'Timer'\n")
+    (original / "main.py").write_text(code)
+    (fixed / "main.py").write_text(code.replace("ctk.CTkProgressbar(self)", "ctk.CTkProgressBar(self)"))
+    (other / "main.py").write_text("# another app\n" + code.replace("'Timer'", "'Stopwatch'"))
+
+    edits, changed = fix_memory.diff_edits(str(original), str(fixed))
+    assert changed == 1
+    assert fix_memory.apply_patch(str(other), {"edits": edits})
+    assert "ctk.CTkProgressBar(self)" in (other / "main.py").read_text()
+    assert "TITLE = 'Stopwatch'" in (other / "main.py").read_text()
+    assert not fix_memory.apply_patch(str(other), {"edits": {"main.py": [[["not in the file"], ["x"]]]}})
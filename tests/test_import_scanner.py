@@ -0,0 +1,34 @@
+import threading
+
+import import_scanner
+
+
+def test_concurrent_scans_all_save_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(import_scanner, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(import_scanner, "CACHE_FILE", str(tmp_path / "cache" / "import_cache.json"))
+    monkeypatch.setattr(import_scanner, "_cache", None)
+    projects = []
+    for n in range(8):
+        folder = tmp_path / f"app{n}"
+        folder.mkdir()
+        (folder / "main.py").write_text(f"import requests\nfrom .util import x\nimport mod{n}\n")
+        projects.append(str(folder))
+    errors, results = [], {}
+    start = threading.Barrier(len(projects))
+
+    def scan(folder):
+        start.wait()
+        try:
+            results[folder] = import_scanner.scan_project(folder)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=scan, args=(p,)) for p in projects]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert results[projects[3]] == ["customtkinter", "mod3", "requests"]
+    assert not [p for p in (tmp_path / "cache").iterdir() if p.name.endswith(".tmp")]
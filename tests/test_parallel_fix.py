@@ -0,0 +1,65 @@
+import time
+import types
+import threading
+
+import fix_engine
+from ai_functions import GenerationCancelled
+
+
+def _app(tmp_path, grace):
+    (tmp_path / "main.py").write_text("print('hi')\n")
+    return types.SimpleNamespace(
+        app_folder=str(tmp_path), use_browser_for_grok=False,
+        config={"fix_engine": {"grace_seconds": grace, "timeout": 30}},
+        after=lambda ms, fn, *args: fn(*args),
+        _validate_fix=lambda folder: (True, ""),
+        _check_diff_size=lambda original, folder, is_cloud=False: (True, ""),
+        _get_pip_cmd=lambda: ["pip"],
+    )
+
+
+def test_slow_candidate_stops_once_grace_period_ends(tmp_path, monkeypatch):
+    stopped = threading.Event()
+    smoked, streamed = [], []
+
+    def fake_fix(folder, error_log, instruction, on_token=None, fixer_choice='2', **kwargs):
+        if fixer_choice == '1':
+            on_token("fast")
+            return True
+        time.sleep(0.05)
+        try:
+            end = time.time() + 10
+            while time.time() < end:
+                on_token("slow")
+                time.sleep(0.01)
+        except GenerationCancelled:
+            stopped.set()
+            raise
+        return True
+
+    monkeypatch.setattr(fix_engine, "ping_pong_fix", fake_fix)
+    monkeypatch.setattr(fix_engine, "expand_feedback", lambda text: text)
+    monkeypatch.setattr(fix_engine, "project_log", lambda app, msg: None)
+    monkeypatch.setattr(fix_engine, "smoke_run", lambda app, folder, settings, cancel=None: (smoked.append(folder), ("ok", ""))[1])
+    fixers = [("qwen", '1', None, True), ("xai", '2', "xai", True)]
+
+    start = time.time()
+    winner = fix_engine.parallel_fix(_app(tmp_path, grace=0.2), "Fix it", fixers, on_token=streamed.append)
+
+    assert "qwen-" in winner
+    assert time.time() - start < 5
+    assert stopped.wait(2)
+    assert len(smoked) == 1
+    # Only the first candidate to produce a token streams into the log.
+    assert streamed == ["fast"]
+
+
+def test_cancelled_candidate_skips_install_and_smoke_run(tmp_path, monkeypatch):
+    ran = []
+    monkeypatch.setattr(fix_engine.dep_store, "ensure_project_deps", lambda *a, **k: ran.append("deps"))
+    monkeypatch.setattr(fix_engine, "smoke_test", lambda *a, **k: ran.append("smoke"))
+    cancel = threading.Event()
+    cancel.set()
+
+    assert fix_engine.smoke_run(_app(tmp_path, grace=0), str(tmp_path), {}, cancel) == ("failed", "cancelled")
+    assert ran == []
@@ -0,0 +1,33 @@
+import ai_functions
+
+
+def test_whole_file_retry_streams_to_the_callers_callback_only(tmp_path, monkeypatch):
+    responses = iter(["=== main.py ===\nfirst\n", "=== main.py ===\nsecond\n"])
+    writers, seen = [], []
+
+    class Writer(ai_functions.StreamingFileWriter):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.chunks = []
+            writers.append(self)
+
+        def feed(self, chunk):
+            self.chunks.append(chunk)
+            super().feed(chunk)
+
+    def fake_chat(model, prompt, on_token=None, use_cache=True, request_class="fix", config=None):
+        text = next(responses)
+        on_token(text)
+        return text
+
+    results = iter([False, True])
+    monkeypatch.setattr(ai_functions, "StreamingFileWriter", Writer)
+    monkeypatch.setattr(ai_functions, "chat_ollama", fake_chat)
+    monkeypatch.setattr(ai_functions, "_packed_code", lambda *args, **kwargs: "")
+    monkeypatch.setattr(ai_functions, "_finish_fix", lambda *args: next(results))
+
+    assert ai_functions.ping_pong_fix(str(tmp_path), "boom", "fix", fixer_choice='1', on_token=seen.append,
+                                      expanded_feedback="fix", fix_format="patch")
+
+    assert [w.chunks for w in writers] == [["=== main.py ===\nfirst\n"], ["=== main.py ===\nsecond\n"]]
+    assert seen == ["=== main.py ===\nfirst\n", "=== main.py ===\nsecond\n"]
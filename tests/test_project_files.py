@@ -0,0 +1,32 @@
+import os
+from collections import OrderedDict
+
+import project_files
+
+
+def test_content_cache_drops_least_recently_read_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(project_files, "CONTENT_CACHE_CHARS", 25)
+    monkeypatch.setattr(project_files, "_content_cache", OrderedDict())
+    monkeypatch.setattr(project_files, "_content_chars", 0)
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.py").write_text(name * 10)
+
+    project_files.read_project_file(str(tmp_path), "a.py")
+    project_files.read_project_file(str(tmp_path), "b.py")
+    project_files.read_project_file(str(tmp_path), "a.py")
+    assert project_files.read_project_file(str(tmp_path), "c.py") == "c" * 10
+
+    cached = [os.path.basename(p) for p in project_files._content_cache]
+    assert cached == ["a.py", "c.py"]
+    assert project_files._content_chars == 20
+
+
+def test_changed_file_is_reread(tmp_path, monkeypatch):
+    monkeypatch.setattr(project_files, "_content_cache", OrderedDict())
+    monkeypatch.setattr(project_files, "_content_chars", 0)
+    path = tmp_path / "main.py"
+    path.write_text("x = 1\n")
+    assert project_files.read_project_file(str(tmp_path), "main.py") == "x = 1\n"
+    path.write_text("x = 22\n")
+    assert project_files.read_project_file(str(tmp_path), "main.py") == "x = 22\n"
+    assert project_files._content_chars == len("x = 22\n")
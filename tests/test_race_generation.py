@@ -0,0 +1,79 @@
+import time
+
+import ai_functions
+from ai_functions import GenerationCancelled
+from file_blocks import StreamingFileWriter
+
+VALID = "=== main.py ===\nprint('{pid}')\n"
+
+
+class FakeProviders:
+    # Stand-ins for cloud providers: each streams its reply in chunks after
+    # an injected latency, and records when it started and whether the race
+    # cancelled it.
+    def __init__(self, latency, replies=None):
+        self.latency = latency
+        self.replies = replies or {}
+        self.started = {}
+        self.cancelled = set()
+        self.t0 = time.time()
+
+    def __call__(self, pid, prompt, config=None, *args, on_token=None, **kwargs):
+        self.started[pid] = time.time() - self.t0
+        text = self.replies.get(pid, VALID.format(pid=pid))
+        try:
+            time.sleep(self.latency[pid])
+            for i in range(0, len(text), 4):
+                on_token(text[i:i + 4])
+                time.sleep(0.005)
+        except GenerationCancelled:
+            self.cancelled.add(pid)
+            raise
+        return text
+
+
+def _race(monkeypatch, fake, hedge_delay=0.1, on_token=None):
+    monkeypatch.setattr(ai_functions, "generate_code_with_provider", fake)
+    monkeypatch.setattr(ai_functions, "race_candidates", lambda *args: ["xai", "openai"])
+    config = {"hybrid_race": {"enabled": True, "hedge_delay": hedge_delay}}
+    return ai_functions.race_generation("build it", config, on_token=on_token)
+
+
+def test_second_provider_starts_after_the_hedge_delay_and_wins(monkeypatch):
+    fake = FakeProviders({"xai": 1.0, "openai": 0.0})
+    text = _race(monkeypatch, fake, hedge_delay=0.2)
+
+    assert text == VALID.format(pid="openai")
+    assert fake.started["openai"] - fake.started["xai"] >= 0.2
+    time.sleep(1.2)
+    assert fake.cancelled == {"xai"}
+
+
+def test_fast_provider_wins_without_hedging(monkeypatch):
+    fake = FakeProviders({"xai": 0.0, "openai": 0.0})
+    assert _race(monkeypatch, fake, hedge_delay=0.5) == VALID.format(pid="xai")
+    assert "openai" not in fake.started
+
+
+def test_invalid_reply_falls_back_to_the_next_provider(monkeypatch, tmp_path):
+    fake = FakeProviders({"xai": 0.0, "openai": 0.0}, {"xai": "=== helper.py ===\nx = 1\n"})
+    writer = StreamingFileWriter(str(tmp_path))
+
+    text = _race(monkeypatch, fake, hedge_delay=5.0, on_token=ai_functions._tee_to_writer(writer))
+    writer.close(text)
+
+    assert text == VALID.format(pid="openai")
+    # helper.py was streamed from xai, then rolled back when openai won.
+    assert writer.written == ["main.py"]
+    assert not (tmp_path / "helper.py").exists()
+    assert (tmp_path / "main.py").read_text() == "print('openai')"
+
+
+def test_leader_tokens_reach_the_caller_while_the_race_runs(monkeypatch):
+    fake = FakeProviders({"xai": 0.0, "openai": 0.0})
+    seen = []
+    text = _race(monkeypatch, fake, hedge_delay=5.0, on_token=lambda chunk: seen.append((time.time(), chunk)))
+    finished = time.time()
+
+    assert "".join(chunk for _, chunk in seen) == text == VALID.format(pid="xai")
+    assert seen[0][0] < finished - 0.01
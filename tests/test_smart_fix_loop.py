@@ -0,0 +1,68 @@
+import types
+
+import pytest
+
+pytest.importorskip("customtkinter")
+import main
+
+
+class _SyncThread:
+    def __init__(self, target, args=(), daemon=None):
+        self.target, self.args = target, args
+
+    def start(self):
+        self.target(*self.args)
+
+
+def _app(tmp_path, **overrides):
+    calls = {"fix": [], "crash": [], "restored": 0}
+    app = types.SimpleNamespace(
+        app_folder=str(tmp_path), config={}, preview_error=None, error_log="", _fixing_in_progress=True,
+        create_snapshot=lambda: None,
+        after=lambda ms, fn, *args: fn(*args),
+        _reload_preview_and_wait=lambda on_success=None: False,
+        ping_pong_fix_gui=lambda prompt, auto_preview=True, crash=None: (calls["fix"].append(prompt),
+                                                                          calls["crash"].append(crash))[0],
+        restore_snapshot=lambda: calls.__setitem__("restored", calls["restored"] + 1),
+        commit_candidate=lambda folder: None,
+        _update_undo_button_state=lambda: None,
+        _hide_thinking_indicator=lambda: None,
+        _get_pip_cmd=lambda: ["pip"],
+    )
+    vars(app).update(overrides)
+    return app, calls
+
+
+@pytest.fixture(autouse=True)
+def _sync(monkeypatch):
+    monkeypatch.setattr(main, "threading", types.SimpleNamespace(Thread=_SyncThread))
+    monkeypatch.setattr(main, "project_log", lambda app, msg: None)
+
+
+def test_falls_through_to_model_fix_when_no_local_rule_applies(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.local_fixers, "apply", lambda folder, error: [])
+    app, calls = _app(tmp_path)
+    main.AppBuilderGUI.smart_fix_loop(app, "NameError: name 'x' is not defined")
+    assert app.error_log == "NameError: name 'x' is not defined"
+    assert len(calls["fix"]) == 1 and "name 'x' is not defined" in calls["fix"][0]
+    assert calls["restored"] == 1
+    assert app._fixing_in_progress is False
+
+
+def test_uses_new_preview_error_after_failed_local_fix(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.local_fixers, "apply", lambda folder, error: ["stray_fence"])
+    app, calls = _app(tmp_path, preview_error="TypeError: bad argument")
+    main.AppBuilderGUI.smart_fix_loop(app, "SyntaxError: invalid syntax")
+    assert app.error_log == "TypeError: bad argument"
+    assert "TypeError: bad argument" in calls["fix"][0]
+    assert calls["crash"] == ["TypeError: bad argument"]
+
+
+def test_local_fix_success_skips_model(tmp_path, monkeypatch):
+    avoided = []
+    monkeypatch.setattr(main.local_fixers, "apply", lambda folder, error: ["stray_fence"])
+    monkeypatch.setattr(main.local_fixers, "record_avoided", avoided.append)
+    app, calls = _app(tmp_path, _reload_preview_and_wait=lambda on_success=None: True)
+    main.AppBuilderGUI.smart_fix_loop(app, "SyntaxError: invalid syntax")
+    assert avoided == [["stray_fence"]]
+    assert calls["fix"] == []
@@ -0,0 +1,41 @@
+from utils import token_sink
+
+
+class _Box:
+    def __init__(self):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text += text
+
+    def see(self, index):
+        pass
+
+
+class _App:
+    # Runs after() callbacks in due order, the way Tk's event loop does.
+    def __init__(self):
+        self.chat_box = _Box()
+        self.queue = []
+
+    def after(self, ms, fn):
+        self.queue.append((ms, len(self.queue), fn))
+
+    def run(self):
+        for _, _, fn in sorted(self.queue):
+            fn()
+
+
+def test_flush_writes_pending_tokens_before_trailing_text():
+    app = _App()
+    on_token = token_sink(app, "chat_box")
+    for chunk in ["Hel", "lo"]:
+        on_token(chunk)
+
+    def _end_answer():
+        on_token.flush()
+        app.chat_box.insert("end", "\n\n")
+    app.after(0, _end_answer)
+    app.run()
+
+    assert app.chat_box.text == "Hello\n\n"
@@ -0,0 +1,10 @@
+import wheelhouse
+
+
+def test_warm_skips_packages_for_other_platforms(monkeypatch):
+    monkeypatch.setattr(wheelhouse.sys, "platform", "linux")
+    requirements = ["pillow", "pywin32>=306", "python-xlib", 'pyobjc;sys_platform=="darwin"']
+    assert [r for r in requirements if wheelhouse.applies_here(r)] == ["pillow", "python-xlib"]
+
+    monkeypatch.setattr(wheelhouse.sys, "platform", "win32")
+    assert [r for r in requirements if wheelhouse.applies_here(r)] == ["pillow", "pywin32>=306"]
@@ -1,38 +1,20 @@
 import sys
-import subprocess
 import time
 import random
 import os
+import threading
 
-try:
-    import pyautogui
-except Exception:
-    pyautogui = None
-
-try:
-    import pyperclip
-except Exception:
-    pyperclip = None
-
-import numpy as np
-from scipy.stats import norm
-import bezier
-
-import customtkinter as ctk
+# pyautogui, pyperclip, numpy, scipy and bezier are only needed by the
+# browser-automation helpers below and are imported on first use.
 from constants import *
-
-def restart_ollama():
-    print(" → Restarting Ollama for clean state...")
-    try:
-        subprocess.run(["ollama", "kill"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        time.sleep(0.8)
-    except:
-        pass
+from project_files import iter_project_sources
+import log_sink
 
 def capture_position(prompt):
     print(prompt)
     print("Move mouse to spot and press Enter...")
     input()
+    import pyautogui
     x, y = pyautogui.position()
     print(f"Captured: ({x}, {y})")
     return x, y
@@ -41,6 +23,9 @@ def get_offset_pos(base_x, base_y, radius):
     return base_x + random.uniform(-radius, radius), base_y + random.uniform(-radius, radius)
 
 def human_like_mouse_move(start_x, start_y, end_x, end_y, duration=1.0):
+    import numpy as np
+    import bezier
+    import pyautogui
     control_x = (start_x + end_x) / 2 + random.uniform(-50, 50)
     control_y = (start_y + end_y) / 2 + random.uniform(-50, 50)
     nodes = np.asfortranarray([[start_x, control_x, end_x], [start_y, control_y, end_y]])
@@ -51,10 +36,12 @@ def human_like_mouse_move(start_x, start_y, end_x, end_y, duration=1.0):
         time.sleep(random.uniform(0.01, 0.05))
 
 def gaussian_delay(mean=1.0, std=0.3, min_sec=0.5):
+    from scipy.stats import norm
     delay = max(min_sec, norm.rvs(loc=mean, scale=std))
     time.sleep(delay)
 
 def optional_human_noise():
+    import pyautogui
     if random.random() < 0.4:
         pyautogui.scroll(random.randint(-150, 150))
         gaussian_delay(0.6, 0.2)
@@ -66,6 +53,8 @@ def optional_human_noise():
         human_like_mouse_move(hover_x, hover_y, cx, cy, duration=0.6)
 
 def paste_text(text):
+    import pyautogui
+    import pyperclip
     pyperclip.copy(text)
     gaussian_delay(0.4, 0.1)
     pyautogui.hotkey('ctrl', 'v')
@@ -73,13 +62,7 @@ def paste_text(text):
     optional_human_noise()
 
 def get_all_code(folder):
-    code_map = {}
-    for root, _, fs in os.walk(folder):
-        for f in fs:
-            if f.endswith('.py'):
-                with open(os.path.join(root, f), 'r', encoding='utf-8', errors='ignore') as fh:
-                    code_map[f] = fh.read()
-    return code_map
+    return dict(iter_project_sources(folder))
 
 class _NullStream:
     def write(self, msg):
@@ -91,6 +74,8 @@ _real_stdout = sys.stdout if sys.stdout is not None else _NullStream()
 _real_stderr = sys.stderr if sys.stderr is not None else _NullStream()
 
 def redirect_print_to_log(app):
+    log_sink.attach(app, getattr(app, 'config', None))
+
     class Redirect:
         def __init__(self, app, original):
             self.app = app
@@ -102,14 +87,7 @@ def redirect_print_to_log(app):
                     self.original.flush()
                 except Exception:
                     pass
-            if hasattr(self.app, 'after'):
-                self.app.after(0, self._safe_write, msg)
-        def _safe_write(self, msg):
-            for name in ('mini_log', 'log_text', 'build_log'):
-                widget = getattr(self.app, name, None)
-                if widget:
-                    widget.insert("end", msg)
-                    widget.see("end")
+            log_sink.write(log_sink.LOG_WIDGETS, msg)
         def flush(self):
             try:
                 self.original.flush()
@@ -125,25 +103,44 @@ def log(app, msg):
         _real_stdout.flush()
     except Exception:
         pass
-    if hasattr(app, 'after'):
-        app.after(0, _safe_log, app, msg)
-
-def _safe_log(app, msg):
-    for name in ('mini_log', 'log_text', 'build_log'):
-        widget = getattr(app, name, None)
-        if widget:
-            widget.insert("end", msg + "\n")
-            widget.see("end")
+    log_sink.write(log_sink.LOG_WIDGETS, msg + "\n", app)
 
 def project_log(app, msg):
     _real_stdout.write(f"[PROJECT] {msg}\n")
     _real_stdout.flush()
-    if hasattr(app, 'after'):
-        app.after(0, _safe_project_log, app, msg)
-        app.after(0, _safe_log, app, msg)
-
-def _safe_project_log(app, msg):
-    widget = getattr(app, 'generate_output', None)
-    if widget:
-        widget.insert("end", msg + "\n")
-        widget.see("end")
\ No newline at end of file
+    log_sink.write(log_sink.PROJECT_WIDGETS, msg + "\n", app)
+
+
+def token_sink(app, *widget_names, on_first=None):
+    pending = []
+    lock = threading.Lock()
+    started = False
+
+    def flush():
+        with lock:
+            text = "".join(pending)
+            pending.clear()
+        if not text:
+            return
+        for name in widget_names:
+            widget = getattr(app, name, None)
+            if widget:
+                widget.insert("end", text)
+                widget.see("end")
+
+    def on_token(chunk):
+        nonlocal started
+        if not started:
+            started = True
+            if on_first:
+                on_first()
+        with lock:
+            schedule = not pending
+            pending.append(chunk)
+        if schedule and hasattr(app, 'after'):
+            app.after(50, flush)
+
+    # Callers flush before writing their own text after the stream, so it
+    # can't land ahead of the last batch of tokens.
+    on_token.flush = flush
+    return on_token
@@ -26,6 +26,9 @@ def create_top_bar(self):
 
     self.llm_toggle_frame = ctk.CTkFrame(top, fg_color="transparent")
     self.llm_toggle_frame.pack(side="right", padx=(0, 16), pady=6)
+    self.model_state_label = ctk.CTkLabel(top, text="● Qwen: starting", font=ctk.CTkFont(size=11),
+                                          text_color=TEXT_DIM)
+    self.model_state_label.pack(side="right", padx=(0, 12))
     self._llm_toggle_buttons = {}
     self.selected_provider = self.config.get("selected_llm", "hybrid")
     _build_llm_toggle(self)
@@ -298,6 +301,14 @@ def create_config_view(self):
                     corner_radius=6).grid(row=row, column=0, pady=(0, 8), padx=20, sticky="w")
     row += 1
 
+    self.offline_deps_var = ctk.BooleanVar(value=self.config.get("package_index", "online") == "offline")
+    ctk.CTkCheckBox(scroll, text="Offline package installs (local wheelhouse only)",
+                    variable=self.offline_deps_var,
+                    font=ctk.CTkFont(size=14), text_color=TEXT_MAIN,
+                    fg_color=BG_GLASS, border_color=BORDER_NEON,
+                    corner_radius=6).grid(row=row, column=0, pady=(0, 8), padx=20, sticky="w")
+    row += 1
+
     ctk.CTkButton(scroll, text="Setup/Calibrate Browser", height=40,
                   fg_color=ACCENT_PURPLE, hover_color=GLOW_PURPLE,
                   font=ctk.CTkFont(size=14), corner_radius=12,
@@ -324,6 +335,16 @@ def create_config_view(self):
                   font=ctk.CTkFont(size=16, weight="bold"),
                   corner_radius=14,
                   command=lambda: self.save_config_gui()).grid(row=row, column=0, pady=(16, 8), padx=20, sticky="w")
+    row += 1
+
+    ctk.CTkLabel(scroll, text="Provider Health",
+                 font=ctk.CTkFont(size=20, weight="bold"),
+                 text_color=ACCENT_CYAN).grid(row=row, column=0, pady=(16, 4), padx=20, sticky="w")
+    row += 1
+
+    self.provider_stats_label = ctk.CTkLabel(scroll, text="", font=ctk.CTkFont(family="Consolas", size=12),
+                                             text_color=TEXT_DIM, justify="left", anchor="w")
+    self.provider_stats_label.grid(row=row, column=0, pady=(0, 8), padx=20, sticky="w")
 
 def create_build_view(self):
     self.build_view = ctk.CTkFrame(self.content_container, fg_color=BG_CARD,
@@ -391,10 +412,18 @@ def create_build_view(self):
                                    command=lambda: self.restore_snapshot())
     self.undo_btn.grid(row=0, column=2, padx=(0, 8))
 
+    self.refresh_deps_btn = ctk.CTkButton(bottom_frame, text="⟳ Deps", width=90, height=46,
+                                          fg_color=BG_GLASS, hover_color=BG_GLASS_LIGHT,
+                                          text_color=TEXT_MAIN,
+                                          font=ctk.CTkFont(size=15, weight="bold"),
+                                          corner_radius=14,
+                                          command=lambda: self.refresh_dependencies())
+    self.refresh_deps_btn.grid(row=0, column=3, padx=(0, 8))
+
     self.deploy_btn = ctk.CTkButton(bottom_frame, text="Deploy", width=100, height=46,
                                     fg_color=ACCENT_CYAN, hover_color=GLOW_CYAN,
                                     text_color=BG_DARK,
                                     font=ctk.CTkFont(size=15, weight="bold"),
                                     corner_radius=14,
                                     command=lambda: self.deploy_app())
-    self.deploy_btn.grid(row=0, column=3)
+    self.deploy_btn.grid(row=0, column=4)
@@ -0,0 +1,67 @@
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+import project_files
+
+# Project tree walk benchmark on a generated project whose deps/ holds a pip
+# --target install's worth of files. The unpruned os.walk is what
+# get_all_code and _scan_imports did before project_files; the pruned walk
+# skips deps/ and friends, and the cached listing and contents only re-stat
+# directories and files.
+
+
+def make_project(folder, dep_files, own_files):
+    for n in range(own_files):
+        with open(os.path.join(folder, f"module_{n}.py"), "w", encoding="utf-8") as f:
+            f.write(f"VALUE = {n}\n")
+    for n in range(dep_files):
+        pkg = os.path.join(folder, "deps", f"package_{n // 50}", f"sub_{n // 10 % 5}")
+        os.makedirs(pkg, exist_ok=True)
+        with open(os.path.join(pkg, f"file_{n}.py"), "w", encoding="utf-8") as f:
+            f.write("x = 1\n")
+
+
+def unpruned_walk(folder):
+    # Lists and reads every .py file, as the old get_all_code did.
+    found = {}
+    for root, _, files in os.walk(folder):
+        for f in files:
+            if f.endswith(".py"):
+                with open(os.path.join(root, f), "r", encoding="utf-8", errors="ignore") as fh:
+                    found[os.path.join(root, f)] = fh.read()
+    return found
+
+
+def _best(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare unpruned, pruned and cached project file listings.")
+    parser.add_argument("--dep-files", type=int, default=3000)
+    parser.add_argument("--own-files", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="walk-bench-")
+    try:
+        make_project(folder, args.dep_files, args.own_files)
+        naive_ms, naive = _best(lambda: unpruned_walk(folder), args.repeat)
+        pruned_ms, pruned = _best(lambda: project_files._walk(folder, (".py",), [])[0], args.repeat)
+        dict(project_files.iter_project_sources(folder))
+        cached_ms, cached = _best(lambda: dict(project_files.iter_project_sources(folder)), args.repeat)
+
+        print(f"{args.own_files} project files, {args.dep_files} files under deps/")
+        print(f"  unpruned walk + read: {naive_ms:8.2f} ms · {len(naive)} files")
+        print(f"  pruned walk:          {pruned_ms:8.2f} ms · {len(pruned)} files")
+        print(f"  cached walk + read:   {cached_ms:8.3f} ms · {len(cached)} files")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
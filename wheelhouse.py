@@ -0,0 +1,139 @@
+import os
+import re
+import sys
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import WHEELHOUSE_DIR, load_config
+from import_scanner import IMPORT_TO_PIP
+from dep_store import read_requirements
+
+try:
+    from packaging.markers import Marker, InvalidMarker
+except ImportError:
+    Marker = None
+
+# Local wheel cache shared by every project. Packages are built or downloaded
+# here once; installs then run with --no-index against it so retries and later
+# projects never go back to the package index. With "package_index" set to
+# "offline" in the config, every install resolves against it alone; fill it
+# ahead of time with `python wheelhouse.py warm`.
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+# Packages in the import table that only install on one platform.
+PLATFORM_ONLY = {"pywin32": "win32", "python-xlib": "linux"}
+
+
+def _pip_wheel(pip_cmd, requirement, timeout, offline):
+    cmd = pip_cmd + ["wheel", "--wheel-dir", WHEELHOUSE_DIR, "--find-links", WHEELHOUSE_DIR, "--quiet"]
+    if offline:
+        cmd.append("--no-index")
+    return subprocess.run(cmd + [requirement], timeout=timeout, capture_output=True, text=True)
+
+
+def build_wheel(pip_cmd, requirement, timeout=300, offline=False):
+    os.makedirs(WHEELHOUSE_DIR, exist_ok=True)
+    start = time.time()
+    try:
+        # Try the wheelhouse alone first; only go online when it can't satisfy the requirement.
+        result = _pip_wheel(pip_cmd, requirement, timeout, offline=True)
+        cached = result.returncode == 0
+        if not cached and not offline:
+            result = _pip_wheel(pip_cmd, requirement, timeout, offline=False)
+        ok, err = result.returncode == 0, result.stderr or ""
+    except subprocess.TimeoutExpired:
+        cached, ok, err = False, False, f"timed out after {timeout}s"
+    return {"requirement": requirement, "ok": ok, "cached": cached,
+            "seconds": time.time() - start, "error": err[-800:]}
+
+
+def build_wheels(pip_cmd, requirements, max_workers=DEFAULT_WORKERS, timeout=300, on_result=None, offline=False):
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = [pool.submit(build_wheel, pip_cmd, req, timeout, offline) for req in requirements]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def install_from_wheelhouse(pip_cmd, requirements, target, timeout=300):
+    return subprocess.run(pip_cmd + ["install", "--no-index", "--find-links", WHEELHOUSE_DIR,
+                                     "--target", target, "--quiet"] + list(requirements),
+                          timeout=timeout, capture_output=True, text=True)
+
+
+def is_offline(config=None):
+    if config is None:
+        config = load_config()
+    return config.get("package_index", "online") == "offline"
+
+
+def pip_index_args(config=None):
+    # Offline mode installs from the wheelhouse at disk speed with no index
+    # access; online mode still lets pip pick up wheels that are already local.
+    if is_offline(config):
+        return ["--no-index", "--find-links", WHEELHOUSE_DIR]
+    return ["--find-links", WHEELHOUSE_DIR]
+
+
+def collect_known_requirements(projects_root):
+    requirements = {"customtkinter"}
+    requirements.update(IMPORT_TO_PIP.values())
+    if os.path.isdir(projects_root):
+        for name in sorted(os.listdir(projects_root)):
+            project = os.path.join(projects_root, name)
+            if os.path.isdir(project):
+                requirements.update(read_requirements(project))
+    return sorted(requirements)
+
+
+def applies_here(requirement):
+    spec, _, marker = requirement.partition(";")
+    m = re.match(r'[A-Za-z0-9._-]+', spec.strip())
+    name = re.sub(r'[-_.]+', '-', m.group(0)).lower() if m else ""
+    if name in PLATFORM_ONLY and not sys.platform.startswith(PLATFORM_ONLY[name]):
+        return False
+    if marker.strip() and Marker is not None:
+        try:
+            return Marker(marker.strip()).evaluate()
+        except InvalidMarker:
+            return True
+    return True
+
+
+def warm_wheelhouse(pip_cmd, projects_root, max_workers=DEFAULT_WORKERS, timeout=600):
+    known = collect_known_requirements(projects_root)
+    requirements = [r for r in known if applies_here(r)]
+    skipped = len(known) - len(requirements)
+    print(f"Warming wheelhouse with {len(requirements)} requirements → {WHEELHOUSE_DIR}"
+          + (f" ({skipped} for other platforms skipped)" if skipped else ""))
+    def _report(r):
+        status = "cached" if r["cached"] else ("built" if r["ok"] else "FAILED")
+        print(f"  {status:>6}  {r['requirement']} ({r['seconds']:.1f}s)")
+    results = build_wheels(pip_cmd, requirements, max_workers=max_workers, timeout=timeout, on_result=_report)
+    failed = [r["requirement"] for r in results if not r["ok"]]
+    print(f"Wheelhouse ready: {len(results) - len(failed)} ok, {len(failed)} failed")
+    if failed:
+        print("Failed: " + ", ".join(failed))
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+    from config import gemini_folder, ensure_dirs
+    ensure_dirs()
+
+    parser = argparse.ArgumentParser(description="Manage the local wheelhouse used for offline dependency installs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    warm = sub.add_parser("warm", help="download/build wheels for every known and previously used package")
+    warm.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    warm.add_argument("--timeout", type=int, default=600)
+    args = parser.parse_args()
+
+    if args.command == "warm":
+        results = warm_wheelhouse([sys.executable, "-m", "pip"], gemini_folder, args.workers, args.timeout)
+        sys.exit(0 if all(r["ok"] for r in results) else 1)